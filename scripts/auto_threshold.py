@@ -0,0 +1,189 @@
+"""
+히스토그램 기반 자동 이진화 임계값 선택
+
+이미지마다 256칸 히스토그램을 한 번만 만들고, 누적합으로 모든 후보 임계값(0~255)의
+점수를 한꺼번에 계산해 고릅니다. 히스토그램 이후의 계산은 256개 원소 배열 연산뿐이라
+이미지 크기와 무관하게 수십 마이크로초면 끝납니다.
+
+    - otsu:     클래스 간 분산 최대 (cv2.THRESH_OTSU 와 같은 값)
+    - triangle: 가장 큰 봉우리와 긴 꼬리 끝을 잇는 직선에서 가장 먼 칸
+    - lineart:  Otsu 로 나눈 두 클래스 중 픽셀이 많은 쪽을 종이, 적은 쪽을 잉크로 보고
+                각 클래스의 중앙값 사이에서 종이 쪽으로 치우친 지점
+                (안티에일리어싱된 선 가장자리를 잉크로 포함해 선이 끊기지 않도록)
+
+임계값 t 는 cv2.threshold 와 같은 의미입니다 (t 이하 → 검정, 초과 → 흰색).
+
+사용 예:
+    from auto_threshold import resolve_threshold
+
+    t = resolve_threshold(gray, 'auto')   # 'auto' = lineart, 정수는 그대로 반환
+
+    python scripts/auto_threshold.py assets/images/ --method lineart
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Union
+
+import cv2
+import numpy as np
+
+from stage_profiler import profile_stage
+
+DEFAULT_THRESHOLD = 200
+DEFAULT_METHOD = 'lineart'
+# lineart: 잉크 중앙값에서 종이 중앙값까지 이 비율만큼 종이 쪽으로 이동한 지점
+LINEART_PAPER_BIAS = 0.75
+
+_LEVELS = np.arange(256, dtype=np.float64)
+
+
+def gray_histogram(gray: np.ndarray) -> np.ndarray:
+    """그레이스케일 uint8 이미지의 256칸 히스토그램 (float64)"""
+    with profile_stage('histogram'):
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+    return hist.ravel().astype(np.float64)
+
+
+def otsu_scores(hist: np.ndarray) -> np.ndarray:
+    """모든 후보 t 의 클래스 간 분산 (한쪽 클래스가 비면 0)"""
+    total = hist.sum()
+    omega = np.cumsum(hist) / total            # t 이하 픽셀 비율
+    mu = np.cumsum(hist * _LEVELS) / total     # t 이하 픽셀의 1차 모멘트
+    mu_total = mu[-1]
+    denominator = omega * (1.0 - omega)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (mu_total * omega - mu) ** 2 / denominator
+    scores[denominator <= 0] = 0.0
+    return scores
+
+
+def otsu_threshold(hist: np.ndarray) -> int:
+    return int(np.argmax(otsu_scores(hist)))
+
+
+def triangle_threshold(hist: np.ndarray) -> int:
+    """삼각형(Zack) 방식: 봉우리-꼬리 끝 직선과 히스토그램 사이 거리가 가장 큰 칸"""
+    nonzero = np.flatnonzero(hist)
+    low, high = int(nonzero[0]), int(nonzero[-1])
+    peak = int(np.argmax(hist))
+    # 봉우리에서 더 멀리 뻗은 쪽이 꼬리 (흰 종이 도안이면 어두운 쪽)
+    end = low if peak - low >= high - peak else high
+    if end == peak:
+        return peak
+
+    lo, hi = sorted((end, peak))
+    levels = _LEVELS[lo:hi + 1]
+    # 직선 (end, h[end]) - (peak, h[peak]) 아래쪽으로의 거리 (정규화 상수는 argmax 에 무관)
+    dx, dy = peak - end, hist[peak] - hist[end]
+    distance = dy * (levels - end) - dx * (hist[lo:hi + 1] - hist[end])
+    if dx < 0:
+        distance = -distance
+    return lo + int(np.argmax(distance))
+
+
+def lineart_threshold(hist: np.ndarray, paper_bias: float = LINEART_PAPER_BIAS) -> int:
+    """Otsu 분할 후 잉크/종이 중앙값 사이에서 종이 쪽으로 치우친 임계값"""
+    split = otsu_threshold(hist)
+    cumulative = np.cumsum(hist)
+    total = cumulative[-1]
+    dark_count = cumulative[split]
+    bright_count = total - dark_count
+    if dark_count == 0 or bright_count == 0:
+        return split
+
+    # 클래스별 중앙값: 누적합에서 절반 지점을 찾음
+    dark_median = int(np.searchsorted(cumulative, dark_count / 2))
+    bright_median = int(np.searchsorted(cumulative, dark_count + bright_count / 2))
+    if bright_count >= dark_count:
+        ink, paper = dark_median, bright_median
+    else:
+        ink, paper = bright_median, dark_median
+
+    threshold = ink + paper_bias * (paper - ink)
+    # 흰 종이면 t 이하가 잉크, 검은 종이면(반전 도안) t 초과가 잉크가 되도록 반올림
+    threshold = int(np.floor(threshold)) if paper > ink else int(np.ceil(threshold))
+    return int(np.clip(threshold, 0, 254))
+
+
+METHODS: Dict[str, Callable[[np.ndarray], int]] = {
+    'otsu': otsu_threshold,
+    'triangle': triangle_threshold,
+    'lineart': lineart_threshold,
+}
+
+
+def choose_threshold(gray: np.ndarray, method: str = DEFAULT_METHOD) -> int:
+    """
+    그레이스케일 이미지에 대해 method 로 임계값을 고릅니다.
+
+    밝기 값이 한 가지뿐인 이미지(빈 페이지 등)는 DEFAULT_THRESHOLD 를 돌려줍니다.
+    """
+    if method == 'auto':
+        method = DEFAULT_METHOD
+    if method not in METHODS:
+        raise ValueError(f"알 수 없는 자동 임계값 방식: {method} "
+                         f"(사용 가능: auto, {', '.join(METHODS)})")
+    hist = gray_histogram(gray)
+    if np.count_nonzero(hist) < 2:
+        return DEFAULT_THRESHOLD
+    return METHODS[method](hist)
+
+
+def is_auto(threshold: Union[int, str]) -> bool:
+    return isinstance(threshold, str)
+
+
+def resolve_threshold(gray: np.ndarray, threshold: Union[int, str]) -> int:
+    """정수 임계값은 그대로, 'auto' 나 방식 이름이면 이미지에서 골라 반환"""
+    if is_auto(threshold):
+        return choose_threshold(gray, threshold)
+    return int(threshold)
+
+
+def parse_threshold(text: str) -> Union[int, str]:
+    """명령행 임계값 인자: 0-255 정수 또는 auto/otsu/triangle/lineart"""
+    if text in METHODS or text == 'auto':
+        return text
+    value = int(text)
+    if not 0 <= value <= 255:
+        raise ValueError(f"임계값은 0-255 범위여야 합니다: {value}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지별 자동 이진화 임계값 확인 (변환 없음)")
+    parser.add_argument('paths', nargs='+', help='이미지 파일 또는 디렉토리')
+    parser.add_argument('--method', default=DEFAULT_METHOD,
+                        choices=['auto', *METHODS], help='표시할 기준 방식 (기본값 lineart)')
+    args = parser.parse_args()
+
+    extensions = ('.png', '.jpg', '.jpeg', '.webp')
+    files = []
+    for path in map(Path, args.paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in extensions))
+        else:
+            files.append(path)
+
+    print(f"   {'file':<40}{'otsu':>6}{'triangle':>10}{'lineart':>9}   선택({args.method})")
+    for file in files:
+        image = cv2.imread(os.fspath(file))
+        if image is None:
+            print(f"   ❌ 이미지를 불러올 수 없습니다: {file}")
+            continue
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        start = time.perf_counter()
+        hist = gray_histogram(gray)
+        values = {name: func(hist) for name, func in METHODS.items()}
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        chosen = choose_threshold(gray, args.method)
+        print(f"   {file.name:<40}{values['otsu']:>6}{values['triangle']:>10}"
+              f"{values['lineart']:>9}   {chosen:>3}  ({elapsed_us:.0f}µs)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
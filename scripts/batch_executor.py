@@ -0,0 +1,152 @@
+"""
+이미지 일괄 변환용 프로세스 풀 실행기
+
+작업(task)을 워커 프로세스들에 나눠 실행하고, 결과는 항상 입력 순서대로
+돌려줍니다. 작업 하나가 예외를 던지거나 워커가 죽어도(메모리 부족으로 강제
+종료 등) 해당 작업만 실패로 기록되고 나머지 작업은 계속 처리됩니다. 워커가 죽어
+풀이 깨지면 새 풀을 만들어 남은 작업을 다시 제출하고, 그때 실행 중이던 작업들은
+하나씩 따로 다시 실행해 워커를 죽인 작업을 가려냅니다.
+
+사용 예:
+    from batch_executor import add_jobs_argument, run_batch
+
+    for task, outcome in run_batch(convert_one, tasks, jobs=args.jobs):
+        if outcome.ok:
+            ...
+        else:
+            print(f"✗ 오류: {outcome.error}")
+"""
+
+import argparse
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class TaskOutcome:
+    """작업 하나의 실행 결과 (성공 시 value, 실패 시 error 메시지)"""
+
+    def __init__(self, ok: bool, value: Any = None, error: Optional[str] = None):
+        self.ok = ok
+        self.value = value
+        self.error = error
+
+
+def default_jobs() -> int:
+    """자동 워커 수: 사용 가능한 CPU 코어 수"""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def resolve_jobs(jobs: Optional[int], task_count: int) -> int:
+    """--jobs 값(0 또는 None 이면 자동)을 실제 워커 수로 변환"""
+    if not jobs or jobs < 0:
+        jobs = default_jobs()
+    return max(1, min(jobs, task_count))
+
+
+def add_jobs_argument(parser: argparse.ArgumentParser) -> None:
+    """argparse 에 공통 --jobs 옵션을 추가합니다."""
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=0,
+        help='동시에 실행할 워커 프로세스 수 (기본값 0: CPU 코어 수만큼 자동)'
+    )
+
+
+def init_worker() -> None:
+    """워커 프로세스 초기화: 프로세스 단위로 병렬화하므로 OpenCV 내부 스레드는 하나만 사용"""
+    try:
+        import cv2
+        cv2.setNumThreads(1)
+    except ImportError:
+        pass
+
+
+def _run_task(func: Callable[[Any], Any], task: Any) -> TaskOutcome:
+    try:
+        return TaskOutcome(True, func(task))
+    except Exception as e:
+        return TaskOutcome(False, error=f"{type(e).__name__}: {e}")
+
+
+def run_batch(func: Callable[[Any], Any], tasks: Sequence[Any],
+              jobs: Optional[int] = None) -> Iterator[Tuple[Any, TaskOutcome]]:
+    """
+    tasks 의 각 항목에 func 를 적용하고 (task, TaskOutcome) 를 입력 순서대로 내보냅니다.
+
+    func 와 task 는 워커 프로세스로 전달되므로 pickle 가능해야 합니다
+    (모듈 최상위 함수 사용). 워커가 1개면 풀 없이 현재 프로세스에서 실행합니다.
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return
+    workers = resolve_jobs(jobs, len(tasks))
+
+    if workers == 1:
+        for task in tasks:
+            yield task, _run_task(func, task)
+        return
+
+    pending = deque(range(len(tasks)))     # 아직 제출하지 않은 작업 번호
+    outcomes: Dict[int, TaskOutcome] = {}
+    position = 0                            # 다음에 내보낼 작업 번호
+    while pending:
+        suspects: List[int] = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            # 워커 수만큼만 제출해 두므로, 풀이 깨지면 실행 중이던 작업만 의심 대상이 됨
+            running: Dict[Future, int] = {}
+            while (pending or running) and not suspects:
+                while pending and len(running) < workers:
+                    index = pending.popleft()
+                    running[pool.submit(_run_task, func, tasks[index])] = index
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        outcomes[index] = future.result()
+                    except BrokenProcessPool:  # 워커 프로세스 비정상 종료 (메모리 부족 등)
+                        suspects.append(index)
+                    except Exception as e:
+                        outcomes[index] = TaskOutcome(False, error=f"{type(e).__name__}: {e}")
+                # 완료 순서와 무관하게 제출 순서대로 결과를 내보냄
+                while position in outcomes:
+                    yield tasks[position], outcomes.pop(position)
+                    position += 1
+            suspects += running.values()
+        # 깨진 풀에서 실행 중이던 작업은 하나씩 따로 다시 실행해, 워커를 죽인 작업만 실패로 기록
+        # (남은 작업은 다음 바퀴에서 새 풀로 계속)
+        for index in sorted(suspects):
+            outcomes[index] = _run_isolated(func, tasks[index])
+        while position in outcomes:
+            yield tasks[position], outcomes.pop(position)
+            position += 1
+
+
+def _run_isolated(func: Callable[[Any], Any], task: Any) -> TaskOutcome:
+    """작업 하나를 전용 워커 프로세스에서 실행 (워커가 죽으면 그 작업만 실패)"""
+    with ProcessPoolExecutor(max_workers=1, initializer=init_worker) as pool:
+        try:
+            return pool.submit(_run_task, func, task).result()
+        except BrokenProcessPool:
+            return TaskOutcome(False, error="BrokenProcessPool: 작업 중 워커 프로세스가 "
+                                            "비정상 종료됨 (메모리 부족 등)")
+        except Exception as e:
+            return TaskOutcome(False, error=f"{type(e).__name__}: {e}")
+
+
+def split_tasks(items: Sequence[Any], variants: Sequence[Any],
+                jobs: Optional[int] = None) -> List[Tuple[Any, List[Any]]]:
+    """
+    (항목, 변형 목록) 작업 목록을 만듭니다.
+
+    항목 수가 워커 수보다 많으면 항목당 하나의 작업(변형들은 한 워커에서
+    공유 단계를 재사용)으로, 적으면 변형마다 작업을 나눠 코어를 모두 활용합니다.
+    """
+    workers = resolve_jobs(jobs, max(1, len(items) * len(variants)))
+    if len(items) >= workers or len(variants) <= 1:
+        return [(item, list(variants)) for item in items]
+    return [(item, [variant]) for item in items for variant in variants]
@@ -0,0 +1,203 @@
+"""
+일괄 변환 매니페스트 (증분 처리용)
+
+입력 파일마다 크기, mtime, 내용 해시와 스타일별 출력 경로/설정/출력 해시를
+기록해 두고, 다음 실행에서는 새로 추가되었거나 내용이 바뀐 입력만 변환합니다.
+
+    - 크기와 mtime 이 기록과 같으면 해시 계산 없이 변경 없음으로 판단
+    - 크기/mtime 만 바뀌고 내용 해시가 같으면(touch, 복사 등) 기록만 갱신
+    - 입력 내용이 이전에 만든 출력과 같으면 이미 처리된 파일로 보고 건너뜀
+      (제자리 덮어쓰기 후 재실행 시 이중 이진화 방지)
+    - 원본이 사라진 항목의 출력은 remove_orphans 로 삭제
+
+매니페스트 위치: <프로젝트 루트>/.cache/manifests/<도구>-<입력 폴더 해시>.json
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from conversion_cache import PROJECT_ROOT, file_digest
+
+MANIFEST_DIR = PROJECT_ROOT / ".cache" / "manifests"
+MANIFEST_VERSION = 1
+# save_if_due: 이 개수만큼 새로 기록했거나 이 시간(초)이 지나면 저장
+SAVE_EVERY = 50
+SAVE_INTERVAL = 30.0
+
+# check() 가 돌려주는 건너뛰기 사유
+SKIP_UNCHANGED = "unchanged"
+SKIP_ALREADY_PROCESSED = "already-processed"
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class BatchManifest:
+    """입력 디렉토리 하나에 대한 처리 기록"""
+
+    def __init__(self, path: str, base_dir: str):
+        """
+        Args:
+            path: 매니페스트 JSON 파일 경로
+            base_dir: 입력 경로를 상대 경로로 기록할 기준 디렉토리
+        """
+        self.path = Path(path)
+        self.base_dir = Path(base_dir).resolve()
+        self.entries: Dict[str, Dict] = {}
+        self._digests: Dict[str, str] = {}
+        # 기록된 출력 해시 (같은 출력이 여러 항목에 있을 수 있어 개수로 관리)
+        self._output_hashes: Counter = Counter()
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self.load()
+
+    @classmethod
+    def for_directory(cls, tool: str, input_dir: str) -> 'BatchManifest':
+        """도구 이름과 입력 디렉토리로 정해지는 기본 위치의 매니페스트"""
+        resolved = str(Path(input_dir).resolve())
+        tag = hashlib.sha1(resolved.encode('utf-8')).hexdigest()[:12]
+        return cls(MANIFEST_DIR / f"{tool}-{tag}.json", resolved)
+
+    def load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('entries', {})
+            self._output_hashes = Counter(
+                record['output_hash']
+                for entry in self.entries.values()
+                for record in entry.get('styles', {}).values()
+            )
+
+    def save(self) -> None:
+        """임시 파일에 쓴 뒤 rename 으로 교체 (중단되어도 이전 매니페스트 유지)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'entries': self.entries},
+                          f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+
+    def save_if_due(self) -> bool:
+        """
+        마지막 저장 후 SAVE_EVERY 개 이상 기록했거나 SAVE_INTERVAL 초가 지났으면 저장합니다.
+        (이미지마다 전체 JSON 을 다시 쓰지 않도록 배치 중간 저장용, 마지막에는 save 호출)
+        """
+        if not self._unsaved:
+            return False
+        if (self._unsaved < SAVE_EVERY
+                and time.monotonic() - self._saved_at < SAVE_INTERVAL):
+            return False
+        self.save()
+        return True
+
+    def _key(self, input_path: str) -> str:
+        return os.path.relpath(Path(input_path).resolve(), self.base_dir)
+
+    def _digest(self, path: str) -> str:
+        """한 실행 안에서는 파일당 한 번만 해시 계산"""
+        resolved = str(Path(path).resolve())
+        if resolved not in self._digests:
+            self._digests[resolved] = file_digest(resolved)
+        return self._digests[resolved]
+
+    def _forget_output(self, output_hash: str) -> None:
+        self._output_hashes[output_hash] -= 1
+        if self._output_hashes[output_hash] <= 0:
+            del self._output_hashes[output_hash]
+
+    def check(self, input_path: str, style: str, output_path: str,
+              params: Dict) -> Optional[str]:
+        """
+        변환을 건너뛸 수 있으면 사유(SKIP_*)를, 변환이 필요하면 None 을 반환합니다.
+        """
+        entry = self.entries.get(self._key(input_path))
+        stat = _stat(input_path)
+        if stat is None:
+            return None
+
+        if entry is not None:
+            unchanged = [entry['size'], entry['mtime_ns']] == list(stat)
+            if not unchanged and self._digest(input_path) == entry['hash']:
+                # 내용은 그대로이고 mtime 만 바뀐 경우: 기록 갱신
+                entry['size'], entry['mtime_ns'] = stat
+                unchanged = True
+            record = entry.get('styles', {}).get(style)
+            if (unchanged and record is not None
+                    and record['params'] == params
+                    and record['output'] == str(output_path)
+                    and os.path.exists(output_path)):
+                return SKIP_UNCHANGED
+
+        # 입력이 이전 실행의 출력과 같은 내용이면 다시 처리하지 않음
+        if self._output_hashes and self._digest(input_path) in self._output_hashes:
+            return SKIP_ALREADY_PROCESSED
+        return None
+
+    def record(self, input_path: str, style: str, output_path: str,
+               params: Dict) -> None:
+        """변환 성공을 기록합니다."""
+        key = self._key(input_path)
+        output_hash = file_digest(output_path)
+        self._digests[str(Path(output_path).resolve())] = output_hash
+        in_place = Path(input_path).resolve() == Path(output_path).resolve()
+
+        entry = self.entries.setdefault(key, {'styles': {}})
+        if in_place:
+            # 제자리 변환: 다음 실행에서 현재(출력) 파일을 변경 없음으로 판단
+            entry['hash'] = output_hash
+        else:
+            entry['hash'] = self._digest(input_path)
+        entry['size'], entry['mtime_ns'] = _stat(input_path)
+        if style in entry['styles']:
+            self._forget_output(entry['styles'][style]['output_hash'])
+        self._output_hashes[output_hash] += 1
+        self._unsaved += 1
+        entry['styles'][style] = {
+            'output': str(output_path),
+            'output_hash': output_hash,
+            'params': params,
+        }
+
+    def remove_orphans(self, existing_inputs: Iterable[str],
+                       delete_outputs: bool = True) -> List[str]:
+        """
+        원본이 더 이상 없는 항목을 지우고, delete_outputs 면 그 출력 파일도 삭제합니다.
+
+        Returns:
+            삭제한 출력 파일 경로 목록
+        """
+        alive = {self._key(path) for path in existing_inputs}
+        deleted = []
+        for key in sorted(set(self.entries) - alive):
+            entry = self.entries.pop(key)
+            self._unsaved += 1
+            for record in entry.get('styles', {}).values():
+                self._forget_output(record['output_hash'])
+                if not delete_outputs:
+                    continue
+                output = record['output']
+                if os.path.exists(output):
+                    os.remove(output)
+                    deleted.append(output)
+        return deleted
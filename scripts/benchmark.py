@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+변환 경로별 성능 벤치마크
+
+결정적인(시드 고정) 합성 입력을 여러 해상도로 만들고, 모든 변환 경로를
+케이스마다 별도 프로세스에서 실행해 소요 시간, 처리량(MP/s), 최대 메모리(RSS)를
+측정합니다. 결과는 JSON 으로 저장하고, 기준(baseline) 결과와 비교할 수 있습니다.
+
+사용법:
+    python scripts/benchmark.py                              # 전체 (1k, 2k, 4k, 8k)
+    python scripts/benchmark.py --sizes 1k,2k --cases pro_clean,pure_bw
+    python scripts/benchmark.py --save-baseline              # 현재 결과를 기준으로 저장
+    python scripts/benchmark.py --baseline .cache/benchmark/baseline.json --fail-on-regression
+
+케이스:
+    pro_clean, pro_detailed, pro_balanced, pro_artistic, ultra  (convert_to_coloring_pro.py)
+    basic, advanced, sketch                                     (convert_to_coloring.py)
+    pure_bw                                                     (image_postprocess.convert_to_pure_bw)
+    gemini_bw                                                   (page_stages.apply_bw_postprocess)
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BENCHMARK_DIR = PROJECT_ROOT / ".cache" / "benchmark"
+DEFAULT_OUTPUT = BENCHMARK_DIR / "results.json"
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+
+# 긴 변 길이 (세로 3:4 도안 비율)
+SIZES = {'1k': 1024, '2k': 2048, '4k': 4096, '8k': 8192}
+KINDS = ['line', 'photo']
+
+CASES = [
+    'pro_clean', 'pro_detailed', 'pro_balanced', 'pro_artistic', 'ultra',
+    'basic', 'advanced', 'sketch',
+    'pure_bw', 'gemini_bw',
+]
+
+
+# ---------------------------------------------------------------------------
+# 합성 입력
+# ---------------------------------------------------------------------------
+
+def make_line_art(width: int, height: int, seed: int) -> np.ndarray:
+    """AI 생성 도안과 비슷한 선화: 안티앨리어싱된 도형/곡선 + 약한 노이즈"""
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width, 3), 255, np.uint8)
+    scale = max(width, height) / 1024
+    count = int(60 * (width * height) / (768 * 1024))
+
+    for _ in range(count):
+        thickness = int(rng.integers(2, 6) * scale) or 1
+        shape = rng.integers(0, 3)
+        cx, cy = int(rng.integers(0, width)), int(rng.integers(0, height))
+        if shape == 0:
+            radius = int(rng.integers(20, 120) * scale)
+            cv2.circle(img, (cx, cy), radius, (0, 0, 0), thickness, cv2.LINE_AA)
+        elif shape == 1:
+            axes = (int(rng.integers(20, 160) * scale), int(rng.integers(10, 90) * scale))
+            angle = float(rng.uniform(0, 180))
+            cv2.ellipse(img, (cx, cy), axes, angle, 0, 360, (0, 0, 0), thickness, cv2.LINE_AA)
+        else:
+            # 무작위 보행 곡선 (머리카락, 풀잎 같은 자유 곡선)
+            steps = rng.normal(0, 12 * scale, size=(int(rng.integers(8, 30)), 2)).cumsum(axis=0)
+            points = (steps + (cx, cy)).astype(np.int32).reshape(-1, 1, 2)
+            cv2.polylines(img, [points], False, (0, 0, 0), thickness, cv2.LINE_AA)
+
+    noise = rng.normal(0, 4, size=img.shape[:2])
+    return np.clip(img + noise[..., None], 0, 255).astype(np.uint8)
+
+
+def make_photo(width: int, height: int, seed: int) -> np.ndarray:
+    """사진과 비슷한 입력: 부드러운 색 그라디언트 + 흐린 색 도형 + 센서 노이즈"""
+    rng = np.random.default_rng(seed)
+    low = rng.uniform(0, 255, size=(8, 6, 3)).astype(np.float32)
+    img = cv2.resize(low, (width, height), interpolation=cv2.INTER_CUBIC)
+    scale = max(width, height) / 1024
+    count = int(40 * (width * height) / (768 * 1024))
+
+    for _ in range(count):
+        color = tuple(float(c) for c in rng.uniform(0, 255, size=3))
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        axes = (int(rng.integers(15, 150) * scale), int(rng.integers(15, 150) * scale))
+        cv2.ellipse(img, center, axes, float(rng.uniform(0, 180)), 0, 360, color, -1,
+                    cv2.LINE_AA)
+
+    img = cv2.GaussianBlur(img, (0, 0), 1.5 * scale)
+    img += rng.normal(0, 6, size=img.shape).astype(np.float32)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def input_path(kind: str, size: str) -> Path:
+    """합성 입력 파일 (없으면 생성, 같은 kind/size 는 항상 같은 내용)"""
+    path = BENCHMARK_DIR / "inputs" / f"{kind}_{size}.png"
+    if not path.exists():
+        height = SIZES[size]
+        width = height * 3 // 4
+        seed = KINDS.index(kind) * 100 + list(SIZES).index(size)
+        maker = make_line_art if kind == 'line' else make_photo
+        path.parent.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(path), maker(width, height, seed))
+    return path
+
+
+# ---------------------------------------------------------------------------
+# 케이스 실행 (자식 프로세스)
+# ---------------------------------------------------------------------------
+
+def load_case(name: str) -> Callable[[str, str], object]:
+    """
+    케이스 이름 → (입력 경로, 출력 경로) 를 받는 실행 함수
+    (변환기들은 예외를 삼키고 False 를 반환하므로, False 면 실패로 봄)
+    """
+    if name.startswith('pro_') or name == 'ultra':
+        from convert_to_coloring_pro import ColoringBookConverter
+        converter = ColoringBookConverter()
+        if name == 'ultra':
+            return converter.convert_ultra_quality
+        style = name[len('pro_'):]
+        return lambda src, dst: converter.convert_pro_quality(src, dst, style)
+
+    if name in ('basic', 'advanced', 'sketch'):
+        import convert_to_coloring
+        return {
+            'basic': convert_to_coloring.convert_to_coloring_book,
+            'advanced': convert_to_coloring.convert_to_coloring_book_advanced,
+            'sketch': convert_to_coloring.convert_to_coloring_book_sketch,
+        }[name]
+
+    if name == 'pure_bw':
+        from image_postprocess import convert_to_pure_bw
+        return lambda src, dst: convert_to_pure_bw(src, dst, verbose=False)
+
+    if name == 'gemini_bw':
+        from page_stages import apply_bw_postprocess
+
+        def run(src: str, dst: str) -> bool:
+            # 제자리 변환 함수이므로 출력 위치에 복사한 뒤 처리
+            shutil.copyfile(src, dst)
+            return apply_bw_postprocess(dst)
+        return run
+
+    raise ValueError(f"알 수 없는 케이스: {name}")
+
+
+def _rss_mb(ru_maxrss: int) -> float:
+    # Linux 는 KB, macOS 는 바이트 단위
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return ru_maxrss / divisor
+
+
+def run_case(name: str, src: str, dst: str, repeat: int) -> Dict:
+    """현재 프로세스에서 케이스를 repeat 번 실행하고 측정값을 반환"""
+    func = load_case(name)
+    baseline_rss = _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    seconds = []
+    for _ in range(repeat):
+        # 이전 실행의 출력이 남아 있으면 실패해도 출력이 있는 것처럼 보이므로 먼저 지움
+        if os.path.exists(dst):
+            os.remove(dst)
+        start = time.perf_counter()
+        ok = func(src, dst)
+        seconds.append(time.perf_counter() - start)
+        if ok is False:
+            raise RuntimeError("변환 함수가 실패를 반환했습니다")
+        if not os.path.exists(dst):
+            raise RuntimeError("출력 파일이 생성되지 않았습니다")
+    return {
+        'seconds': seconds,
+        'baseline_rss_mb': round(baseline_rss, 1),
+        'peak_rss_mb': round(_rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss), 1),
+    }
+
+
+def measure(name: str, kind: str, size: str, repeat: int, threads: int,
+            timeout: float) -> Dict:
+    """케이스 하나를 새 프로세스에서 실행 (최대 RSS 가 케이스별로 분리되도록)"""
+    src = input_path(kind, size)
+    height = SIZES[size]
+    width = height * 3 // 4
+    megapixels = width * height / 1e6
+    dst = BENCHMARK_DIR / "outputs" / f"{name}_{kind}_{size}.png"
+    dst.parent.mkdir(parents=True, exist_ok=True)
+
+    result = {
+        'case': name, 'kind': kind, 'size': size,
+        'width': width, 'height': height, 'megapixels': round(megapixels, 3),
+        'ok': False,
+    }
+    cmd = [sys.executable, __file__, '--run-case', name, '--input', str(src),
+           '--output', str(dst), '--repeat', str(repeat), '--threads', str(threads)]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        result['error'] = f"시간 초과 ({timeout:.0f}초)"
+        return result
+
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = (proc.stderr.strip().splitlines() or ['알 수 없는 오류'])[-1]
+        result['error'] = error
+        return result
+
+    timing = json.loads(lines[-1])
+    median = statistics.median(timing['seconds'])
+    result.update(timing)
+    result.update({
+        'ok': True,
+        'median_seconds': round(median, 4),
+        'min_seconds': round(min(timing['seconds']), 4),
+        'mp_per_s': round(megapixels / median, 3) if median > 0 else None,
+    })
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 보고
+# ---------------------------------------------------------------------------
+
+def _key(result: Dict) -> tuple:
+    return result['case'], result['kind'], result['size']
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[Dict]:
+    """
+    기준 결과 대비 중앙값 시간 비율을 계산합니다.
+
+    Returns:
+        비교 항목 목록 (ratio > 1 + tolerance 이면 regression)
+    """
+    previous = {_key(r): r for r in baseline.get('results', []) if r.get('ok')}
+    rows = []
+    for result in results:
+        before = previous.get(_key(result))
+        if not result['ok'] or before is None:
+            continue
+        ratio = result['median_seconds'] / before['median_seconds']
+        rows.append({
+            'case': result['case'], 'kind': result['kind'], 'size': result['size'],
+            'baseline_seconds': before['median_seconds'],
+            'seconds': result['median_seconds'],
+            'ratio': round(ratio, 3),
+            'rss_delta_mb': round(result['peak_rss_mb'] - before['peak_rss_mb'], 1),
+            'regression': ratio > 1 + tolerance,
+        })
+    return rows
+
+
+def print_results(results: List[Dict]) -> None:
+    print(f"{'case':<14}{'kind':<7}{'size':<6}{'median s':>10}{'MP/s':>9}{'peak RSS MB':>13}")
+    for r in results:
+        if r['ok']:
+            print(f"{r['case']:<14}{r['kind']:<7}{r['size']:<6}"
+                  f"{r['median_seconds']:>10.3f}{r['mp_per_s']:>9.2f}{r['peak_rss_mb']:>13.1f}")
+        else:
+            print(f"{r['case']:<14}{r['kind']:<7}{r['size']:<6}  ❌ {r['error']}")
+
+
+def print_comparison(rows: List[Dict]) -> None:
+    print(f"{'case':<14}{'kind':<7}{'size':<6}{'base s':>9}{'now s':>9}{'ratio':>8}{'ΔRSS MB':>10}")
+    for row in rows:
+        mark = "  ⚠️ 느려짐" if row['regression'] else ""
+        print(f"{row['case']:<14}{row['kind']:<7}{row['size']:<6}"
+              f"{row['baseline_seconds']:>9.3f}{row['seconds']:>9.3f}"
+              f"{row['ratio']:>8.2f}{row['rss_delta_mb']:>10.1f}{mark}")
+
+
+def write_json(path: Path, data: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _split(value: str, allowed: List[str], label: str) -> List[str]:
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    unknown = [item for item in items if item not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"알 수 없는 {label}: {', '.join(unknown)} (가능: {', '.join(allowed)})"
+        )
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="컬러링북 변환 성능 벤치마크")
+    parser.add_argument('--sizes', default=','.join(SIZES),
+                        type=lambda v: _split(v, list(SIZES), '해상도'),
+                        help='해상도 목록 (기본값 1k,2k,4k,8k)')
+    parser.add_argument('--kinds', default=','.join(KINDS),
+                        type=lambda v: _split(v, KINDS, '입력 종류'),
+                        help='입력 종류 (line: 선화, photo: 사진풍)')
+    parser.add_argument('--cases', default=','.join(CASES),
+                        type=lambda v: _split(v, CASES, '케이스'),
+                        help='실행할 케이스 목록 (기본값 전체)')
+    parser.add_argument('--repeat', type=int, default=3, help='케이스당 반복 횟수 (중앙값 보고)')
+    parser.add_argument('--threads', type=int, default=0,
+                        help='OpenCV 스레드 수 (0: OpenCV 기본값)')
+    parser.add_argument('--timeout', type=float, default=1800, help='케이스당 제한 시간(초)')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help='결과 JSON 경로')
+    parser.add_argument('--baseline', type=Path, default=None,
+                        help='비교할 기준 결과 JSON (기본값: 저장된 기준이 있으면 사용)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='이번 결과를 기준 결과로 저장')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='느려짐으로 판단할 시간 증가 비율 (기본값 0.10 = 10%%)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='느려진 케이스가 있으면 종료 코드 1')
+    # 자식 프로세스 전용
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    parser.add_argument('--input', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        # 자식 프로세스: --output 은 변환 결과 이미지 경로
+        if args.threads:
+            cv2.setNumThreads(args.threads)
+        print(json.dumps(run_case(args.run_case, args.input, str(args.output), args.repeat)))
+        return 0
+
+    print("=" * 65)
+    print("⏱️  컬러링북 변환 벤치마크")
+    print("=" * 65)
+    print(f"   케이스 {len(args.cases)}개 × 입력 {len(args.kinds)}종 × 해상도 {len(args.sizes)}개, "
+          f"반복 {args.repeat}회")
+    print(f"   Python {platform.python_version()}, OpenCV {cv2.__version__}, "
+          f"CPU {os.cpu_count()}개")
+    print("-" * 65)
+
+    results = []
+    for size in args.sizes:
+        for kind in args.kinds:
+            for name in args.cases:
+                result = measure(name, kind, size, args.repeat, args.threads, args.timeout)
+                results.append(result)
+                if result['ok']:
+                    print(f"  ✅ {name:<14}{kind:<7}{size:<4} {result['median_seconds']:8.3f}s  "
+                          f"{result['mp_per_s']:7.2f} MP/s  {result['peak_rss_mb']:8.1f} MB")
+                else:
+                    print(f"  ❌ {name:<14}{kind:<7}{size:<4} {result['error']}")
+
+    report = {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'threads': args.threads,
+        'results': results,
+    }
+
+    baseline_path = args.baseline or (DEFAULT_BASELINE if DEFAULT_BASELINE.exists() else None)
+    regressions = []
+    if baseline_path and not args.save_baseline:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            rows = compare(results, json.load(f), args.tolerance)
+        report['comparison'] = {'baseline': str(baseline_path), 'rows': rows}
+        regressions = [row for row in rows if row['regression']]
+
+    write_json(args.output, report)
+    if args.save_baseline:
+        write_json(args.baseline or DEFAULT_BASELINE, report)
+
+    print("\n" + "=" * 65)
+    print("📊 결과")
+    print_results(results)
+    if 'comparison' in report:
+        print("-" * 65)
+        print(f"🔁 기준 결과 비교: {baseline_path}")
+        print_comparison(report['comparison']['rows'])
+    print("-" * 65)
+    print(f"   📄 결과 JSON: {args.output}")
+    if args.save_baseline:
+        print(f"   📌 기준 결과 저장: {args.baseline or DEFAULT_BASELINE}")
+    if regressions:
+        print(f"   ⚠️ 느려진 케이스: {len(regressions)}개 (허용 {args.tolerance:.0%})")
+    print("=" * 65)
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
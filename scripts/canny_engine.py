@@ -0,0 +1,152 @@
+"""
+다중 임계값 Canny 엔진
+
+같은 블러 이미지에 (low, high) 임계값 쌍을 여러 개 적용할 때
+Sobel 그라디언트와 비최대 억제(NMS)를 한 번만 계산하고,
+임계값 쌍마다 히스테리시스만 다시 수행합니다.
+
+OpenCV Canny(aperture 3, L1 그라디언트)와 비트 단위로 같은 결과를 냅니다.
+    - 그라디언트: 3x3 Sobel (BORDER_REPLICATE), 크기 |dx| + |dy|
+    - NMS: 22.5°/67.5° 경계를 고정소수점(TG22, CANNY_SHIFT)으로 판정
+    - 히스테리시스: m > low 인 NMS 후보 중 m > high 픽셀과
+      8-연결된 컴포넌트만 에지로 확정
+
+또한 low/high 가 모두 다른 쌍 이상인 쌍의 결과는 그 쌍 결과의 부분집합이므로
+(후보 집합과 강한 에지 집합이 모두 단조 감소) 합집합에서는 생략합니다.
+
+그라디언트와 NMS 는 지역 연산이지만 히스테리시스는 거리 제한 없이 퍼지므로, 타일 처리는
+창마다 hysteresis_planes 로 후보/강한 픽셀만 구하고 tiling.tiled_hysteresis 로
+타일 경계를 넘어 이어지는 컴포넌트를 합칩니다.
+"""
+
+from typing import Iterable, List, Tuple
+
+import cv2
+import numpy as np
+
+from component_filter import apply_keep_table
+from stage_profiler import profiled
+
+# OpenCV canny.cpp 와 같은 고정소수점 상수 (tan(22.5°) * 2^15)
+_CANNY_SHIFT = 15
+_TG22 = 13573
+
+
+def prune_threshold_pairs(pairs: Iterable[Tuple[float, float]]) -> List[Tuple[int, int]]:
+    """
+    합집합에 기여하지 않는(다른 쌍에 지배되는) 임계값 쌍을 제거합니다.
+
+    OpenCV 와 같이 low > high 면 교환하고 내림(floor)한 정수 임계값을 사용합니다.
+    """
+    normalized = []
+    for low, high in pairs:
+        if low > high:
+            low, high = high, low
+        normalized.append((int(np.floor(low)), int(np.floor(high))))
+
+    kept = []
+    for pair in sorted(set(normalized)):
+        dominated = any(
+            other != pair and other[0] <= pair[0] and other[1] <= pair[1]
+            for other in normalized
+        )
+        if not dominated:
+            kept.append(pair)
+    return kept
+
+
+class CannyGradients:
+    """한 이미지의 그라디언트 크기와 NMS 결과를 보관하고 히스테리시스를 수행"""
+
+    def __init__(self, blurred: np.ndarray):
+        dx = cv2.Sobel(blurred, cv2.CV_16S, 1, 0, ksize=3,
+                       borderType=cv2.BORDER_REPLICATE).astype(np.int32)
+        dy = cv2.Sobel(blurred, cv2.CV_16S, 0, 1, ksize=3,
+                       borderType=cv2.BORDER_REPLICATE).astype(np.int32)
+        ax = np.abs(dx)
+        ay = np.abs(dy)
+        magnitude = ax + ay
+
+        h, w = magnitude.shape
+        # 이미지 바깥의 크기는 0 (OpenCV 의 mag 버퍼 패딩과 동일)
+        padded = np.zeros((h + 2, w + 2), np.int32)
+        padded[1:-1, 1:-1] = magnitude
+
+        def neighbor(oy: int, ox: int) -> np.ndarray:
+            return padded[1 + oy:1 + oy + h, 1 + ox:1 + ox + w]
+
+        y = ay << _CANNY_SHIFT
+        tg22x = ax * _TG22
+        tg67x = tg22x + (ax << (_CANNY_SHIFT + 1))
+        horizontal = y < tg22x
+        vertical = y > tg67x
+        diagonal = ~(horizontal | vertical)
+        del y, tg22x, tg67x, ax, ay
+
+        # 대각 방향: 그라디언트 부호가 같으면 ↘, 다르면 ↗ 방향 이웃과 비교
+        same_sign = (dx ^ dy) >= 0
+        del dx, dy
+
+        maximum = horizontal & (magnitude > neighbor(0, -1)) & (magnitude >= neighbor(0, 1))
+        maximum |= vertical & (magnitude > neighbor(-1, 0)) & (magnitude >= neighbor(1, 0))
+        up = np.where(same_sign, neighbor(-1, -1), neighbor(-1, 1))
+        down = np.where(same_sign, neighbor(1, 1), neighbor(1, -1))
+        maximum |= diagonal & (magnitude > up) & (magnitude > down)
+
+        self.magnitude = magnitude
+        self.maximum = maximum
+
+    def hysteresis(self, low: int, high: int) -> np.ndarray:
+        """NMS 결과에 (low, high) 히스테리시스를 적용한 0/255 에지 맵"""
+        return _hysteresis(self.maximum & (self.magnitude > low),
+                           self.maximum & (self.magnitude > high))
+
+
+def _hysteresis(candidates: np.ndarray, strong_pixels: np.ndarray) -> np.ndarray:
+    """후보(bool) 중 강한 에지 픽셀과 8-연결된 컴포넌트만 남긴 0/255 에지 맵"""
+    num_labels, labels = cv2.connectedComponents(candidates.view(np.uint8), connectivity=8)
+
+    strong = np.zeros(num_labels, dtype=bool)
+    strong[labels[strong_pixels]] = True
+    strong[0] = False
+    return apply_keep_table(labels, strong)
+
+
+@profiled('canny')
+def multi_threshold_canny(blurred: np.ndarray,
+                          pairs: Iterable[Tuple[float, float]]) -> np.ndarray:
+    """
+    여러 (low, high) 쌍에 대한 Canny 결과의 합집합
+
+    cv2.bitwise_or(cv2.Canny(b, l1, h1), cv2.Canny(b, l2, h2), ...) 와 동일합니다.
+    """
+    pairs = prune_threshold_pairs(pairs)
+    if not pairs:
+        return np.zeros(blurred.shape[:2], dtype=np.uint8)
+
+    # 지배되지 않는 쌍이 하나뿐이면 OpenCV 구현을 그대로 쓰는 편이 가장 빠름
+    if len(pairs) == 1:
+        low, high = pairs[0]
+        return cv2.Canny(blurred, low, high)
+
+    gradients = CannyGradients(blurred)
+    union = gradients.hysteresis(*pairs[0])
+    for low, high in pairs[1:]:
+        cv2.bitwise_or(union, gradients.hysteresis(low, high), dst=union)
+    return union
+
+
+@profiled('canny')
+def hysteresis_planes(blurred: np.ndarray,
+                      pairs: Iterable[Tuple[float, float]]) -> List[np.ndarray]:
+    """
+    (low, high) 쌍마다 히스테리시스 전의 후보/강한 픽셀 0/255 평면 [후보 1, 강한 픽셀 1, ...]
+
+    low == high 인 Canny 는 모든 후보가 강한 픽셀이라 NMS 를 통과한 m > t 픽셀을
+    그대로 돌려주므로 OpenCV 구현으로 계산합니다. 블러 이미지에 대한 반경 2 의 지역
+    연산이며, tiling.tiled_hysteresis 결과는 multi_threshold_canny(blurred, pairs) 와 같습니다.
+    """
+    planes = []
+    for low, high in prune_threshold_pairs(pairs):
+        planes += [cv2.Canny(blurred, low, low), cv2.Canny(blurred, high, high)]
+    return planes
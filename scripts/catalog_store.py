@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+도안 카탈로그 저장소 (SQLite, WAL 저널)
+
+생성/후처리 스크립트들이 coloring_pages.json 전체를 읽고 고쳐 통째로 다시 쓰면, 페이지를
+하나 추가할 때마다 전체 직렬화 비용이 들고(실행 전체로는 제곱), 여러 스크립트가 동시에
+돌면 마지막에 쓴 쪽이 다른 쪽의 변경을 지웁니다. 카탈로그는 이 저장소에 두고
+coloring_pages.json 은 저장소에서 내보낸 결과물로 취급합니다.
+
+    - 페이지 추가/수정은 행 단위 트랜잭션이라 페이지 수와 무관한 비용이며, WAL 모드와
+      busy timeout 덕분에 여러 프로세스가 동시에 등록해도 안전합니다.
+    - 페이지 id(기본 키), categoryId, imagePath 에 인덱스가 있습니다.
+    - 페이지 순서는 position 열로 정합니다. 배치는 reserve_positions 로 요청 수만큼 위치를
+      미리 받아 두므로, 완료 순서와 무관하게 요청 순서대로 내보내집니다.
+    - export_json 은 (position, id) 순서로 항상 같은 bytes 를 만들고, 임시 파일에 쓴 뒤
+      교체합니다 (image_io.write_bytes). 내용이 같으면 파일을 건드리지 않습니다.
+    - 저장소를 열 때 coloring_pages.json 이 마지막으로 내보낸 내용과 다르면(git pull,
+      직접 수정 등) JSON 을 다시 가져옵니다. 마지막 내보내기 이후 저장소에 등록/수정된
+      카테고리와 페이지(unexported 표)는 버리지 않고 가져온 내용 위에 다시 얹으며, JSON 에
+      같은 id 가 두 번 나오면 가져오지 않고 ValueError 로 알립니다.
+
+사용법:
+    python scripts/catalog_store.py stats
+    python scripts/catalog_store.py import    # coloring_pages.json 에서 다시 가져오기
+    python scripts/catalog_store.py export    # coloring_pages.json 다시 내보내기
+
+저장소 위치: <프로젝트 루트>/.cache/catalog.sqlite3 (CATALOG_DB 환경 변수로 변경 가능)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from conversion_cache import PROJECT_ROOT
+from image_io import write_bytes
+
+PAGES_JSON = PROJECT_ROOT / "assets" / "data" / "coloring_pages.json"
+DEFAULT_DB_PATH = PROJECT_ROOT / ".cache" / "catalog.sqlite3"
+
+# 다른 프로세스가 쓰기 잠금을 쥐고 있을 때 기다리는 최대 시간 (초)
+BUSY_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS categories (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    category_id TEXT,
+    image_path TEXT,
+    data TEXT NOT NULL
+);
+-- 마지막 export_json 이후 저장소에서 추가/수정된 행 (JSON 을 다시 가져올 때 보존)
+CREATE TABLE IF NOT EXISTS unexported (
+    tbl TEXT NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (tbl, id)
+);
+CREATE INDEX IF NOT EXISTS pages_position ON pages (position);
+CREATE INDEX IF NOT EXISTS pages_category ON pages (category_id);
+CREATE INDEX IF NOT EXISTS pages_image_path ON pages (image_path);
+"""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _page_key(page: Dict[str, Any]) -> str:
+    """페이지 기본 키 (id 가 없는 수동 항목은 imagePath)"""
+    key = page.get('id') or page.get('imagePath')
+    if not key:
+        raise ValueError(f"id 와 imagePath 가 모두 없는 페이지입니다: {page}")
+    return key
+
+
+def _check_unique(kind: str, keys: List[str], source: Path) -> None:
+    """JSON 안의 중복 id 를 알림 (그대로 가져오면 뒤 항목이 앞 항목을 조용히 덮어씀)"""
+    duplicates = sorted(key for key, count in Counter(keys).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"{source} 에 중복된 {kind} id 가 있어 가져오지 않습니다: "
+                         f"{', '.join(duplicates)}")
+
+
+def _upsert_page(db: sqlite3.Connection, page: Dict[str, Any], position: int) -> str:
+    """페이지 행 추가 (같은 id 가 있으면 내용을 바꾸고 위치는 유지), 키를 반환"""
+    key = _page_key(page)
+    db.execute(
+        "INSERT INTO pages (id, position, category_id, image_path, data) "
+        "VALUES (?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+        "category_id = excluded.category_id, image_path = excluded.image_path, "
+        "data = excluded.data",
+        (key, position, page.get('categoryId'), page.get('imagePath'), _dumps(page)))
+    return key
+
+
+def _mark_unexported(db: sqlite3.Connection, table: str, key: str) -> None:
+    db.execute("INSERT OR IGNORE INTO unexported (tbl, id) VALUES (?, ?)", (table, key))
+
+
+class CatalogStore:
+    """coloring_pages.json 의 categories/pages 를 담는 SQLite 저장소"""
+
+    def __init__(self, db_path: Optional[str] = None, json_path: Path = PAGES_JSON):
+        """
+        Args:
+            db_path: SQLite 파일 (None 이면 CATALOG_DB 또는 기본 위치)
+            json_path: 가져오고 내보낼 coloring_pages.json
+        """
+        self.db_path = Path(db_path or os.getenv("CATALOG_DB") or DEFAULT_DB_PATH)
+        self.json_path = Path(json_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 트랜잭션은 _write 에서 직접 연다 (BEGIN IMMEDIATE)
+        self._db = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self.sync_from_json()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> 'CatalogStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 트랜잭션 (시작할 때 쓰기 잠금을 잡아 읽고-고치는 사이 끼어들기를 막음)"""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._db.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                         "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (key, value))
+
+    # --- JSON 가져오기/내보내기 ---
+
+    def sync_from_json(self, force: bool = False) -> bool:
+        """
+        coloring_pages.json 이 마지막으로 내보낸(가져온) 내용과 다르면 저장소를 JSON 내용으로
+        다시 채웁니다. 가져왔으면 True.
+        JSON 이 없거나 깨져 있으면 저장소를 그대로 둡니다 (다음 내보내기가 JSON 을 복구).
+        마지막 내보내기 이후 저장소에서 추가/수정된 행은 JSON 내용보다 우선해 유지하고
+        (JSON 에 없는 페이지는 맨 뒤에), 중복 id 가 있는 JSON 은 ValueError 를 던집니다.
+        """
+        if not self.json_path.exists():
+            return False
+        with self._write() as db:
+            raw = self.json_path.read_bytes()
+            digest = _digest(raw)
+            if not force and self._meta('json_digest') == digest:
+                return False
+            try:
+                config = json.loads(raw)
+            except json.JSONDecodeError:
+                return False
+            categories = config.get('categories', [])
+            pages = config.get('pages', [])
+            _check_unique('카테고리', [category['id'] for category in categories], self.json_path)
+            _check_unique('페이지', [_page_key(page) for page in pages], self.json_path)
+            kept_categories = self._unexported_rows('categories')
+            kept_pages = self._unexported_rows('pages')
+
+            db.execute("DELETE FROM categories")
+            db.execute("DELETE FROM pages")
+            for position, category in enumerate(categories):
+                db.execute("INSERT INTO categories (id, position, data) VALUES (?, ?, ?)",
+                           (category['id'], position, _dumps(category)))
+            for position, page in enumerate(pages):
+                _upsert_page(db, page, position)
+
+            # 아직 내보내지 않은 저장소 변경을 다시 얹음 (JSON 에 없으면 맨 뒤에 추가)
+            json_categories = {category['id']: category for category in categories}
+            json_pages = {_page_key(page): page for page in pages}
+            merged = []
+            for category in kept_categories:
+                if json_categories.get(category['id']) == category:
+                    continue
+                db.execute("INSERT INTO categories (id, position, data) "
+                           "SELECT ?, COALESCE(MAX(position) + 1, 0), ? FROM categories "
+                           "WHERE true ON CONFLICT (id) DO UPDATE SET data = excluded.data",
+                           (category['id'], _dumps(category)))
+                merged.append(category['id'])
+            position = len(pages)
+            for page in kept_pages:
+                key = _page_key(page)
+                if json_pages.get(key) == page:
+                    continue
+                # JSON 에 있는 페이지는 JSON 의 위치를 유지하고 내용만 바꿈
+                _upsert_page(db, page, position)
+                if key not in json_pages:
+                    position += 1
+                merged.append(key)
+
+            extra = {k: v for k, v in config.items() if k not in ('categories', 'pages')}
+            self._set_meta('extra', _dumps(extra))
+            next_position = max(position, int(self._meta('next_position', '0')))
+            self._set_meta('next_position', str(next_position))
+            self._set_meta('json_digest', digest)
+        if merged:
+            print(f"⚠️  {self.json_path.name} 을 다시 가져오면서 아직 내보내지 않은 저장소 변경 "
+                  f"{len(merged)}개를 유지했습니다: {', '.join(merged)}")
+        return True
+
+    def _unexported_rows(self, table: str) -> List[Dict[str, Any]]:
+        """마지막 내보내기 이후 추가/수정된 행들 (위치 순)"""
+        rows = self._db.execute(
+            f"SELECT t.data FROM {table} t JOIN unexported u ON u.tbl = ? AND u.id = t.id "
+            "ORDER BY t.position, t.id", (table,))
+        return [json.loads(data) for data, in rows]
+
+    def to_config(self) -> Dict[str, Any]:
+        """coloring_pages.json 구조 ({'categories': [...], 'pages': [...], ...})"""
+        config = {
+            'categories': self.categories(),
+            'pages': self.pages(),
+        }
+        config.update(json.loads(self._meta('extra', '{}')))
+        return config
+
+    def export_json(self, path: Optional[Path] = None) -> bool:
+        """
+        저장소 내용을 JSON 으로 원자적으로 내보냅니다.
+        같은 저장소 내용이면 항상 같은 bytes 이며, 파일 내용이 이미 같으면 쓰지 않습니다.
+        쓴 경우 True.
+        """
+        path = Path(path or self.json_path)
+        with self._write():
+            # 쓰기 잠금 안에서 읽어 다른 프로세스의 등록과 내보내기 순서가 엇갈리지 않게 함
+            data = json.dumps(self.to_config(), indent=2, ensure_ascii=False).encode('utf-8')
+            digest = _digest(data)
+            if path == self.json_path:
+                self._set_meta('json_digest', digest)
+                self._db.execute("DELETE FROM unexported")
+            if path.exists() and _digest(path.read_bytes()) == digest:
+                return False
+            write_bytes(str(path), data)
+        return True
+
+    # --- 카테고리 ---
+
+    def categories(self) -> List[Dict[str, Any]]:
+        rows = self._db.execute("SELECT data FROM categories ORDER BY position, id")
+        return [json.loads(data) for data, in rows]
+
+    def has_category(self, category_id: str) -> bool:
+        return self._db.execute("SELECT 1 FROM categories WHERE id = ?",
+                                (category_id,)).fetchone() is not None
+
+    def add_category(self, category: Dict[str, Any]) -> bool:
+        """카테고리를 맨 뒤에 추가합니다. 이미 있으면 그대로 두고 False."""
+        with self._write() as db:
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO categories (id, position, data) "
+                "SELECT ?, COALESCE(MAX(position) + 1, 0), ? FROM categories",
+                (category['id'], _dumps(category)))
+            if cursor.rowcount > 0:
+                _mark_unexported(db, 'categories', category['id'])
+        return cursor.rowcount > 0
+
+    # --- 페이지 ---
+
+    def pages(self, category_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        if category_id is None:
+            rows = self._db.execute("SELECT data FROM pages ORDER BY position, id")
+        else:
+            rows = self._db.execute("SELECT data FROM pages WHERE category_id = ? "
+                                    "ORDER BY position, id", (category_id,))
+        return [json.loads(data) for data, in rows]
+
+    def page_count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def has_page(self, page_id: str) -> bool:
+        return self._db.execute("SELECT 1 FROM pages WHERE id = ?",
+                                (page_id,)).fetchone() is not None
+
+    def reserve_positions(self, count: int) -> int:
+        """
+        페이지 위치 count 개를 연속으로 예약하고 첫 위치를 반환합니다.
+        동시에 도는 다른 프로세스와 겹치지 않습니다.
+        """
+        with self._write():
+            start = int(self._meta('next_position', '0'))
+            self._set_meta('next_position', str(start + count))
+        return start
+
+    def add_page(self, page: Dict[str, Any], position: Optional[int] = None) -> None:
+        """
+        페이지를 추가합니다 (같은 id 가 있으면 내용을 바꾸고 위치는 유지).
+        position 이 없으면 맨 뒤에 둡니다.
+        """
+        if position is None:
+            position = self.reserve_positions(1)
+        with self._write() as db:
+            _mark_unexported(db, 'pages', _upsert_page(db, page, position))
+
+    def update_pages(self, changes: Dict[str, Dict[str, Any]]) -> int:
+        """
+        {imagePath: {키: 값}} 을 해당 페이지들에 반영하고, 실제로 바뀐 페이지 수를 반환합니다.
+        ('imagePath' 키를 바꾸면 인덱스도 함께 바뀜)
+        """
+        updated = 0
+        with self._write() as db:
+            for image_path, fields in changes.items():
+                rows = db.execute("SELECT id, data FROM pages WHERE image_path = ?",
+                                  (image_path,)).fetchall()
+                for page_id, data in rows:
+                    page = json.loads(data)
+                    if all(page.get(key) == value for key, value in fields.items()):
+                        continue
+                    page.update(fields)
+                    db.execute("UPDATE pages SET category_id = ?, image_path = ?, data = ? "
+                               "WHERE id = ?",
+                               (page.get('categoryId'), page.get('imagePath'),
+                                _dumps(page), page_id))
+                    _mark_unexported(db, 'pages', page_id)
+                    updated += 1
+        return updated
+
+
+def open_catalog(db_path: Optional[str] = None, json_path: Path = PAGES_JSON) -> CatalogStore:
+    """저장소를 열고 coloring_pages.json 과 맞춥니다 (with 문으로 사용)"""
+    return CatalogStore(db_path, json_path)
+
+
+def apply_page_updates(changes: Dict[str, Dict[str, Any]],
+                       json_path: Path = PAGES_JSON) -> int:
+    """update_pages 후 바뀐 것이 있으면 JSON 을 내보내고 바뀐 페이지 수를 반환"""
+    if not changes:
+        return 0
+    with open_catalog(json_path=json_path) as catalog:
+        updated = catalog.update_pages(changes)
+        if updated:
+            catalog.export_json()
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도안 카탈로그 저장소 관리")
+    parser.add_argument('command', choices=['stats', 'import', 'export'])
+    parser.add_argument('--db', default=None, help='SQLite 파일')
+    parser.add_argument('--json', default=str(PAGES_JSON),
+                        help='coloring_pages.json 경로')
+    args = parser.parse_args()
+
+    with open_catalog(args.db, Path(args.json)) as catalog:
+        if args.command == 'import':
+            catalog.sync_from_json(force=True)
+            print(f"📥 {catalog.json_path} 에서 가져옴")
+        elif args.command == 'export':
+            written = catalog.export_json()
+            print(f"📤 {catalog.json_path} {'내보냄' if written else '변경 없음'}")
+        print(f"📚 저장소: {catalog.db_path}")
+        print(f"   카테고리: {len(catalog.categories())}개, 페이지: {catalog.page_count()}개")
+        for category in catalog.categories():
+            print(f"   - {category['id']}: {len(catalog.pages(category['id']))}개")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+변환 결과 캐시 (입력 내용 해시 + 스타일 + 파라미터 + 파이프라인 버전 기반)
+
+원본 파일 내용과 변환 설정이 같으면 이전에 만든 PNG 를 그대로 복사(또는 링크)해
+변환을 건너뜁니다. 캐시는 크기 상한을 넘으면 가장 오래 사용하지 않은 항목부터
+지웁니다(LRU, 파일 mtime 을 마지막 사용 시각으로 사용).
+
+사용법:
+    python scripts/conversion_cache.py stats
+    python scripts/conversion_cache.py prune [--max-size 2G]
+
+캐시 위치: <프로젝트 루트>/.cache/conversions (CONVERSION_CACHE_DIR 환경 변수로 변경 가능)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".cache" / "conversions"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GiB
+
+_SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def parse_size(text: str) -> int:
+    """'500M', '2G', '1048576' 형태의 크기 문자열을 바이트로 변환"""
+    text = text.strip().upper().rstrip('B')
+    unit = text[-1] if text and text[-1] in _SIZE_UNITS else ''
+    number = text[:-1] if unit else text
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def format_size(num_bytes: float) -> str:
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """파일 내용의 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """내용 주소 기반 변환 결과 캐시"""
+
+    def __init__(self, root: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES, link: bool = False):
+        """
+        Args:
+            root: 캐시 디렉토리 (None 이면 CONVERSION_CACHE_DIR 또는 기본 위치)
+            max_bytes: prune 시 유지할 최대 크기
+            link: 적중 시 복사 대신 하드 링크 사용
+                  (출력 파일을 제자리에서 덮어쓰는 작업이 있으면 캐시가 오염되므로 주의)
+        """
+        self.root = Path(root or os.getenv("CONVERSION_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.objects = self.root / "objects"
+        self.max_bytes = max_bytes
+        self.link = link
+
+    @staticmethod
+    def make_key(input_digest: str, style: str, params: Dict,
+                 pipeline_version: str) -> str:
+        """입력 해시, 스타일, 전체 파라미터, 파이프라인 버전으로 캐시 키 생성"""
+        payload = json.dumps(
+            {'input': input_digest, 'style': style,
+             'params': params, 'version': pipeline_version},
+            sort_keys=True, separators=(',', ':'), default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _object_path(self, key: str) -> Path:
+        return self.objects / key[:2] / f"{key}.png"
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """캐시 적중 시 결과를 output_path 로 복사(또는 링크)하고 True 반환"""
+        cached = self._object_path(key)
+        if not cached.exists():
+            return False
+        try:
+            if os.path.lexists(output_path):
+                os.remove(output_path)
+            if self.link:
+                try:
+                    os.link(cached, output_path)
+                except OSError:
+                    shutil.copyfile(cached, output_path)
+            else:
+                shutil.copyfile(cached, output_path)
+            # 마지막 사용 시각 갱신 (LRU)
+            os.utime(cached, None)
+            return True
+        except OSError:
+            return False
+
+    def store(self, key: str, output_path: str) -> None:
+        """변환 결과 파일을 캐시에 저장 (임시 파일 + rename 으로 원자적 기록)"""
+        target = self._object_path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(output_path, tmp_path)
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        if not self.objects.exists():
+            return entries
+        for path in self.objects.glob("*/*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def stats(self) -> Dict[str, float]:
+        """항목 수, 전체 크기, 가장 오래된/최근 사용 시각"""
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'oldest': min((m for m, _, _ in entries), default=0.0),
+            'newest': max((m for m, _, _ in entries), default=0.0),
+        }
+
+    def prune(self, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """
+        전체 크기가 max_bytes 이하가 될 때까지 가장 오래 사용하지 않은 항목을 삭제
+
+        Returns:
+            (삭제한 항목 수, 삭제한 바이트 수)
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        removed = removed_bytes = 0
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            removed_bytes += size
+        # 남은 임시 파일 정리 (중단된 store)
+        if self.objects.exists():
+            for tmp in self.objects.glob("*/*.tmp"):
+                if time.time() - tmp.stat().st_mtime > 3600:
+                    tmp.unlink()
+        return removed, removed_bytes
+
+
+def cached_convert(cache: Optional[ConversionCache], input_path: str,
+                   outputs: Dict[str, str], params: Dict[str, Dict],
+                   pipeline_version: str,
+                   convert: Callable[[Dict[str, str]], Dict[str, bool]]
+                   ) -> Tuple[Dict[str, bool], List[str]]:
+    """
+    캐시를 거쳐 한 입력을 여러 스타일로 변환합니다.
+
+    Args:
+        cache: ConversionCache (None 이면 캐시 없이 convert 만 호출)
+        input_path: 입력 이미지 경로
+        outputs: {스타일: 출력 경로}
+        params: {스타일: 결과에 영향을 주는 전체 파라미터}
+        pipeline_version: 알고리즘이 바뀌면 올리는 버전 문자열
+        convert: 캐시에 없는 {스타일: 출력 경로} 를 변환하는 함수
+
+    Returns:
+        ({스타일: 성공 여부}, 캐시에서 가져온 스타일 목록)
+    """
+    if cache is None:
+        return convert(outputs), []
+
+    try:
+        digest = file_digest(input_path)
+    except OSError:
+        return convert(outputs), []
+
+    keys = {
+        style: ConversionCache.make_key(digest, style, params.get(style, {}),
+                                        pipeline_version)
+        for style in outputs
+    }
+    hits = [style for style, path in outputs.items() if cache.fetch(keys[style], path)]
+    missing = {style: path for style, path in outputs.items() if style not in hits}
+
+    results = {style: True for style in hits}
+    if missing:
+        converted = convert(missing)
+        results.update(converted)
+        for style, ok in converted.items():
+            if ok:
+                try:
+                    cache.store(keys[style], missing[style])
+                except OSError as e:
+                    print(f"  ⚠️ 캐시 저장 실패 ({style}): {e}")
+    return results, hits
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """변환 스크립트 공통 캐시 옵션"""
+    parser.add_argument('--no-cache', action='store_true',
+                        help='변환 결과 캐시를 사용하지 않음')
+    parser.add_argument('--cache-max-size', type=parse_size, default=DEFAULT_MAX_BYTES,
+                        metavar='SIZE', help='캐시 최대 크기 (예: 500M, 2G, 기본값 2G)')
+
+
+def cache_from_args(args: argparse.Namespace) -> Optional[ConversionCache]:
+    if args.no_cache:
+        return None
+    return ConversionCache(max_bytes=args.cache_max_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="변환 결과 캐시 관리")
+    parser.add_argument('command', choices=['stats', 'prune'])
+    parser.add_argument('--max-size', type=parse_size, default=DEFAULT_MAX_BYTES,
+                        metavar='SIZE', help='prune 후 유지할 최대 크기 (기본값 2G)')
+    parser.add_argument('--cache-dir', default=None, help='캐시 디렉토리')
+    args = parser.parse_args()
+
+    cache = ConversionCache(args.cache_dir, max_bytes=args.max_size)
+
+    if args.command == 'stats':
+        stats = cache.stats()
+        print(f"📦 캐시 위치: {cache.root}")
+        print(f"   항목 수: {stats['entries']}개")
+        print(f"   크기: {format_size(stats['bytes'])} / {format_size(stats['max_bytes'])}")
+        if stats['entries']:
+            fmt = "%Y-%m-%d %H:%M:%S"
+            print(f"   가장 오래된 사용: {time.strftime(fmt, time.localtime(stats['oldest']))}")
+            print(f"   가장 최근 사용: {time.strftime(fmt, time.localtime(stats['newest']))}")
+    else:
+        removed, removed_bytes = cache.prune()
+        print(f"🧹 {removed}개 항목 삭제 ({format_size(removed_bytes)})")
+        print(f"   남은 크기: {format_size(cache.stats()['bytes'])}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,8 @@
 이미지를 컬러링북 도안 스타일로 변환하는 Python 스크립트
 
 사용법:
-    python convert_to_coloring.py
+    python convert_to_coloring.py [--jobs N] [--no-cache] [--cache-max-size SIZE]
+                                  [--profile TRACE.json]
 
 필요한 패키지 설치:
     pip install opencv-python numpy pillow
@@ -13,9 +14,11 @@
     assets/images 폴더에 저장합니다.
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 try:
     import cv2
@@ -27,6 +30,19 @@ except ImportError as e:
     print("  pip install opencv-python numpy pillow")
     sys.exit(1)
 
+from batch_executor import add_jobs_argument, resolve_jobs, run_batch, split_tasks
+from conversion_cache import (
+    ConversionCache, add_cache_arguments, cache_from_args, cached_convert
+)
+from image_io import ImageSource, encode_png, load_image, write_image
+from pipeline_recipes import run_recipe
+from stage_graph import StageGraph
+import stage_profiler
+from stage_profiler import add_profile_argument
+
+# 변환 결과 캐시 키에 들어가는 파이프라인 버전 (알고리즘이 바뀌면 올릴 것)
+PIPELINE_VERSION = "basic-2"
+
 
 def convert_to_coloring_book(image_path: str, output_path: str, 
                               line_thickness: int = 2,
@@ -59,25 +75,11 @@ def convert_to_coloring_book(image_path: str, output_path: str,
         # 그레이스케일 변환
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         
-        # 노이즈 제거를 위한 가우시안 블러
-        if blur_strength % 2 == 0:
-            blur_strength += 1
-        blurred = cv2.GaussianBlur(gray, (blur_strength, blur_strength), 0)
-        
-        # Canny 에지 검출
-        edges = cv2.Canny(blurred, edge_low, edge_high)
-        
-        # 선 두께 조절 (모폴로지 연산)
-        if line_thickness > 1:
-            kernel = np.ones((line_thickness, line_thickness), np.uint8)
-            edges = cv2.dilate(edges, kernel, iterations=1)
-        
-        # 반전 (흰 배경에 검은 선)
-        if invert:
-            edges = cv2.bitwise_not(edges)
+        edges = basic_lines(gray, line_thickness, blur_strength,
+                            edge_low, edge_high, invert)
         
         # 저장
-        cv2.imwrite(output_path, edges)
+        write_image(output_path, edges)
         return True
         
     except Exception as e:
@@ -85,6 +87,18 @@ def convert_to_coloring_book(image_path: str, output_path: str,
         return False
 
 
+def basic_lines(gray: np.ndarray,
+                line_thickness: int = 2,
+                blur_strength: int = 5,
+                edge_low: int = 30,
+                edge_high: int = 100,
+                invert: bool = True) -> np.ndarray:
+    """기본 방식 (Canny 에지 검출) 의 그레이스케일 → 도안 처리 (recipes/basic.json)"""
+    return run_recipe('basic', gray, line_thickness=line_thickness,
+                      blur_strength=blur_strength, edge_low=edge_low,
+                      edge_high=edge_high, invert=invert)
+
+
 def convert_to_coloring_book_advanced(image_path: str, output_path: str) -> bool:
     """
     고급 방식: 적응형 임계값과 윤곽선 추출을 사용한 변환
@@ -107,25 +121,10 @@ def convert_to_coloring_book_advanced(image_path: str, output_path: str) -> bool
         # 그레이스케일 변환
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         
-        # 양방향 필터로 노이즈 제거 (에지는 보존)
-        filtered = cv2.bilateralFilter(gray, 9, 75, 75)
-        
-        # 적응형 임계값 적용
-        adaptive_thresh = cv2.adaptiveThreshold(
-            filtered, 255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY,
-            blockSize=11,
-            C=2
-        )
-        
-        # 작은 노이즈 제거
-        kernel = np.ones((2, 2), np.uint8)
-        cleaned = cv2.morphologyEx(adaptive_thresh, cv2.MORPH_CLOSE, kernel)
-        cleaned = cv2.morphologyEx(cleaned, cv2.MORPH_OPEN, kernel)
+        cleaned = advanced_lines(gray)
         
         # 저장
-        cv2.imwrite(output_path, cleaned)
+        write_image(output_path, cleaned)
         return True
         
     except Exception as e:
@@ -133,6 +132,11 @@ def convert_to_coloring_book_advanced(image_path: str, output_path: str) -> bool
         return False
 
 
+def advanced_lines(gray: np.ndarray) -> np.ndarray:
+    """고급 방식 (적응형 임계값) 의 그레이스케일 → 도안 처리 (recipes/advanced.json)"""
+    return run_recipe('advanced', gray)
+
+
 def convert_to_coloring_book_sketch(image_path: str, output_path: str) -> bool:
     """
     스케치 스타일 변환: 연필 스케치 느낌의 도안 생성
@@ -154,23 +158,10 @@ def convert_to_coloring_book_sketch(image_path: str, output_path: str) -> bool:
         # 그레이스케일 변환
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         
-        # 반전
-        inverted = cv2.bitwise_not(gray)
-        
-        # 가우시안 블러
-        blurred = cv2.GaussianBlur(inverted, (21, 21), 0)
-        
-        # 블렌딩으로 스케치 효과 생성
-        sketch = cv2.divide(gray, cv2.bitwise_not(blurred), scale=256.0)
-        
-        # 대비 향상
-        sketch = cv2.convertScaleAbs(sketch, alpha=1.2, beta=10)
-        
-        # 이진화로 깨끗한 선 추출
-        _, binary_sketch = cv2.threshold(sketch, 240, 255, cv2.THRESH_BINARY)
+        binary_sketch = sketch_lines(gray)
         
         # 저장
-        cv2.imwrite(output_path, binary_sketch)
+        write_image(output_path, binary_sketch)
         return True
         
     except Exception as e:
@@ -178,7 +169,113 @@ def convert_to_coloring_book_sketch(image_path: str, output_path: str) -> bool:
         return False
 
 
+def sketch_lines(gray: np.ndarray) -> np.ndarray:
+    """스케치 방식의 그레이스케일 → 도안 처리 (recipes/sketch.json)"""
+    return run_recipe('sketch', gray)
+
+
+# 방식 이름 → 그레이스케일 → 도안 처리 함수
+METHODS = {
+    'basic': basic_lines,
+    'advanced': advanced_lines,
+    'sketch': sketch_lines,
+}
+
+
+def convert_image(image: ImageSource, method: str = 'basic') -> np.ndarray:
+    """
+    디스크 입출력 없이 도안 배열을 반환합니다. (실패 시 예외 발생)
+    
+    Args:
+        image: 인코딩된 이미지 bytes, BGR ndarray 또는 파일 경로
+        method: 'basic', 'advanced', 'sketch' 중 하나
+    """
+    gray = cv2.cvtColor(load_image(image), cv2.COLOR_BGR2GRAY)
+    return METHODS[method](gray)
+
+
+def convert_bytes(data: bytes, method: str = 'basic') -> bytes:
+    """인코딩된 이미지 bytes 를 도안으로 변환해 PNG bytes 로 반환"""
+    return encode_png(convert_image(data, method))
+
+
+def build_stage_graph() -> StageGraph:
+    """세 가지 변환 방식이 디코드/그레이스케일 단계를 공유하는 단계 그래프"""
+    graph = StageGraph()
+    graph.add('image', cv2.imread, 'image_path')
+    graph.add('gray', lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), 'image')
+    for method, lines in METHODS.items():
+        graph.add(method, lines, 'gray')
+    return graph
+
+
+def convert_all_methods(graph: StageGraph, image_path: str,
+                        outputs: Dict[str, str]) -> Dict[str, bool]:
+    """
+    한 이미지를 여러 방식으로 변환합니다. (디코드/그레이스케일은 한 번만 수행)
+    
+    Args:
+        graph: build_stage_graph() 로 만든 단계 그래프
+        image_path: 입력 이미지 경로
+        outputs: {방식 이름('basic', 'advanced', 'sketch'): 출력 경로}
+    
+    Returns:
+        {방식 이름: 성공 여부}
+    """
+    results = {method: False for method in outputs}
+    memo = graph.memo(image_path=image_path)
+    
+    if memo.get('image') is None:
+        print(f"  ❌ 이미지를 읽을 수 없습니다: {image_path}")
+        return results
+    
+    for method, output_path in outputs.items():
+        try:
+            result = memo.get(method)
+            write_image(output_path, result)
+            results[method] = True
+        except Exception as e:
+            print(f"  ❌ 변환 중 오류 발생: {e}")
+    
+    return results
+
+
+_worker_graph: Optional[StageGraph] = None
+
+
+def _convert_task(task: Tuple[str, Dict[str, str], Optional[str], bool]):
+    """
+    워커 프로세스에서 실행되는 작업: 한 이미지를 주어진 방식들로 변환
+    
+    task: (입력 경로, {방식 이름: 출력 경로}, 캐시 디렉토리 또는 None, 계측 여부)
+    
+    Returns:
+        ({방식 이름: 성공 여부}, 이 작업의 단계별 적중/미스 카운터, 캐시에서 가져온 방식,
+         계측 이벤트 목록)
+    """
+    global _worker_graph
+    if _worker_graph is None:
+        _worker_graph = build_stage_graph()
+    
+    input_path, outputs, cache_dir, profile = task
+    _worker_graph.reset_counters()
+    if profile:
+        stage_profiler.enable()
+    cache = ConversionCache(cache_dir) if cache_dir else None
+    results, hits = cached_convert(
+        cache, input_path, outputs, {}, PIPELINE_VERSION,
+        lambda pending: convert_all_methods(_worker_graph, input_path, pending)
+    )
+    return results, _worker_graph.snapshot_counters(), hits, stage_profiler.collect()
+
+
 def main():
+    parser = argparse.ArgumentParser(description="컬러링북 도안 변환기")
+    add_jobs_argument(parser)
+    add_cache_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    
     # 프로젝트 루트 경로 설정
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
@@ -197,11 +294,11 @@ def main():
     # 지원 이미지 확장자
     supported_extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.webp', '.tiff'}
     
-    # 이미지 파일 목록 가져오기
-    image_files = [
+    # 이미지 파일 목록 가져오기 (실행마다 같은 순서)
+    image_files = sorted(
         f for f in raw_image_dir.iterdir()
         if f.is_file() and f.suffix.lower() in supported_extensions
-    ]
+    )
     
     if not image_files:
         print(f"❌ 변환할 이미지가 없습니다.")
@@ -235,49 +332,58 @@ def main():
     
     success_count = 0
     fail_count = 0
+    cache_hits = 0
+    graph = build_stage_graph()
+    cache = cache_from_args(args)
+    profile_events = []
     
-    for i, image_file in enumerate(image_files, 1):
-        print(f"\n[{i}/{len(image_files)}] 처리 중: {image_file.name}")
+    choice_methods = {
+        "1": ["basic"],
+        "2": ["advanced"],
+        "3": ["sketch"],
+        "4": ["basic", "advanced", "sketch"],  # 모든 방식으로 변환
+    }
+    
+    def output_name(base_name: str, method_name: str) -> str:
+        if choice == "4":
+            return f"{base_name}_{method_name}.png"
+        return f"{base_name}_coloring.png"
+    
+    # 이미지(및 방식 변형)를 워커 프로세스에 분배, 결과는 입력 순서대로 출력
+    tasks = [
+        (str(image_file),
+         {method_name: str(output_dir / output_name(image_file.stem, method_name))
+          for method_name in task_methods},
+         str(cache.root) if cache else None,
+         bool(args.profile))
+        for image_file, task_methods in split_tasks(
+            image_files, choice_methods[choice], args.jobs
+        )
+    ]
+    jobs = resolve_jobs(args.jobs, len(tasks))
+    print(f"⚙️  워커 프로세스: {jobs}개")
+    
+    for i, (task, outcome) in enumerate(run_batch(_convert_task, tasks, jobs), 1):
+        input_path, outputs = task[:2]
+        print(f"\n[{i}/{len(tasks)}] 처리 중: {Path(input_path).name}")
         
-        input_path = str(image_file)
-        base_name = image_file.stem
+        if not outcome.ok:
+            print(f"  ❌ 변환 중 오류 발생: {outcome.error}")
+            fail_count += len(outputs)
+            continue
         
-        if choice == "4":
-            # 모든 방식으로 변환
-            methods = [
-                ("basic", convert_to_coloring_book),
-                ("advanced", convert_to_coloring_book_advanced),
-                ("sketch", convert_to_coloring_book_sketch),
-            ]
-            
-            for method_name, method_func in methods:
-                output_filename = f"{base_name}_{method_name}.png"
-                output_path = str(output_dir / output_filename)
-                
-                if method_name == "basic":
-                    result = method_func(input_path, output_path)
-                else:
-                    result = method_func(input_path, output_path)
-                
-                if result:
-                    print(f"  ✅ {method_name}: {output_filename}")
-                    success_count += 1
+        results, counters, hits, events = outcome.value
+        graph.merge_counters(counters)
+        profile_events.extend(events)
+        cache_hits += len(hits)
+        
+        for method_name, output_path in outputs.items():
+            if results[method_name]:
+                cached = " (캐시)" if method_name in hits else ""
+                if choice == "4":
+                    print(f"  ✅ {method_name}: {Path(output_path).name}{cached}")
                 else:
-                    fail_count += 1
-        else:
-            # 선택된 방식으로 변환
-            output_filename = f"{base_name}_coloring.png"
-            output_path = str(output_dir / output_filename)
-            
-            if choice == "1":
-                result = convert_to_coloring_book(input_path, output_path)
-            elif choice == "2":
-                result = convert_to_coloring_book_advanced(input_path, output_path)
-            else:  # choice == "3"
-                result = convert_to_coloring_book_sketch(input_path, output_path)
-            
-            if result:
-                print(f"  ✅ 저장됨: {output_filename}")
+                    print(f"  ✅ 저장됨: {Path(output_path).name}{cached}")
                 success_count += 1
             else:
                 fail_count += 1
@@ -287,6 +393,16 @@ def main():
     print(f"   ✅ 성공: {success_count}개")
     print(f"   ❌ 실패: {fail_count}개")
     print(f"   📂 출력 폴더: {output_dir}")
+    if cache:
+        removed, _ = cache.prune()
+        print(f"   ♻️ 캐시 적중: {cache_hits}개 (LRU 정리: {removed}개 삭제)")
+    if choice == "4":
+        print("-" * 60)
+        print("🔁 단계별 캐시 적중/미스")
+        print(graph.format_counters())
+    if args.profile:
+        print("-" * 60)
+        stage_profiler.report(profile_events, args.profile)
     print("=" * 60)
 
 
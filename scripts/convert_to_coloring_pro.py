@@ -3,7 +3,10 @@
 고품질 컬러링북 도안 변환기 (Pro 버전)
 
 사용법:
-    python convert_to_coloring_pro.py
+    python convert_to_coloring_pro.py [--jobs N] [--tile PX]
+                                      [--denoise exact|fast|none] [--compare-denoise]
+                                      [--no-cache] [--cache-max-size SIZE]
+                                      [--force] [--prune-orphans] [--profile TRACE.json]
 
 필요한 패키지:
     pip install opencv-python numpy pillow scipy
@@ -13,12 +16,15 @@
     - 노이즈 제거 및 선 정리
     - 부드러운 곡선 처리
     - 다양한 스타일 옵션
+    - 품질 지표로 이미지마다 스타일을 고르는 Auto 모드 (style_metrics.py)
 """
 
+import argparse
 import os
 import sys
+import time
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
 try:
     import cv2
@@ -31,11 +37,102 @@ except ImportError as e:
     print("  pip install opencv-python numpy pillow scipy")
     sys.exit(1)
 
+from batch_executor import (
+    add_jobs_argument, default_jobs, resolve_jobs, run_batch, split_tasks
+)
+from batch_manifest import SKIP_ALREADY_PROCESSED, SKIP_UNCHANGED, BatchManifest
+from canny_engine import hysteresis_planes, multi_threshold_canny
+from component_filter import filter_components
+from conversion_cache import (
+    ConversionCache, add_cache_arguments, cache_from_args, cached_convert
+)
+from gap_closing import DEFAULT_MAX_GAP, GapReport, close_gaps
+from image_io import ImageSource, encode_png, load_image, write_image
+from stage_graph import StageGraph
+import stage_profiler
+from stage_profiler import add_profile_argument, profile_stage, profiled
+from style_metrics import choose_style, format_scores, scored_metrics
+from svg_export import (
+    DEFAULT_TOLERANCE as SVG_TOLERANCE, VECTOR_DIR, export_svg_file,
+    format_stats as format_svg_stats
+)
+from tiling import process_tiled, tiled_hysteresis, tiled_max
+
+# 변환 결과 캐시 키에 들어가는 파이프라인 버전 (알고리즘이 바뀌면 올릴 것)
+PIPELINE_VERSION = "pro-3"
+
+# multi_scale_edge_detection 의 블러 크기와 Canny (low, high) 임계값 쌍
+EDGE_BLUR_SIZES = [3, 5, 7]
+CANNY_THRESHOLD_PAIRS = [(20, 80), (40, 120), (60, 160)]
+
+# Pro 스타일별 최종 에지 단계 (stage graph 의 단계 이름)
+PRO_STYLE_EDGES = {
+    'clean': 'xdog_clean',          # 깔끔한 스타일: XDoG
+    'detailed': 'edges_detailed',   # 세밀한 스타일: 다중 스케일 + Sobel
+    'balanced': 'edges_balanced',   # 균형잡힌 스타일: 다중 에지 가중 조합
+    'artistic': 'xdog_artistic',    # 예술적 스타일: XDoG 변형
+}
+
+# 지원하는 전체 스타일 (Pro 4종 + Ultra)
+STYLES = list(PRO_STYLE_EDGES) + ['ultra']
+
+# 'auto' 스타일: 이미지마다 이 후보들을 모두 변환해 품질 지표 벌점이 가장 낮은 것을 선택
+AUTO_STYLE = 'auto'
+AUTO_CANDIDATES = STYLES
+
+# 노이즈 제거/전처리 품질 단계
+DENOISE_TIERS = ['exact', 'fast', 'none']
+
+# 타일 처리 halo 계산용 커널 반경 (px, 'exact' 단계 기준이며 다른 단계는 더 작음)
+TILE_PRE_RADIUS = {
+    'pro': 4,           # 양방향 필터 d=9
+    'ultra': 10 + 3 + 4,  # NLM 검색 창 21/2 + 템플릿 7/2 + 양방향 필터
+}
+# (다중 스케일 Canny 는 히스테리시스 때문에 tiled_multi_scale_edges 에서 따로 계산하므로 제외)
+TILE_EDGE_RADIUS = {
+    'clean': 3,         # XDoG 가우시안 (sigma*k = 0.56)
+    'detailed': 1,      # Sobel 3x3
+    'balanced': 2,      # 블러 3x3 + Laplacian
+    'artistic': 5,      # XDoG 가우시안 (sigma*k = 1.2)
+    'ultra': 4,         # XDoG 가우시안 (sigma*k = 0.8)
+}
+TILE_FINISH_RADIUS = {
+    'pro': 5,           # 열기 2x2 + 닫기 3x3 + 팽창 2x2 + 블러 3x3
+    'ultra': 4,         # 닫기 2x2 + 팽창/침식 2x2 + 블러 3x3
+}
+# 연결 컴포넌트 필터: min_size 미만 컴포넌트는 한 변이 min_size 보다 짧으므로
+# min_size 만큼 여유가 있으면 타일에서도 전체 이미지와 같은 판정을 받음
+TILE_CONTEXT_MARGIN = {
+    'pro': 30,          # remove_small_components(min_size=30)
+    'ultra': 40,        # remove_small_components(min_size=40)
+}
+# 다중 스케일 Canny 에지를 쓰는 스타일의 단계 이름 (타일 처리 시 미리 계산해 주입)
+TILE_CANNY_STAGES = {
+    'detailed': 'multi_edges',
+    'balanced': 'multi_edges',
+    'ultra': 'multi_edges_denoised',
+}
+
 
 class ColoringBookConverter:
     """고품질 컬러링북 변환기 클래스"""
     
-    def __init__(self):
+    def __init__(self, denoise_tier: str = 'exact'):
+        """
+        Args:
+            denoise_tier: 노이즈 제거/전처리 단계 (DENOISE_TIERS 참고)
+                - 'exact': 기존 품질 (NLM 노이즈 제거 + 양방향 필터 d=9)
+                - 'fast': 저렴한 에지 보존 필터로 대체 (양방향 필터 d=5)
+                - 'none': 노이즈 제거/평활화 생략 (CLAHE 만 적용)
+        """
+        if denoise_tier not in DENOISE_TIERS:
+            raise ValueError(f"지원하지 않는 denoise 단계입니다: {denoise_tier}")
+        self.denoise_tier = denoise_tier
+        # 결과 도안의 끊긴 선 잇기 설정 (close_gaps 인자, None 이면 생략)과 스타일별 보고서
+        self.gap_settings: Optional[Dict[str, object]] = None
+        self.gap_reports: Dict[str, GapReport] = {}
+        # 마지막 'auto' 변환의 (선택된 스타일, {스타일: 지표}) (style_metrics.choose_style)
+        self.auto_choice: Optional[Tuple[str, Dict[str, Dict[str, float]]]] = None
         self.default_settings = {
             'line_thickness': 2,      # 선 두께 (1-5)
             'detail_level': 'medium', # 디테일 수준: low, medium, high
@@ -43,6 +140,7 @@ class ColoringBookConverter:
             'remove_noise': True,     # 노이즈 제거
             'enhance_contrast': True, # 대비 향상
         }
+        self.graph = self.build_stage_graph()
     
     def multi_scale_edge_detection(self, gray: np.ndarray) -> np.ndarray:
         """
@@ -52,15 +150,12 @@ class ColoringBookConverter:
         # 다양한 블러 크기로 에지 검출
         edges_list = []
         
-        for blur_size in [3, 5, 7]:
+        for blur_size in EDGE_BLUR_SIZES:
             blurred = cv2.GaussianBlur(gray, (blur_size, blur_size), 0)
             
             # Canny 에지 검출 (여러 임계값)
-            edges1 = cv2.Canny(blurred, 20, 80)
-            edges2 = cv2.Canny(blurred, 40, 120)
-            edges3 = cv2.Canny(blurred, 60, 160)
-            
-            combined = cv2.bitwise_or(edges1, cv2.bitwise_or(edges2, edges3))
+            # 그라디언트/NMS 는 스케일당 한 번만 계산하고 임계값 쌍마다 히스테리시스만 수행
+            combined = multi_threshold_canny(blurred, CANNY_THRESHOLD_PAIRS)
             edges_list.append(combined)
         
         # 모든 스케일 합치기
@@ -70,40 +165,62 @@ class ColoringBookConverter:
         
         return final_edges
     
-    def sobel_edge_detection(self, gray: np.ndarray) -> np.ndarray:
-        """Sobel 에지 검출 - 더 부드러운 그라디언트"""
+    def sobel_edge_detection(self, gray: np.ndarray,
+                             scale: Optional[float] = None) -> np.ndarray:
+        """
+        Sobel 에지 검출 - 더 부드러운 그라디언트
+        
+        scale: 정규화 기준 최댓값 (None 이면 이 이미지의 최댓값, 타일 처리 시 전역값)
+        """
+        magnitude = self.sobel_magnitude(gray)
+        if scale is None:
+            scale = magnitude.max()
+        return self.threshold_magnitude(magnitude, scale, 30)
+    
+    def sobel_magnitude(self, gray: np.ndarray) -> np.ndarray:
+        """Sobel 그라디언트 크기 (float64)"""
         # Sobel 연산자로 x, y 방향 그라디언트 계산
         sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
         sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
         
         # 그라디언트 크기 계산
-        magnitude = np.sqrt(sobelx**2 + sobely**2)
-        
-        # 정규화
-        magnitude = (magnitude / magnitude.max() * 255).astype(np.uint8)
-        
-        # 임계값 적용
-        _, edges = cv2.threshold(magnitude, 30, 255, cv2.THRESH_BINARY)
+        return np.sqrt(sobelx**2 + sobely**2)
+    
+    def laplacian_edge_detection(self, gray: np.ndarray,
+                                 scale: Optional[float] = None) -> np.ndarray:
+        """
+        Laplacian 에지 검출 - 모든 방향의 에지
         
-        return edges
+        scale: 정규화 기준 최댓값 (None 이면 이 이미지의 최댓값, 타일 처리 시 전역값)
+        """
+        laplacian = self.laplacian_magnitude(gray)
+        if scale is None:
+            scale = laplacian.max()
+        return self.threshold_magnitude(laplacian, scale, 20)
     
-    def laplacian_edge_detection(self, gray: np.ndarray) -> np.ndarray:
-        """Laplacian 에지 검출 - 모든 방향의 에지"""
+    def laplacian_magnitude(self, gray: np.ndarray) -> np.ndarray:
+        """Laplacian 응답의 절대값 (float64)"""
         # 노이즈 제거
         blurred = cv2.GaussianBlur(gray, (3, 3), 0)
         
         # Laplacian 적용
         laplacian = cv2.Laplacian(blurred, cv2.CV_64F)
         
-        # 절대값 및 정규화
-        laplacian = np.abs(laplacian)
-        laplacian = (laplacian / laplacian.max() * 255).astype(np.uint8)
+        # 절대값
+        return np.abs(laplacian)
+    
+    def threshold_magnitude(self, magnitude: np.ndarray, scale: float,
+                            threshold: int) -> np.ndarray:
+        """크기 맵을 scale 기준으로 0-255 정규화한 뒤 이진화"""
+        # 정규화
+        normalized = (magnitude / scale * 255).astype(np.uint8)
         
         # 임계값 적용
-        _, edges = cv2.threshold(laplacian, 20, 255, cv2.THRESH_BINARY)
+        _, edges = cv2.threshold(normalized, threshold, 255, cv2.THRESH_BINARY)
         
         return edges
     
+    @profiled('xdog')
     def xdog_filter(self, gray: np.ndarray, sigma: float = 0.5, 
                     k: float = 1.6, p: float = 20, 
                     epsilon: float = 0.01, phi: float = 1.0) -> np.ndarray:
@@ -135,6 +252,7 @@ class ColoringBookConverter:
         
         return binary
     
+    @profiled('morphology')
     def clean_and_smooth_lines(self, edges: np.ndarray, 
                                 line_thickness: int = 2) -> np.ndarray:
         """선 정리 및 부드럽게 처리"""
@@ -161,95 +279,298 @@ class ColoringBookConverter:
     
     def remove_small_components(self, binary: np.ndarray, 
                                  min_size: int = 50) -> np.ndarray:
-        """작은 노이즈 컴포넌트 제거"""
-        # 연결된 컴포넌트 찾기
-        num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(
-            binary, connectivity=8
+        """작은 노이즈 컴포넌트 제거 (stats 기반 룩업 테이블로 한 번에 적용)"""
+        return filter_components(binary, connectivity=8, min_area=min_size)
+    
+    def enhance_for_coloring(self, img: np.ndarray) -> np.ndarray:
+        """컬러링북에 적합하도록 이미지 전처리"""
+        return self.enhance_contrast(self.smooth_preserving_edges(img))
+    
+    @profiled('bilateral')
+    def smooth_preserving_edges(self, img: np.ndarray) -> np.ndarray:
+        """에지를 보존하며 노이즈 제거 (지역 연산, 반경 최대 4px)"""
+        if self.denoise_tier == 'none':
+            return img
+        if self.denoise_tier == 'fast':
+            return cv2.bilateralFilter(img, 5, 75, 75)
+        # 양방향 필터로 노이즈 제거하면서 에지 보존
+        return cv2.bilateralFilter(img, 9, 75, 75)
+    
+    @profiled('denoise')
+    def denoise(self, gray: np.ndarray) -> np.ndarray:
+        """Ultra 전처리용 노이즈 제거 (지역 연산, 반경 최대 13px)"""
+        if self.denoise_tier == 'none':
+            return gray
+        if self.denoise_tier == 'fast':
+            # 속도/화질 차이는 --compare-denoise 로 배치마다 측정
+            return cv2.bilateralFilter(gray, 5, 40, 40)
+        return cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+    
+    @profiled('clahe')
+    def enhance_contrast(self, img: np.ndarray) -> np.ndarray:
+        """CLAHE 대비 향상 (이미지 전체를 8x8 격자로 나누는 전역 연산)"""
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        return clahe.apply(img)
+    
+    def build_stage_graph(self) -> StageGraph:
+        """
+        스타일별 처리 과정을 이름 붙은 단계의 DAG 로 정의합니다.
+        
+        디코드, 그레이스케일, 전처리, 다중 스케일 에지, XDoG 변형 등
+        여러 스타일이 공유하는 앞단은 이미지당 한 번만 계산됩니다.
+        """
+        graph = StageGraph()
+        
+        # 공통 앞단
+        graph.add('image', cv2.imread, 'image_path')
+        graph.add('gray', lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), 'image')
+        graph.add('enhanced', self.enhance_for_coloring, 'gray')
+        
+        # Pro 스타일용 에지
+        graph.add('multi_edges', self.multi_scale_edge_detection, 'enhanced', binary=True)
+        # 정규화 기준(scale)을 별도 단계로 두어 타일 처리 시 전역값을 주입할 수 있게 함
+        graph.add('sobel_magnitude', self.sobel_magnitude, 'enhanced')
+        graph.add('sobel_scale', np.max, 'sobel_magnitude')
+        graph.add('sobel_edges',
+                  lambda m, scale: self.threshold_magnitude(m, scale, 30),
+                  'sobel_magnitude', 'sobel_scale', binary=True)
+        graph.add('laplacian_magnitude', self.laplacian_magnitude, 'enhanced')
+        graph.add('laplacian_scale', np.max, 'laplacian_magnitude')
+        graph.add('laplacian_edges',
+                  lambda m, scale: self.threshold_magnitude(m, scale, 20),
+                  'laplacian_magnitude', 'laplacian_scale', binary=True)
+        graph.add('xdog_clean',
+                  lambda g: self.xdog_filter(g, sigma=0.4, k=1.4, p=25), 'enhanced',
+                  binary=True)
+        graph.add('xdog_artistic',
+                  lambda g: self.xdog_filter(g, sigma=0.6, k=2.0, p=30, phi=0.5), 'enhanced',
+                  binary=True)
+        graph.add('edges_detailed', cv2.bitwise_or, 'multi_edges', 'sobel_edges',
+                  binary=True)
+        graph.add('edges_balanced', self._blend_balanced_edges,
+                  'multi_edges', 'laplacian_edges', binary=True)
+        
+        for style, edges_stage in PRO_STYLE_EDGES.items():
+            graph.add(f'result_{style}', self._finish_pro, edges_stage, binary=True)
+        
+        # Ultra: 노이즈 제거 후 전처리한 이미지에서 별도 에지 계산
+        graph.add('denoised', self.denoise, 'gray')
+        graph.add('enhanced_denoised', self.enhance_for_coloring, 'denoised')
+        graph.add('xdog_ultra',
+                  lambda g: self.xdog_filter(g, sigma=0.5, k=1.6, p=22), 'enhanced_denoised',
+                  binary=True)
+        graph.add('multi_edges_denoised', self.multi_scale_edge_detection,
+                  'enhanced_denoised', binary=True)
+        graph.add('result_ultra', self._finish_ultra, 'xdog_ultra', 'multi_edges_denoised',
+                  binary=True)
+        
+        # Auto: 후보 결과들을 품질 지표로 비교해 하나를 선택
+        candidates = [f'result_{style}' for style in AUTO_CANDIDATES]
+        graph.add('auto_choice',
+                  lambda *pages: choose_style(dict(zip(AUTO_CANDIDATES, pages))),
+                  *candidates)
+        graph.add(f'result_{AUTO_STYLE}',
+                  lambda choice, *pages: pages[AUTO_CANDIDATES.index(choice[0])],
+                  'auto_choice', *candidates, binary=True)
+        
+        return graph
+    
+    def _blend_balanced_edges(self, canny_edges: np.ndarray,
+                              laplacian_edges: np.ndarray) -> np.ndarray:
+        """균형잡힌 스타일: 다중 에지를 가중 평균으로 조합"""
+        edges = cv2.addWeighted(canny_edges, 0.7, laplacian_edges, 0.3, 0)
+        _, edges = cv2.threshold(edges, 127, 255, cv2.THRESH_BINARY)
+        return edges
+    
+    def _finish_pro(self, edges: np.ndarray) -> np.ndarray:
+        """Pro 스타일 공통 후처리: 선 정리, 작은 노이즈 제거, 반전"""
+        # 선 정리 및 부드럽게
+        cleaned = self.clean_and_smooth_lines(edges, line_thickness=2)
+        
+        # 작은 노이즈 제거
+        cleaned = self.remove_small_components(cleaned, min_size=30)
+        
+        # 반전 (흰 배경에 검은 선)
+        return cv2.bitwise_not(cleaned)
+    
+    def _finish_ultra(self, xdog_edges: np.ndarray,
+                      multi_edges: np.ndarray) -> np.ndarray:
+        """Ultra 에지 조합 및 후처리"""
+        # 3. 에지 조합
+        # XDoG를 기본으로, 다중 스케일로 디테일 보강
+        combined = cv2.bitwise_or(
+            cv2.bitwise_not(xdog_edges), 
+            multi_edges
         )
         
-        # 작은 컴포넌트 제거
-        result = np.zeros_like(binary)
-        for i in range(1, num_labels):  # 0은 배경
-            if stats[i, cv2.CC_STAT_AREA] >= min_size:
-                result[labels == i] = 255
+        # 4. 선 정리
+        # 모폴로지로 끊어진 선 연결
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2, 2))
+        with profile_stage('morphology'):
+            cleaned = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, kernel)
+        
+        # 5. 노이즈 제거
+        cleaned = self.remove_small_components(cleaned, min_size=40)
         
+        # 6. 선 두께 균일화
+        kernel_uniform = np.ones((2, 2), np.uint8)
+        with profile_stage('morphology'):
+            cleaned = cv2.dilate(cleaned, kernel_uniform, iterations=1)
+            cleaned = cv2.erode(cleaned, kernel_uniform, iterations=1)
+        
+        # 7. 최종 부드럽게 처리
+        smoothed = cv2.GaussianBlur(cleaned, (3, 3), 0)
+        _, final = cv2.threshold(smoothed, 127, 255, cv2.THRESH_BINARY)
+        
+        # 8. 반전 (흰 배경에 검은 선)
+        return cv2.bitwise_not(final)
+    
+    def render_style(self, memo, style: str) -> np.ndarray:
+        """memo 에서 style 결과를 꺼내 끊긴 선 잇기까지 적용 ('auto' 는 선택 결과를 기록)"""
+        result = memo.get(f'result_{style}')
+        if style == AUTO_STYLE:
+            self.auto_choice = memo.get('auto_choice')
+        return self.close_style_gaps(style, result)
+    
+    def close_style_gaps(self, style: str, result: np.ndarray) -> np.ndarray:
+        """gap_settings 가 있으면 결과 도안의 끊긴 선을 잇고 보고서를 남김"""
+        if self.gap_settings is None:
+            return result
+        result, self.gap_reports[style] = close_gaps(result, **self.gap_settings)
         return result
     
-    def enhance_for_coloring(self, img: np.ndarray) -> np.ndarray:
-        """컬러링북에 적합하도록 이미지 전처리"""
-        # 양방향 필터로 노이즈 제거하면서 에지 보존
-        enhanced = cv2.bilateralFilter(img, 9, 75, 75)
+    def convert_styles(self, image_path: str,
+                       outputs: Dict[str, str]) -> Dict[str, bool]:
+        """
+        한 이미지를 여러 스타일로 변환합니다.
         
-        # 대비 향상
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(enhanced)
+        공유 단계는 이미지별 메모로 한 번만 계산하며,
+        스타일 하나가 실패해도 나머지 스타일은 계속 처리합니다.
+        
+        Args:
+            image_path: 입력 이미지 경로
+            outputs: {스타일: 출력 경로} (스타일은 STYLES 중 하나 또는 'auto')
         
-        return enhanced
+        Returns:
+            {스타일: 성공 여부}
+        """
+        results = {style: False for style in outputs}
+        memo = self.graph.memo(image_path=image_path)
+        
+        try:
+            img = memo.get('image')
+        except Exception as e:
+            print(f"  ❌ 변환 중 오류 발생: {e}")
+            return results
+        if img is None:
+            print(f"  ❌ 이미지를 읽을 수 없습니다: {image_path}")
+            return results
+        
+        for style, output_path in outputs.items():
+            try:
+                result = self.render_style(memo, style)
+                
+                # 저장
+                write_image(output_path, result)
+                results[style] = True
+                
+            except Exception as e:
+                print(f"  ❌ 변환 중 오류 발생: {e}")
+                import traceback
+                traceback.print_exc()
+        
+        return results
     
-    def convert_pro_quality(self, image_path: str, output_path: str,
-                            style: str = 'balanced') -> bool:
+    def render_styles(self, image: ImageSource,
+                      styles: List[str]) -> Dict[str, np.ndarray]:
         """
-        고품질 도안 변환 (Pro)
+        디스크 입출력 없이 한 이미지를 여러 스타일로 변환한 배열을 반환합니다.
+        
+        Args:
+            image: 인코딩된 이미지 bytes, BGR ndarray 또는 파일 경로
+            styles: STYLES 중 변환할 스타일 목록 ('auto' 포함 가능)
+        
+        Returns:
+            {스타일: uint8 도안 이미지} (실패 시 예외 발생)
+        """
+        memo = self.graph.memo(image=load_image(image))
+        return {style: self.render_style(memo, style) for style in styles}
+    
+    def convert_bytes(self, data: bytes, styles: List[str]) -> Dict[str, bytes]:
+        """인코딩된 이미지 bytes 를 여러 스타일로 변환해 {스타일: PNG bytes} 로 반환"""
+        return {
+            style: encode_png(result)
+            for style, result in self.render_styles(data, styles).items()
+        }
+    
+    def tile_halo(self, style: str) -> int:
+        """
+        타일 처리 시 style 의 에지 검출 + 후처리 단계에 필요한 halo (px)
+        
+        커널 반경의 합에, 지역 연산이 아닌 연결 컴포넌트 필터(min_size)를 위한 여유를
+        더합니다. 영향 범위에 제한이 없는 Canny 히스테리시스는 tiled_multi_scale_edges
+        에서 따로 계산하므로 포함하지 않습니다.
+        """
+        branch = 'ultra' if style == 'ultra' else 'pro'
+        return (TILE_EDGE_RADIUS[style] + TILE_FINISH_RADIUS[branch]
+                + TILE_CONTEXT_MARGIN[branch])
+    
+    def convert_tiled(self, image_path: str, output_path: str,
+                      style: str = 'balanced', tile_size: int = 2048,
+                      threads: Optional[int] = None) -> bool:
+        """
+        타일 단위 도안 변환 (인쇄용 고해상도 이미지용)
+        
+        지역 연산(양방향 필터, 노이즈 제거, 에지 검출, 선 정리)은 halo 가 붙은
+        타일마다 수행하고, 전역 연산은 다음과 같이 처리합니다.
+            - CLAHE: uint8 전체 이미지에 한 번 적용 (메모리 부담이 작음)
+            - Sobel/Laplacian 정규화: 타일별 최댓값으로 전역 최댓값을 먼저 계산
+            - Canny: 타일마다 라벨링하고 타일 경계의 컴포넌트만 union-find 로 합침
+        
+        결과는 전체 이미지 변환(convert_styles)과 픽셀 단위로 같습니다
+        (tests/test_tiled_conversion.py). 중간 결과와 라벨 맵은 타일 크기 × 스레드
+        수만큼만 쓰고, 전체 크기로는 uint8 평면만 유지합니다: 디코드 직후의 BGR 과
+        그레이 (픽셀당 4 B, cv2.imread 는 영역 단위로 읽지 못함), 이후로는 전처리
+        입력/출력 또는 대비 향상 결과 + Canny 에지 + 출력 (픽셀당 최대 3 B).
         
         Args:
             image_path: 입력 이미지 경로
             output_path: 출력 이미지 경로
-            style: 스타일 선택
-                - 'clean': 깔끔하고 단순한 선
-                - 'detailed': 세밀한 디테일 보존
-                - 'balanced': 균형잡힌 (기본값)
-                - 'artistic': 예술적 스케치 느낌
+            style: STYLES 중 하나 또는 'auto' (기본값 'balanced')
+                'auto' 는 후보 스타일을 하나씩 타일 변환해 품질 지표를 매기고
+                가장 좋은 결과 하나만 남김
+            tile_size: 타일 코어 한 변의 크기 (px)
+            threads: 타일 처리 스레드 수 (None 이면 CPU 코어 수)
         
         Returns:
             성공 여부
         """
+        if style not in STYLES and style != AUTO_STYLE:
+            style = 'balanced'
+        tiles = {'tile_size': tile_size, 'threads': threads}
+        
         try:
-            # 이미지 읽기
-            img = cv2.imread(image_path)
-            if img is None:
-                print(f"  ❌ 이미지를 읽을 수 없습니다: {image_path}")
-                return False
-            
-            # 그레이스케일 변환
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # 전처리
-            enhanced_gray = self.enhance_for_coloring(gray)
-            
-            if style == 'clean':
-                # 깔끔한 스타일: XDoG 사용
-                edges = self.xdog_filter(enhanced_gray, sigma=0.4, k=1.4, p=25)
-                
-            elif style == 'detailed':
-                # 세밀한 스타일: 다중 스케일 + Sobel 조합
-                multi_edges = self.multi_scale_edge_detection(enhanced_gray)
-                sobel_edges = self.sobel_edge_detection(enhanced_gray)
-                edges = cv2.bitwise_or(multi_edges, sobel_edges)
-                
-            elif style == 'artistic':
-                # 예술적 스타일: XDoG 변형
-                edges = self.xdog_filter(enhanced_gray, sigma=0.6, k=2.0, p=30, phi=0.5)
-                
-            else:  # balanced
-                # 균형잡힌 스타일: 다중 에지 조합
-                canny_edges = self.multi_scale_edge_detection(enhanced_gray)
-                laplacian_edges = self.laplacian_edge_detection(enhanced_gray)
-                
-                # 가중 평균으로 조합
-                edges = cv2.addWeighted(canny_edges, 0.7, laplacian_edges, 0.3, 0)
-                _, edges = cv2.threshold(edges, 127, 255, cv2.THRESH_BINARY)
-            
-            # 선 정리 및 부드럽게
-            cleaned = self.clean_and_smooth_lines(edges, line_thickness=2)
-            
-            # 작은 노이즈 제거
-            cleaned = self.remove_small_components(cleaned, min_size=30)
-            
-            # 반전 (흰 배경에 검은 선)
-            result = cv2.bitwise_not(cleaned)
+            if style == AUTO_STYLE:
+                # choose_style 과 같은 선택 (동점이면 후보 순서상 앞의 스타일)
+                best, result, scores = None, None, {}
+                for candidate in AUTO_CANDIDATES:
+                    page = self._render_tiled(image_path, candidate, tiles)
+                    if page is None:
+                        return False
+                    scores[candidate] = scored_metrics(page)
+                    if best is None or scores[candidate]['score'] < scores[best]['score']:
+                        best, result = candidate, page
+                    del page
+                self.auto_choice = (best, scores)
+            else:
+                result = self._render_tiled(image_path, style, tiles)
+                if result is None:
+                    return False
+            # 끊긴 선 잇기는 타일 경계를 넘는 틈도 있으므로 전체 결과에 적용
+            result = self.close_style_gaps(style, result)
             
             # 저장
-            cv2.imwrite(output_path, result)
+            write_image(output_path, result)
             return True
             
         except Exception as e:
@@ -258,71 +579,270 @@ class ColoringBookConverter:
             traceback.print_exc()
             return False
     
+    def _render_tiled(self, image_path: str, style: str,
+                      tiles: Dict[str, Optional[int]]) -> Optional[np.ndarray]:
+        """convert_tiled 의 한 스타일 타일 변환 (이미지를 읽을 수 없으면 None)"""
+        # 전체 이미지 경로와 같은 방식으로 디코드 (IMREAD_GRAYSCALE 은 코덱의 자체
+        # 변환을 써서 cvtColor 결과와 픽셀 값이 다를 수 있음)
+        with profile_stage('image'):
+            image = cv2.imread(image_path)
+        if image is None:
+            print(f"  ❌ 이미지를 읽을 수 없습니다: {image_path}")
+            return None
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        del image
+        
+        # 1. 지역 전처리 (타일)
+        if style == 'ultra':
+            smoothed = process_tiled(
+                gray,
+                lambda tile: self.smooth_preserving_edges(self.denoise(tile)),
+                halo=TILE_PRE_RADIUS['ultra'], **tiles
+            )
+        else:
+            smoothed = process_tiled(gray, self.smooth_preserving_edges,
+                                     halo=TILE_PRE_RADIUS['pro'], **tiles)
+        del gray
+        
+        # 2. 대비 향상 (전체 uint8)
+        enhanced = self.enhance_contrast(smoothed)
+        del smoothed
+        
+        # 3. 전역 정규화 기준 사전 계산
+        seeds = {}
+        if style == 'detailed':
+            seeds['sobel_scale'] = tiled_max(enhanced, self.sobel_magnitude,
+                                             halo=1, **tiles)
+        elif style == 'balanced':
+            seeds['laplacian_scale'] = tiled_max(enhanced, self.laplacian_magnitude,
+                                                 halo=2, **tiles)
+        
+        # 4. Canny 에지 (타일 경계를 넘는 히스테리시스는 union-find 로 합침)
+        layers = {'enhanced_denoised' if style == 'ultra' else 'enhanced': enhanced}
+        if style in TILE_CANNY_STAGES:
+            layers[TILE_CANNY_STAGES[style]] = self.tiled_multi_scale_edges(enhanced, tiles)
+        names = list(layers)
+        del enhanced
+        
+        # 5. 나머지 에지 검출 + 선 정리 (타일, 단계 그래프 재사용)
+        def render(windows: List[np.ndarray]) -> np.ndarray:
+            planes = {name: np.ascontiguousarray(window)
+                      for name, window in zip(names, windows)}
+            memo = self.graph.memo(**planes, **seeds)
+            return memo.get(f'result_{style}')
+        
+        return process_tiled(list(layers.values()), render,
+                             halo=self.tile_halo(style), **tiles)
+    
+    def tiled_multi_scale_edges(self, enhanced: np.ndarray,
+                                tiles: Dict[str, Optional[int]]) -> np.ndarray:
+        """
+        multi_scale_edge_detection 의 타일 버전 (결과는 같음)
+        
+        블러 + Sobel + NMS 는 halo 를 붙인 타일마다 모든 블러 크기에 대해 계산하고,
+        약한 에지를 따라 거리 제한 없이 이어지는 히스테리시스는 tiled_hysteresis 가
+        타일 경계의 컴포넌트를 합쳐 처리합니다.
+        """
+        def planes(tile: np.ndarray) -> List[np.ndarray]:
+            return [plane for size in EDGE_BLUR_SIZES
+                    for plane in hysteresis_planes(cv2.GaussianBlur(tile, (size, size), 0),
+                                                   CANNY_THRESHOLD_PAIRS)]
+        
+        return tiled_hysteresis(enhanced, planes, halo=max(EDGE_BLUR_SIZES) // 2 + 2, **tiles)
+    
+    def compare_denoise_tiers(self, image_path: str,
+                              styles: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        같은 입력에 대해 denoise 단계별 소요 시간과 'exact' 대비 결과 일치도를 측정합니다.
+        
+        Returns:
+            {단계: {'seconds': 소요 시간, 'speedup': exact 대비 배속,
+                    'agreement': exact 결과와 같은 픽셀 비율(0-1)}}
+        """
+        styles = styles or STYLES
+        img = cv2.imread(image_path)
+        if img is None:
+            raise ValueError(f"이미지를 읽을 수 없습니다: {image_path}")
+        
+        original_tier = self.denoise_tier
+        outputs = {}
+        timings = {}
+        try:
+            for tier in DENOISE_TIERS:
+                self.denoise_tier = tier
+                memo = self.graph.memo(image=img)
+                start = time.perf_counter()
+                outputs[tier] = [memo.get(f'result_{style}') for style in styles]
+                timings[tier] = time.perf_counter() - start
+        finally:
+            self.denoise_tier = original_tier
+        
+        report = {}
+        for tier in DENOISE_TIERS:
+            same = sum(int(np.count_nonzero(a == b))
+                       for a, b in zip(outputs[tier], outputs['exact']))
+            total = sum(a.size for a in outputs['exact'])
+            report[tier] = {
+                'seconds': timings[tier],
+                'speedup': timings['exact'] / max(timings[tier], 1e-9),
+                'agreement': same / total,
+            }
+        return report
+    
+    def convert_pro_quality(self, image_path: str, output_path: str,
+                            style: str = 'balanced') -> bool:
+        """
+        고품질 도안 변환 (Pro)
+        
+        Args:
+            image_path: 입력 이미지 경로
+            output_path: 출력 이미지 경로
+            style: 스타일 선택
+                - 'clean': 깔끔하고 단순한 선
+                - 'detailed': 세밀한 디테일 보존
+                - 'balanced': 균형잡힌 (기본값)
+                - 'artistic': 예술적 스케치 느낌
+        
+        Returns:
+            성공 여부
+        """
+        if style not in PRO_STYLE_EDGES:
+            style = 'balanced'
+        return self.convert_styles(image_path, {style: output_path})[style]
+    
     def convert_ultra_quality(self, image_path: str, output_path: str) -> bool:
         """
         초고품질 도안 변환 (Ultra)
         여러 기법을 조합하여 최상의 결과물 생성
         """
+        return self.convert_styles(image_path, {'ultra': output_path})['ultra']
+
+
+_worker_converter: Optional[ColoringBookConverter] = None
+
+
+def _convert_task(task: Tuple[str, Dict[str, str], Dict[str, object]]):
+    """
+    워커 프로세스에서 실행되는 작업: 한 이미지를 주어진 스타일들로 변환
+    
+    task: (입력 경로, {스타일: 출력 경로}, 옵션)
+        옵션: 'denoise' (denoise 단계), 'tile' (타일 크기, 0이면 전체 처리),
+              'tile_threads' (타일 스레드 수), 'cache' (캐시 디렉토리, None 이면 미사용),
+              'profile' (단계별 계측 여부), 'packed' (이진 중간 결과 1비트 보관 여부),
+              'svg' (SVG 곡선 허용 오차 px, None 이면 SVG 를 만들지 않음),
+              'close_gaps' (끊긴 선 잇기 설정, None 이면 생략)
+    
+    Returns:
+        ({스타일: 성공 여부}, 이 작업의 단계별 적중/미스 카운터, 캐시에서 가져온 스타일,
+         계측 이벤트 목록, {스타일: SVG 내보내기 통계}, {스타일: GapReport},
+         'auto' 선택 결과 (선택된 스타일, {스타일: 지표}) 또는 None)
+    """
+    global _worker_converter
+    if _worker_converter is None:
+        _worker_converter = ColoringBookConverter()
+    
+    input_path, outputs, options = task
+    converter = _worker_converter
+    converter.denoise_tier = options['denoise']
+    converter.graph.pack_binary = options['packed']
+    converter.gap_settings = options['close_gaps']
+    converter.gap_reports = {}
+    converter.auto_choice = None
+    converter.graph.reset_counters()
+    if options['profile']:
+        stage_profiler.enable()
+    
+    def convert(pending: Dict[str, str]) -> Dict[str, bool]:
+        if options['tile']:
+            return {
+                style: converter.convert_tiled(
+                    input_path, output_path, style,
+                    tile_size=options['tile'], threads=options['tile_threads']
+                )
+                for style, output_path in pending.items()
+            }
+        return converter.convert_styles(input_path, pending)
+    
+    cache = ConversionCache(options['cache']) if options['cache'] else None
+    # 결과에 영향을 주는 설정만 캐시 키에 포함 (타일 스레드 수는 결과와 무관)
+    params = {
+        style: {'denoise': options['denoise'], 'tile': options['tile']}
+        for style in outputs
+    }
+    if options['close_gaps'] is not None:
+        for style_params in params.values():
+            style_params['close_gaps'] = options['close_gaps']
+    results, hits = cached_convert(cache, input_path, outputs, params,
+                                   PIPELINE_VERSION, convert)
+    svg_stats = {}
+    if options['svg'] is not None:
+        VECTOR_DIR.mkdir(parents=True, exist_ok=True)
+        for style, output_path in outputs.items():
+            if results[style]:
+                svg_path = str(VECTOR_DIR / f"{Path(output_path).stem}.svg")
+                svg_stats[style] = export_svg_file(output_path, svg_path,
+                                                   tolerance=options['svg'])
+    return (results, converter.graph.snapshot_counters(), hits, stage_profiler.collect(),
+            svg_stats, converter.gap_reports, converter.auto_choice)
+
+
+def print_denoise_report(converter: ColoringBookConverter, image_files: List[Path],
+                         styles: List[str]) -> None:
+    """denoise 단계별 속도/일치도 비교표 출력 (배치 단위로 단계를 고르기 위한 근거)"""
+    print("\n🧪 denoise 단계 비교 (exact 대비)")
+    print(f"   {'image':<28}{'tier':<8}{'seconds':>9}{'speedup':>9}{'agree':>9}")
+    for image_file in image_files:
         try:
-            # 이미지 읽기
-            img = cv2.imread(image_path)
-            if img is None:
-                print(f"  ❌ 이미지를 읽을 수 없습니다: {image_path}")
-                return False
-            
-            # 그레이스케일
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # 1. 전처리: 노이즈 제거 + 대비 향상
-            denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-            enhanced = self.enhance_for_coloring(denoised)
-            
-            # 2. 다양한 에지 검출 기법 적용
-            # XDoG (깨끗한 주요 선)
-            xdog_edges = self.xdog_filter(enhanced, sigma=0.5, k=1.6, p=22)
-            
-            # 다중 스케일 Canny (디테일)
-            multi_edges = self.multi_scale_edge_detection(enhanced)
-            
-            # 3. 에지 조합
-            # XDoG를 기본으로, 다중 스케일로 디테일 보강
-            combined = cv2.bitwise_or(
-                cv2.bitwise_not(xdog_edges), 
-                multi_edges
-            )
-            
-            # 4. 선 정리
-            # 모폴로지로 끊어진 선 연결
-            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2, 2))
-            cleaned = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, kernel)
-            
-            # 5. 노이즈 제거
-            cleaned = self.remove_small_components(cleaned, min_size=40)
-            
-            # 6. 선 두께 균일화
-            kernel_uniform = np.ones((2, 2), np.uint8)
-            cleaned = cv2.dilate(cleaned, kernel_uniform, iterations=1)
-            cleaned = cv2.erode(cleaned, kernel_uniform, iterations=1)
-            
-            # 7. 최종 부드럽게 처리
-            smoothed = cv2.GaussianBlur(cleaned, (3, 3), 0)
-            _, final = cv2.threshold(smoothed, 127, 255, cv2.THRESH_BINARY)
-            
-            # 8. 반전 (흰 배경에 검은 선)
-            result = cv2.bitwise_not(final)
-            
-            # 저장
-            cv2.imwrite(output_path, result)
-            return True
-            
+            report = converter.compare_denoise_tiers(str(image_file), styles)
         except Exception as e:
-            print(f"  ❌ 변환 중 오류 발생: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+            print(f"   {image_file.name:<28}❌ {e}")
+            continue
+        for tier, row in report.items():
+            print(f"   {image_file.name[:27]:<28}{tier:<8}{row['seconds']:>9.2f}"
+                  f"{row['speedup']:>8.1f}x{row['agreement'] * 100:>8.2f}%")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="고품질 컬러링북 도안 변환기 (Pro)")
+    add_jobs_argument(parser)
+    parser.add_argument(
+        '--tile', type=int, default=0, metavar='PX',
+        help='타일 단위로 처리 (코어 한 변 크기, 예: 2048). 인쇄용 고해상도 이미지용'
+    )
+    parser.add_argument(
+        '--denoise', choices=DENOISE_TIERS, default='exact',
+        help='노이즈 제거/전처리 단계 (exact: 기존 품질, fast: 빠른 필터, none: 생략)'
+    )
+    parser.add_argument(
+        '--packed', action='store_true',
+        help='이진 중간 결과를 1비트로 압축해 보관 (결과 동일, 메모리 1/8, 고해상도 배치용)'
+    )
+    parser.add_argument(
+        '--svg', type=float, nargs='?', const=SVG_TOLERANCE, default=None,
+        metavar='TOLERANCE',
+        help='변환 결과를 SVG 로도 내보냄 (assets/vector/, 곡선 허용 오차 px, 기본값 1.0)'
+    )
+    parser.add_argument(
+        '--close-gaps', type=int, nargs='?', const=DEFAULT_MAX_GAP, default=None,
+        metavar='PX',
+        help=f'결과 도안의 끊긴 선(틈 최대 PX, 기본값 {DEFAULT_MAX_GAP})을 이어 색칠이 새지 않게 함'
+    )
+    parser.add_argument(
+        '--compare-denoise', action='store_true',
+        help='변환 대신 denoise 단계별 소요 시간과 exact 대비 일치도를 출력'
+    )
+    add_cache_arguments(parser)
+    add_profile_argument(parser)
+    parser.add_argument(
+        '--force', action='store_true',
+        help='매니페스트를 무시하고 변경되지 않은 이미지도 다시 변환'
+    )
+    parser.add_argument(
+        '--prune-orphans', action='store_true',
+        help='원본이 삭제된 이미지의 출력 파일을 삭제'
+    )
+    args = parser.parse_args()
+    
     # 프로젝트 루트 경로 설정
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
@@ -342,11 +862,11 @@ def main():
     # 지원 이미지 확장자
     supported_extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.webp', '.tiff'}
     
-    # 이미지 파일 목록 가져오기
-    image_files = [
+    # 이미지 파일 목록 가져오기 (실행마다 같은 순서)
+    image_files = sorted(
         f for f in raw_image_dir.iterdir()
         if f.is_file() and f.suffix.lower() in supported_extensions
-    ]
+    )
     
     if not image_files:
         print(f"❌ 변환할 이미지가 없습니다.")
@@ -374,87 +894,158 @@ def main():
     print("    5. Ultra           - 최고 품질 (모든 기법 조합)")
     print()
     print("    6. 모든 스타일 비교 (5가지 모두 생성)")
+    print("    7. Auto (자동)     - 품질 지표로 이미지마다 가장 좋은 스타일 선택")
     
     try:
-        choice = input("\n선택 (1-6, 기본값 5): ").strip() or "5"
+        choice = input("\n선택 (1-7, 기본값 5): ").strip() or "5"
     except EOFError:
         choice = "5"
     
-    if choice not in ["1", "2", "3", "4", "5", "6"]:
+    if choice not in ["1", "2", "3", "4", "5", "6", "7"]:
         choice = "5"
     
     print("-" * 65)
     
     converter = ColoringBookConverter()
     
-    style_map = {
-        "1": ("clean", "Clean"),
-        "2": ("detailed", "Detailed"),
-        "3": ("balanced", "Balanced"),
-        "4": ("artistic", "Artistic"),
-        "5": ("ultra", "Ultra"),
+    style_names = {
+        "clean": "Clean",
+        "detailed": "Detailed",
+        "balanced": "Balanced",
+        "artistic": "Artistic",
+        "ultra": "Ultra",
+        AUTO_STYLE: "Auto",
     }
+    choice_styles = {
+        "1": ["clean"],
+        "2": ["detailed"],
+        "3": ["balanced"],
+        "4": ["artistic"],
+        "5": ["ultra"],
+        "6": STYLES,  # 모든 스타일로 변환
+        "7": [AUTO_STYLE],  # 이미지마다 품질 지표로 선택
+    }
+    
+    if args.compare_denoise:
+        print_denoise_report(converter, image_files, choice_styles[choice])
+        return
     
     success_count = 0
     fail_count = 0
+    cache_hits = 0
+    cache = cache_from_args(args)
+    profile_events = []
     
-    for i, image_file in enumerate(image_files, 1):
-        print(f"\n[{i}/{len(image_files)}] 처리 중: {image_file.name}")
-        
-        input_path = str(image_file)
-        base_name = image_file.stem
-        
-        if choice == "6":
-            # 모든 스타일로 변환
-            styles = [
-                ("clean", "Clean"),
-                ("detailed", "Detailed"),
-                ("balanced", "Balanced"),
-                ("artistic", "Artistic"),
-                ("ultra", "Ultra"),
-            ]
-            
-            for style_id, style_name in styles:
-                output_filename = f"{base_name}_{style_id}.png"
-                output_path = str(output_dir / output_filename)
-                
-                if style_id == "ultra":
-                    result = converter.convert_ultra_quality(input_path, output_path)
-                else:
-                    result = converter.convert_pro_quality(
-                        input_path, output_path, style=style_id
-                    )
-                
-                if result:
-                    print(f"  ✅ {style_name}: {output_filename}")
-                    success_count += 1
-                else:
-                    fail_count += 1
-        else:
-            # 선택된 스타일로 변환
-            style_id, style_name = style_map[choice]
-            output_filename = f"{base_name}_{style_id}.png"
-            output_path = str(output_dir / output_filename)
-            
-            if style_id == "ultra":
-                result = converter.convert_ultra_quality(input_path, output_path)
+    # 매니페스트로 새로 추가되었거나 바뀐 (이미지, 스타일) 만 골라 변환
+    manifest = BatchManifest.for_directory("pro", str(raw_image_dir))
+    gap_settings = {'max_gap': args.close_gaps} if args.close_gaps else None
+    manifest_params = {'denoise': args.denoise, 'tile': args.tile,
+                       'version': PIPELINE_VERSION}
+    if gap_settings:
+        manifest_params['close_gaps'] = gap_settings
+    
+    def output_path_for(image_file: Path, style_id: str) -> Path:
+        return output_dir / f"{image_file.stem}_{style_id}.png"
+    
+    pending: Dict[Path, List[str]] = {}
+    skipped = {}
+    for image_file in image_files:
+        for style_id in choice_styles[choice]:
+            reason = None if args.force else manifest.check(
+                str(image_file), style_id,
+                str(output_path_for(image_file, style_id)), manifest_params
+            )
+            if reason:
+                skipped[reason] = skipped.get(reason, 0) + 1
             else:
-                result = converter.convert_pro_quality(
-                    input_path, output_path, style=style_id
-                )
-            
-            if result:
-                print(f"  ✅ {style_name} 스타일로 저장됨: {output_filename}")
+                pending.setdefault(image_file, []).append(style_id)
+    
+    if skipped:
+        print(f"⏭️  건너뜀: 변경 없음 {skipped.get(SKIP_UNCHANGED, 0)}개, "
+              f"이미 처리된 파일 {skipped.get(SKIP_ALREADY_PROCESSED, 0)}개 "
+              f"(--force 로 다시 변환)")
+    
+    if args.prune_orphans:
+        for removed in manifest.remove_orphans(str(f) for f in image_files):
+            print(f"🗑️  원본이 없는 출력 삭제: {Path(removed).name}")
+    
+    # 이미지(및 스타일 변형)를 워커 프로세스에 분배, 결과는 입력 순서대로 출력
+    task_list = [
+        (image_file, [style_id for style_id in task_styles if style_id in pending[image_file]])
+        for image_file, task_styles in split_tasks(list(pending), choice_styles[choice], args.jobs)
+    ]
+    task_list = [(image_file, task_styles) for image_file, task_styles in task_list if task_styles]
+    jobs = resolve_jobs(args.jobs, len(task_list))
+    # 타일 스레드는 워커 프로세스들이 코어를 나눠 쓰도록 배분
+    tile_threads = max(1, default_jobs() // jobs)
+    tasks = [
+        (str(image_file),
+         {style_id: str(output_path_for(image_file, style_id))
+          for style_id in task_styles},
+         {'denoise': args.denoise, 'tile': args.tile, 'tile_threads': tile_threads,
+          'cache': str(cache.root) if cache else None,
+          'profile': bool(args.profile), 'packed': args.packed, 'svg': args.svg,
+          'close_gaps': gap_settings})
+        for image_file, task_styles in task_list
+    ]
+    print(f"⚙️  워커 프로세스: {jobs}개, denoise 단계: {args.denoise}")
+    if args.tile:
+        print(f"🧩 타일 처리: {args.tile}px, 워커당 스레드 {tile_threads}개")
+    
+    for i, (task, outcome) in enumerate(run_batch(_convert_task, tasks, jobs), 1):
+        input_path, outputs = task[:2]
+        print(f"\n[{i}/{len(tasks)}] 처리 중: {Path(input_path).name}")
+        
+        if not outcome.ok:
+            print(f"  ❌ 변환 중 오류 발생: {outcome.error}")
+            fail_count += len(outputs)
+            continue
+        
+        results, counters, hits, events, svg_stats, gap_reports, auto_choice = outcome.value
+        converter.graph.merge_counters(counters)
+        profile_events.extend(events)
+        cache_hits += len(hits)
+        
+        for style_id, output_path in outputs.items():
+            if results[style_id]:
+                cached = " (캐시)" if style_id in hits else ""
+                if choice == "6":
+                    print(f"  ✅ {style_names[style_id]}: {Path(output_path).name}{cached}")
+                else:
+                    print(f"  ✅ {style_names[style_id]} 스타일로 저장됨: "
+                          f"{Path(output_path).name}{cached}")
+                if style_id == AUTO_STYLE and auto_choice:
+                    best, scores = auto_choice
+                    print(f"     🤖 선택: {style_names[best]}")
+                    print(format_scores(scores, best))
+                if style_id in gap_reports:
+                    print(f"     🔗 {gap_reports[style_id].summary()}")
+                if style_id in svg_stats:
+                    svg_name = f"{Path(output_path).stem}.svg"
+                    print(f"     {format_svg_stats(svg_name, svg_stats[style_id])}")
                 success_count += 1
+                manifest.record(input_path, style_id, output_path, manifest_params)
             else:
                 fail_count += 1
+        manifest.save_if_due()
     
+    manifest.save()
     print("\n" + "=" * 65)
     print("📊 변환 완료!")
     print(f"   ✅ 성공: {success_count}개")
     if fail_count > 0:
         print(f"   ❌ 실패: {fail_count}개")
     print(f"   📂 출력 폴더: {output_dir}")
+    if cache:
+        removed, _ = cache.prune()
+        print(f"   ♻️ 캐시 적중: {cache_hits}개 (LRU 정리: {removed}개 삭제)")
+    if choice == "6":
+        print("-" * 65)
+        print("🔁 단계별 캐시 적중/미스")
+        print(converter.graph.format_counters())
+    if args.profile:
+        print("-" * 65)
+        stage_profiler.report(profile_events, args.profile)
     print("=" * 65)
 
 
@@ -0,0 +1,383 @@
+"""
+출력 이미지 인코딩 최적화 (형식/설정별 크기 비교)
+
+한 페이지를 여러 후보 설정으로 인코딩해 보고, 디코드 결과가 원본 픽셀과 같으면서
+디코드 시간이 예산 안에 드는 것 중 가장 작은 파일을 고릅니다.
+
+    - PNG: 압축 레벨, zlib 전략, 행 필터 (OpenCV 4.11+ 에서만 필터 지정 가능)
+    - 흑백(0/255) 이미지는 1비트 PNG, 색이 적은 이미지는 팔레트 PNG (Pillow 가 있을 때)
+    - 무손실 WebP 는 allow_webp=True 일 때만 후보에 포함 (확장자가 바뀌므로)
+
+디코드 시간 예산은 기본 설정 PNG(cv2.imwrite 기본값)의 디코드 시간 대비 배수이며,
+이 머신의 cv2.imdecode 시간으로 잽니다. 후보 인코딩은 스레드 풀에서 동시에 실행됩니다
+(OpenCV/zlib 인코딩은 GIL 을 놓음).
+
+사용 예:
+    from export_optimizer import optimize_encode
+
+    choice = optimize_encode(page)          # choice.data, choice.ext, choice.name
+    write_bytes('page.png', choice.data)
+
+    python scripts/export_optimizer.py                 # assets/images 전체 재최적화
+    python scripts/export_optimizer.py --dry-run -v    # 후보별 크기/디코드 시간만 출력
+"""
+
+import argparse
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from batch_executor import resolve_jobs
+from bitmap import is_binary
+from catalog_store import apply_page_updates
+from conversion_cache import PROJECT_ROOT, format_size
+from image_io import write_bytes
+from stage_profiler import profile_stage
+
+try:
+    from PIL import Image
+    _NO_DITHER = getattr(Image, 'Dither', Image).NONE
+except ImportError:  # 팔레트/Pillow 1비트 후보는 선택 기능
+    Image = None
+
+DEFAULT_IMAGES_DIR = PROJECT_ROOT / "assets" / "images"
+# 기본 PNG 디코드 시간 대비 허용 배수
+DEFAULT_DECODE_BUDGET = 1.5
+DECODE_REPEATS = 3
+
+_PNG_STRATEGIES = {
+    'default': cv2.IMWRITE_PNG_STRATEGY_DEFAULT,
+    'filtered': cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+    'rle': cv2.IMWRITE_PNG_STRATEGY_RLE,
+}
+# OpenCV 4.11 미만에는 행 필터 지정 옵션이 없음 (그때는 libpng 기본 필터만 사용)
+_PNG_FILTER = getattr(cv2, 'IMWRITE_PNG_FILTER', None)
+_PNG_FILTERS = {
+    name: getattr(cv2, f'IMWRITE_PNG_FILTER_{name.upper()}')
+    for name in ('none', 'sub', 'up', 'paeth')
+} if _PNG_FILTER is not None else {}
+
+
+class Candidate:
+    """인코딩 후보: encode(image) -> bytes"""
+
+    def __init__(self, name: str, ext: str, encode: Callable[[np.ndarray], bytes]):
+        self.name = name
+        self.ext = ext
+        self.encode = encode
+
+
+class EncodeChoice:
+    """선택된 인코딩 결과와 후보별 측정값"""
+
+    def __init__(self, name: str, ext: str, data: bytes, decode_ms: float,
+                 baseline_bytes: int, baseline_decode_ms: float,
+                 measurements: List[Dict]):
+        self.name = name
+        self.ext = ext
+        self.data = data
+        self.decode_ms = decode_ms
+        self.baseline_bytes = baseline_bytes
+        self.baseline_decode_ms = baseline_decode_ms
+        self.measurements = measurements
+
+
+def _cv2_encoder(ext: str, params: List[int]) -> Callable[[np.ndarray], bytes]:
+    def encode(image: np.ndarray) -> bytes:
+        ok, buffer = cv2.imencode(ext, image, params)
+        if not ok:
+            raise ValueError(f"인코딩 실패: {ext} {params}")
+        return buffer.tobytes()
+    return encode
+
+
+def _pil_encoder(mode: str) -> Callable[[np.ndarray], bytes]:
+    def encode(image: np.ndarray) -> bytes:
+        if image.ndim == 2:
+            pil_image = Image.fromarray(image)
+        else:
+            pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        if mode == '1':
+            pil_image = pil_image.convert('1', dither=_NO_DITHER)
+            options = {}
+        else:
+            colors = _color_count(image)
+            pil_image = pil_image.quantize(colors=colors, dither=_NO_DITHER)
+            # 색 수에 맞는 최소 비트 깊이 (1/2/4/8)
+            options = {'bits': next(b for b in (1, 2, 4, 8) if colors <= 2 ** b)}
+        buffer = io.BytesIO()
+        pil_image.save(buffer, 'PNG', optimize=True, **options)
+        return buffer.getvalue()
+    return encode
+
+
+def _color_count(image: np.ndarray, limit: int = 256) -> int:
+    """limit 이하이면 정확한 색 수, 넘으면 limit + 1"""
+    if image.ndim == 2:
+        return int(np.count_nonzero(cv2.calcHist([image], [0], None, [256], [0, 256])))
+    pixels = image.reshape(-1, image.shape[2]).astype(np.uint32)
+    packed = pixels[:, 0] << 16 | pixels[:, 1] << 8 | pixels[:, 2]
+    return min(len(np.unique(packed)), limit + 1)
+
+
+def candidates_for(image: np.ndarray, allow_webp: bool = False) -> List[Candidate]:
+    """image 에 시도할 인코딩 후보 목록"""
+    binary = is_binary(image)
+    base = [cv2.IMWRITE_PNG_BILEVEL, 1] if binary else []
+    candidates = [
+        Candidate(f'png-l{level}', '.png',
+                  _cv2_encoder('.png', base + [cv2.IMWRITE_PNG_COMPRESSION, level]))
+        for level in (6, 9)
+    ]
+    for strategy, strategy_flag in _PNG_STRATEGIES.items():
+        filters = _PNG_FILTERS.items() if _PNG_FILTERS else [(None, None)]
+        for filter_name, filter_flag in filters:
+            if strategy == 'default' and filter_name is None:
+                continue  # png-l9 와 같음
+            params = base + [cv2.IMWRITE_PNG_COMPRESSION, 9,
+                             cv2.IMWRITE_PNG_STRATEGY, strategy_flag]
+            name = f'png-l9-{strategy}'
+            if filter_name is not None:
+                params += [_PNG_FILTER, filter_flag]
+                name += f'-{filter_name}'
+            candidates.append(Candidate(name, '.png', _cv2_encoder('.png', params)))
+
+    has_alpha = image.ndim == 3 and image.shape[2] == 4
+    if Image is not None and not has_alpha:
+        if binary:
+            candidates.append(Candidate('pil-1bit', '.png', _pil_encoder('1')))
+        elif _color_count(image) <= 256:
+            candidates.append(Candidate('pil-palette', '.png', _pil_encoder('P')))
+    if allow_webp:
+        candidates.append(Candidate('webp-lossless', '.webp',
+                                    _cv2_encoder('.webp', [cv2.IMWRITE_WEBP_QUALITY, 101])))
+    return candidates
+
+
+def _decode(data: bytes) -> Optional[np.ndarray]:
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+def _decode_ms(data: bytes) -> Tuple[float, Optional[np.ndarray]]:
+    """DECODE_REPEATS 번 디코드한 시간의 중앙값(ms)과 디코드 결과"""
+    timings = []
+    decoded = None
+    for _ in range(DECODE_REPEATS):
+        start = time.perf_counter()
+        decoded = _decode(data)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), decoded
+
+
+def _same_pixels(original: np.ndarray, decoded: Optional[np.ndarray]) -> bool:
+    """디코드 결과가 원본과 같은 픽셀인지 (회색 ↔ 팔레트/BGR 표현 차이는 허용)"""
+    if decoded is None:
+        return False
+    if original.shape == decoded.shape:
+        return np.array_equal(original, decoded)
+    if original.ndim == 2 and decoded.ndim == 3 and decoded.shape[2] == 3:
+        return np.array_equal(cv2.cvtColor(original, cv2.COLOR_GRAY2BGR), decoded)
+    return False
+
+
+def optimize_encode(image: np.ndarray, decode_budget: float = DEFAULT_DECODE_BUDGET,
+                    allow_webp: bool = False, threads: Optional[int] = None,
+                    candidates: Optional[List[Candidate]] = None) -> EncodeChoice:
+    """
+    후보 설정으로 모두 인코딩해 보고 가장 작은 무손실 결과를 고릅니다.
+
+    Args:
+        image: 저장할 이미지 (cv2.imwrite 에 넘기던 배열)
+        decode_budget: 기본 설정 PNG 디코드 시간 대비 허용 배수
+        allow_webp: 무손실 WebP 를 후보에 포함 (선택되면 ext 가 '.webp')
+        threads: 후보 인코딩 스레드 수 (None 이면 후보 수만큼, 1 이면 순차)
+
+    Returns:
+        EncodeChoice (조건을 만족하는 후보가 없으면 기본 설정 PNG)
+    """
+    if candidates is None:
+        candidates = candidates_for(image, allow_webp)
+    baseline = _cv2_encoder('.png', [])(image)
+    baseline_ms, _ = _decode_ms(baseline)
+
+    def encode(candidate: Candidate) -> Tuple[Candidate, Optional[bytes], str]:
+        try:
+            return candidate, candidate.encode(image), ''
+        except Exception as e:
+            return candidate, None, str(e)
+
+    with profile_stage('encode_candidates'):
+        workers = len(candidates) if threads is None else max(1, threads)
+        if workers == 1:
+            encoded = [encode(candidate) for candidate in candidates]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                encoded = list(pool.map(encode, candidates))
+
+    measurements = [
+        {'name': candidate.name, 'ext': candidate.ext,
+         'bytes': len(data) if data is not None else None, 'error': error}
+        for candidate, data, error in encoded
+    ]
+    by_name = {m['name']: m for m in measurements}
+
+    # 작은 것부터 디코드 시간/픽셀 일치를 확인해 처음 통과하는 후보 선택
+    budget_ms = baseline_ms * decode_budget
+    with profile_stage('verify_candidates'):
+        for candidate, data, _ in sorted(
+                (item for item in encoded if item[1] is not None),
+                key=lambda item: len(item[1])):
+            if len(data) >= len(baseline):
+                break
+            decode_ms, decoded = _decode_ms(data)
+            row = by_name[candidate.name]
+            row['decode_ms'] = decode_ms
+            if not _same_pixels(image, decoded):
+                row['error'] = 'pixel mismatch'
+                continue
+            if decode_ms > budget_ms:
+                row['error'] = f'decode {decode_ms:.1f}ms > budget {budget_ms:.1f}ms'
+                continue
+            return EncodeChoice(candidate.name, candidate.ext, data, decode_ms,
+                                len(baseline), baseline_ms, measurements)
+
+    return EncodeChoice('png-default', '.png', baseline, baseline_ms,
+                        len(baseline), baseline_ms, measurements)
+
+
+def format_measurements(choice: EncodeChoice) -> str:
+    """후보별 크기/디코드 시간 표"""
+    lines = [f"      {'candidate':<28}{'size':>10}{'decode ms':>11}",
+             f"      {'png-default':<28}{format_size(choice.baseline_bytes):>10}"
+             f"{choice.baseline_decode_ms:>11.2f}"]
+    for row in sorted(choice.measurements, key=lambda r: r['bytes'] or float('inf')):
+        size = format_size(row['bytes']) if row['bytes'] is not None else '-'
+        decode = f"{row['decode_ms']:.2f}" if 'decode_ms' in row else '-'
+        mark = ' ✅' if row['name'] == choice.name else ''
+        note = f"  ({row['error']})" if row['error'] else ''
+        lines.append(f"      {row['name']:<28}{size:>10}{decode:>11}{mark}{note}")
+    return "\n".join(lines)
+
+
+def _optimize_file(path: Path, decode_budget: float, allow_webp: bool) -> Dict:
+    """파일 하나를 다시 인코딩해 보고 결과 정보를 반환 (쓰기는 호출자가 결정)"""
+    data = path.read_bytes()
+    image = _decode(data)
+    if image is None:
+        raise ValueError("이미지를 디코드할 수 없습니다")
+    # 파일 하나 안의 후보는 순차 처리 (파일 단위로 스레드 풀에 분배)
+    choice = optimize_encode(image, decode_budget, allow_webp, threads=1)
+    return {'path': path, 'before': len(data), 'choice': choice}
+
+
+def _project_path(path: Path) -> str:
+    """JSON 의 imagePath 형식 (프로젝트 루트 기준 상대 경로)"""
+    return path.resolve().relative_to(PROJECT_ROOT).as_posix()
+
+
+def _update_page_references(renames: Dict[str, str]) -> int:
+    """WebP 로 바뀐 파일의 imagePath 를 카탈로그에서 갱신하고 coloring_pages.json 을 내보냄"""
+    return apply_page_updates({old: {'imagePath': new} for old, new in renames.items()})
+
+
+def optimize_directory(directory: Path, decode_budget: float = DEFAULT_DECODE_BUDGET,
+                       allow_webp: bool = False, jobs: int = 0, dry_run: bool = False,
+                       verbose: bool = False) -> Tuple[int, int]:
+    """
+    디렉토리의 PNG/WebP 를 다시 인코딩해 더 작아지는 파일만 교체하고 전후 크기를 출력합니다.
+
+    Returns:
+        (전체 이전 크기, 전체 이후 크기) bytes
+    """
+    files = sorted(p for p in directory.iterdir()
+                   if p.is_file() and p.suffix.lower() in ('.png', '.webp'))
+    if not files:
+        print(f"❌ 최적화할 이미지가 없습니다: {directory}")
+        return 0, 0
+
+    workers = resolve_jobs(jobs, len(files))
+    print(f"📂 {directory} ({len(files)}개, 스레드 {workers}개, "
+          f"디코드 예산 기본 PNG 의 {decode_budget:g}배{', WebP 허용' if allow_webp else ''})")
+
+    def run(path: Path):
+        try:
+            return _optimize_file(path, decode_budget, allow_webp), None
+        except Exception as e:
+            return {'path': path}, str(e)
+
+    total_before = total_after = 0
+    renames: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for result, error in pool.map(run, files):
+            path = result['path']
+            if error:
+                print(f"   ❌ {path.name}: {error}")
+                continue
+            before, choice = result['before'], result['choice']
+            after = min(before, len(choice.data))
+            total_before += before
+            total_after += after
+            if len(choice.data) < before:
+                saved = (1 - len(choice.data) / before) * 100
+                print(f"   ✅ {path.name}: {format_size(before)} → "
+                      f"{format_size(len(choice.data))} (-{saved:.1f}%, {choice.name})")
+                if not dry_run:
+                    target = path.with_suffix(choice.ext)
+                    try:
+                        keys = (_project_path(path), _project_path(target))
+                    except ValueError:  # 프로젝트 밖의 디렉토리는 JSON 에 기록하지 않음
+                        keys = None
+                    write_bytes(str(target), choice.data)
+                    if target != path:
+                        # 새 파일을 쓰고 경로 변경을 기록한 뒤에 원본을 지움
+                        if keys:
+                            renames[keys[0]] = keys[1]
+                        path.unlink()
+            else:
+                print(f"   ⏭️  {path.name}: {format_size(before)} (이미 최적)")
+            if verbose:
+                print(format_measurements(choice))
+
+    if renames:
+        updated = _update_page_references(renames)
+        print(f"   📝 coloring_pages.json imagePath {updated}개 갱신 (WebP)")
+
+    if total_before:
+        saved = (1 - total_after / total_before) * 100
+        print(f"📊 전체: {format_size(total_before)} → {format_size(total_after)} "
+              f"(-{saved:.1f}%){' [dry-run, 파일 변경 없음]' if dry_run else ''}")
+    return total_before, total_after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="출력 이미지 인코딩 최적화 (무손실)")
+    parser.add_argument('directory', nargs='?', default=str(DEFAULT_IMAGES_DIR),
+                        help='재최적화할 디렉토리 (기본값 assets/images)')
+    parser.add_argument('--decode-budget', type=float, default=DEFAULT_DECODE_BUDGET,
+                        metavar='RATIO',
+                        help='기본 설정 PNG 대비 허용 디코드 시간 배수 (기본값 1.5)')
+    parser.add_argument('--webp', action='store_true',
+                        help='무손실 WebP 도 후보에 포함 (선택되면 확장자와 JSON 경로 변경)')
+    parser.add_argument('--dry-run', action='store_true', help='파일을 바꾸지 않고 보고만 출력')
+    parser.add_argument('--verbose', '-v', action='store_true', help='후보별 크기/디코드 시간 출력')
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help='동시에 처리할 파일 수 (스레드, 기본값 0: CPU 코어 수만큼 자동)')
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"❌ 디렉토리를 찾을 수 없습니다: {directory}")
+        return 1
+    optimize_directory(directory, args.decode_budget, args.webp, args.jobs,
+                       args.dry_run, args.verbose)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+"""
+선 끊김(gap) 찾기/잇기 — 색칠이 옆 영역으로 새지 않도록
+
+AI 가 그린 선화는 윤곽선이 1~3px 씩 끊겨 있는 경우가 많아, 앱에서 한 번 탭하면
+페이지 절반이 칠해집니다. 3x3 MORPH_CLOSE 는 더 넓은 틈을 못 메우고 모든 선을
+두껍게 만들므로, 끊긴 곳만 골라 잇는 단계를 따로 둡니다.
+
+    1. 골격화: Zhang-Suen 세선화 (8-이웃 코드 → 256칸 룩업 테이블, 반복당 배열 연산 몇 번)
+    2. 끝점: 이웃이 하나뿐인 골격 픽셀, 골격을 몇 px 거슬러 올라가 선의 진행 방향을 구함
+    3. 잇기 후보
+        - 끝점-끝점: cKDTree 로 거리 안의 쌍을 찾고, 서로를 향하는(각도 예산 안) 쌍만
+        - 끝점-선: 진행 방향으로 광선을 쏴 max_gap 안에서 다른 선에 닿으면
+       틈이 짧은 후보부터 끝점마다 한 번씩만 골라, 끝점의 선 두께로 직선을 그립니다.
+    4. 작은 흰 영역(앱에서 탭하기 어려운 점 같은 칸) 을 선으로 메움
+
+처리 시간은 메가픽셀당 예산(budget_ms_per_mp) 안으로 제한합니다. 예산을 넘기면 남은
+세선화/후보 탐색을 멈추고(보고서 truncated) 그때까지 찾은 틈만 잇습니다. 영역 라벨링과
+작은 칸 메우기는 픽셀 수에 비례하는 한 번의 패스라 예산과 무관하게 항상 수행합니다.
+
+    - convert_to_coloring_pro.py --close-gaps [PX], image_postprocess.py --close-gaps
+    - 레시피 단계 'close_gaps' (pipeline_recipes)
+
+사용 예:
+    from gap_closing import close_gaps
+
+    page, report = close_gaps(page)          # 흰 배경/검은 선 uint8
+    print(report.summary())
+
+    python scripts/gap_closing.py assets/images --out /tmp/closed --jobs 4
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from batch_executor import add_jobs_argument, run_batch
+from image_io import load_image, write_image
+from region_maps import FILL_TOLERANCE, label_regions
+from stage_profiler import profile_stage
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # 끝점-끝점 후보는 scipy 가 있을 때만 (끝점-선 후보는 항상)
+    cKDTree = None
+
+DEFAULT_MAX_GAP = 3           # 이을 최대 틈 (px, 잉크가 없는 구간 길이)
+DEFAULT_MAX_ANGLE = 45.0      # 선 진행 방향과 잇는 방향 사이 최대 각도 (도)
+DEFAULT_MIN_REGION = 16       # 이보다 작은 흰 영역은 선으로 메움 (px)
+DEFAULT_BUDGET_MS_PER_MP = 250.0
+# 끝점에서 골격을 거슬러 올라가 방향을 잴 거리 (px)
+_DIRECTION_STEPS = 8
+# 세선화 최대 반복 횟수 (선 두께 약 2배까지 세선화)
+_MAX_THIN_ITERATIONS = 10
+
+# 8-이웃 P2..P9 (N, NE, E, SE, S, SW, W, NW) 의 (dy, dx), 코드 비트 0..7
+_NEIGHBORS = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+
+
+def _zhang_suen_luts() -> Tuple[np.ndarray, np.ndarray]:
+    """두 부분 반복에서 지울 픽셀인지 여부 (8-이웃 코드 → bool)"""
+    first = np.zeros(256, dtype=bool)
+    second = np.zeros(256, dtype=bool)
+    for code in range(256):
+        p = [(code >> bit) & 1 for bit in range(8)]
+        p2, p3, p4, p5, p6, p7, p8, p9 = p
+        count = sum(p)
+        transitions = sum(p[i] == 0 and p[(i + 1) % 8] == 1 for i in range(8))
+        if not (2 <= count <= 6 and transitions == 1):
+            continue
+        first[code] = p2 * p4 * p6 == 0 and p4 * p6 * p8 == 0
+        second[code] = p2 * p4 * p8 == 0 and p2 * p6 * p8 == 0
+    return first, second
+
+
+_THIN_LUTS = _zhang_suen_luts()
+
+
+class _Deadline:
+    def __init__(self, budget_ms: float):
+        self.end = time.perf_counter() + budget_ms / 1000.0
+        self.expired = False
+
+    def check(self) -> bool:
+        """예산을 넘겼으면 True (한 번 넘기면 계속 True)"""
+        if not self.expired and time.perf_counter() > self.end:
+            self.expired = True
+        return self.expired
+
+
+class GapReport:
+    """페이지 하나의 틈 잇기 결과"""
+
+    def __init__(self):
+        self.endpoints = 0
+        self.joined_endpoints = 0     # 끝점-끝점으로 이은 틈
+        self.joined_to_line = 0       # 끝점-선으로 이은 틈
+        self.speckles_filled = 0
+        self.regions_before = 0
+        self.regions_after = 0
+        self.elapsed_ms = 0.0
+        self.budget_ms = 0.0
+        self.truncated = False
+
+    @property
+    def gaps_closed(self) -> int:
+        return self.joined_endpoints + self.joined_to_line
+
+    def as_dict(self) -> Dict:
+        return {
+            'endpoints': self.endpoints, 'gaps_closed': self.gaps_closed,
+            'joined_endpoints': self.joined_endpoints, 'joined_to_line': self.joined_to_line,
+            'speckles_filled': self.speckles_filled,
+            'regions_before': self.regions_before, 'regions_after': self.regions_after,
+            'elapsed_ms': round(self.elapsed_ms, 1), 'budget_ms': round(self.budget_ms, 1),
+            'truncated': self.truncated,
+        }
+
+    def summary(self) -> str:
+        budget = " ⏱️ 예산 초과로 일부만" if self.truncated else ""
+        return (f"틈 {self.gaps_closed}개 이음 (끝점-끝점 {self.joined_endpoints}, "
+                f"끝점-선 {self.joined_to_line}, 끝점 {self.endpoints}개), "
+                f"작은 칸 {self.speckles_filled}개 메움, "
+                f"영역 {self.regions_before}→{self.regions_after}, "
+                f"{self.elapsed_ms:.0f}/{self.budget_ms:.0f}ms{budget}")
+
+    def __repr__(self) -> str:
+        return f"GapReport({self.as_dict()})"
+
+
+def _neighbor_code(binary: np.ndarray) -> np.ndarray:
+    """0/1 이미지의 픽셀별 8-이웃 코드 (비트 k = _NEIGHBORS[k])"""
+    padded = np.pad(binary, 1)
+    height, width = binary.shape
+    code = np.zeros(binary.shape, dtype=np.uint8)
+    for bit, (dy, dx) in enumerate(_NEIGHBORS):
+        code |= padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width] << bit
+    return code
+
+
+def skeletonize(ink: np.ndarray, deadline: Optional[_Deadline] = None) -> Optional[np.ndarray]:
+    """
+    Zhang-Suen 세선화. ink 는 0/255 (255 = 선), 결과는 0/1 uint8 골격.
+
+    잉크가 있는 영역(bounding box)만 처리하며, 예산을 넘기면 None 을 반환합니다.
+    """
+    skeleton = np.zeros(ink.shape, dtype=np.uint8)
+    x, y, w, h = cv2.boundingRect(ink)
+    if w == 0 or h == 0:
+        return skeleton
+    with profile_stage('skeletonize'):
+        crop = (ink[y:y + h, x:x + w] > 0).astype(np.uint8)
+        for _ in range(_MAX_THIN_ITERATIONS):
+            removed = 0
+            for lut in _THIN_LUTS:
+                delete = lut[_neighbor_code(crop)] & (crop > 0)
+                removed += int(np.count_nonzero(delete))
+                crop[delete] = 0
+            if removed == 0:
+                break
+            if deadline is not None and deadline.check():
+                return None
+    skeleton[y:y + h, x:x + w] = crop
+    return skeleton
+
+
+def find_endpoints(skeleton: np.ndarray) -> np.ndarray:
+    """이웃 골격 픽셀이 정확히 하나인 골격 픽셀의 (x, y) 목록"""
+    neighbors = cv2.filter2D(skeleton, cv2.CV_8U, np.ones((3, 3), np.uint8),
+                             borderType=cv2.BORDER_CONSTANT)
+    ys, xs = np.nonzero((skeleton > 0) & (neighbors == 2))  # 자기 자신 포함
+    return np.stack([xs, ys], axis=1)
+
+
+def _stroke_direction(skeleton: np.ndarray, x: int, y: int) -> Optional[np.ndarray]:
+    """끝점에서 골격을 거슬러 올라가 구한, 선이 끝점 밖으로 뻗어 나가는 단위 방향"""
+    height, width = skeleton.shape
+    visited = {(x, y)}
+    cx, cy = x, y
+    for _ in range(_DIRECTION_STEPS):
+        step = None
+        for dy, dx in _NEIGHBORS:
+            nx, ny = cx + dx, cy + dy
+            if 0 <= nx < width and 0 <= ny < height and skeleton[ny, nx] \
+                    and (nx, ny) not in visited:
+                step = (nx, ny)
+                break
+        if step is None:
+            break
+        visited.add(step)
+        cx, cy = step
+    direction = np.array([x - cx, y - cy], dtype=np.float64)
+    length = np.hypot(*direction)
+    return direction / length if length >= 2 else None
+
+
+def _gap_length(ink: np.ndarray, start: np.ndarray, end: np.ndarray) -> int:
+    """두 점 사이 직선 위 잉크가 없는 픽셀 수"""
+    steps = int(np.ceil(np.hypot(*(end - start)))) + 1
+    xs = np.rint(np.linspace(start[0], end[0], steps)).astype(int)
+    ys = np.rint(np.linspace(start[1], end[1], steps)).astype(int)
+    return int(np.count_nonzero(ink[ys, xs] == 0))
+
+
+def _cast_ray(ink: np.ndarray, start: np.ndarray, direction: np.ndarray,
+              max_gap: int, reach: int) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    끝점에서 진행 방향으로 나가 자기 선을 벗어난 뒤 max_gap 안에 다른 잉크를 만나면
+    (닿은 점, 틈 길이) 를 반환
+    """
+    height, width = ink.shape
+    gap = 0
+    for t in range(1, reach + max_gap + 1):
+        px, py = np.rint(start + direction * t).astype(int)
+        if not (0 <= px < width and 0 <= py < height):
+            return None
+        if ink[py, px]:
+            if gap:
+                return np.array([px, py]), gap
+        else:
+            gap += 1
+            if gap > max_gap:
+                return None
+    return None
+
+
+def _angle_ok(direction: np.ndarray, vector: np.ndarray, cos_limit: float) -> bool:
+    length = np.hypot(*vector)
+    return length > 0 and float(direction @ vector) / length >= cos_limit
+
+
+def close_gaps(page: np.ndarray, max_gap: int = DEFAULT_MAX_GAP,
+               max_angle: float = DEFAULT_MAX_ANGLE,
+               min_region: int = DEFAULT_MIN_REGION,
+               budget_ms_per_mp: float = DEFAULT_BUDGET_MS_PER_MP) -> Tuple[np.ndarray, GapReport]:
+    """
+    흰 배경/검은 선 도안의 끊긴 선을 잇고 작은 흰 영역을 메웁니다.
+
+    Args:
+        page: uint8 그레이스케일 도안 (흰 배경, 검은 선)
+        max_gap: 이을 최대 틈 길이 (px)
+        max_angle: 선 진행 방향과 잇는 방향 사이 최대 각도 (도)
+        min_region: 이보다 작은 흰 영역은 선으로 메움 (0 이면 메우지 않음)
+        budget_ms_per_mp: 메가픽셀당 처리 시간 예산 (ms)
+
+    Returns:
+        (0/255 결과 도안, GapReport)
+    """
+    start = time.perf_counter()
+    report = GapReport()
+    report.budget_ms = budget_ms_per_mp * page.shape[0] * page.shape[1] / 1e6
+    deadline = _Deadline(report.budget_ms)
+
+    ink = cv2.compare(page, 128, cv2.CMP_LT)
+    report.regions_before = label_regions(cv2.bitwise_not(ink), FILL_TOLERANCE)[1]
+    skeleton = skeletonize(ink, deadline)
+    joins: List[Tuple[np.ndarray, np.ndarray, int]] = []
+
+    if skeleton is None:
+        report.truncated = True
+    else:
+        with profile_stage('gap_candidates'):
+            endpoints = find_endpoints(skeleton)
+            report.endpoints = len(endpoints)
+            # 끝점의 선 반두께 (끝점은 골격 위라 선 안쪽)
+            half_width = cv2.distanceTransform(ink, cv2.DIST_L2, 3)
+            cos_limit = np.cos(np.radians(max_angle))
+
+            directions = []
+            for x, y in endpoints:
+                if deadline.check():
+                    report.truncated = True
+                    break
+                directions.append(_stroke_direction(skeleton, int(x), int(y)))
+            endpoints = endpoints[:len(directions)].astype(np.float64)
+            widths = np.array([half_width[int(y), int(x)] for x, y in endpoints])
+
+            # (틈 길이, 각도 비용, 끝점 a, 끝점 b 또는 -1, 닿는 점)
+            candidates = []
+            if cKDTree is not None and len(endpoints) > 1:
+                reach = max_gap + 2 * (float(widths.max()) + 1)
+                for a, b in cKDTree(endpoints).query_pairs(reach):
+                    if deadline.check():
+                        report.truncated = True
+                        break
+                    da, db = directions[a], directions[b]
+                    if da is None or db is None:
+                        continue
+                    vector = endpoints[b] - endpoints[a]
+                    if not (_angle_ok(da, vector, cos_limit) and _angle_ok(db, -vector, cos_limit)):
+                        continue
+                    gap = _gap_length(ink, endpoints[a], endpoints[b])
+                    if 0 < gap <= max_gap:
+                        cost = 2 - float(da @ vector - db @ vector) / np.hypot(*vector)
+                        candidates.append((gap, cost, a, b, endpoints[b]))
+            for a, direction in enumerate(directions):
+                if deadline.check():
+                    report.truncated = True
+                    break
+                if direction is None:
+                    continue
+                hit = _cast_ray(ink, endpoints[a], direction, max_gap,
+                                int(np.ceil(widths[a])) + 1)
+                if hit is not None:
+                    target, gap = hit
+                    candidates.append((gap, 1.0, a, -1, target.astype(np.float64)))
+
+        # 짧은 틈, 곧은 연결부터 끝점마다 한 번씩
+        used = set()
+        for gap, _, a, b, target in sorted(candidates, key=lambda c: (c[0], c[1])):
+            if a in used or (b >= 0 and b in used):
+                continue
+            used.add(a)
+            if b >= 0:
+                used.add(b)
+                report.joined_endpoints += 1
+                width = min(widths[a], widths[b])
+            else:
+                report.joined_to_line += 1
+                width = widths[a]
+            thickness = max(1, int(round(2 * width - 1)))
+            joins.append((endpoints[a], target, thickness))
+
+    with profile_stage('gap_join'):
+        for point_a, point_b, thickness in joins:
+            cv2.line(ink, tuple(int(v) for v in np.rint(point_a)),
+                     tuple(int(v) for v in np.rint(point_b)), 255, thickness)
+
+        paper = cv2.bitwise_not(ink)
+        if min_region > 0:
+            count, labels, stats, _ = cv2.connectedComponentsWithStats(paper, connectivity=4)
+            small = stats[:, cv2.CC_STAT_AREA] < min_region
+            small[0] = False  # 배경(선) 라벨
+            report.speckles_filled = int(np.count_nonzero(small))
+            if report.speckles_filled:
+                paper[small[labels]] = 0
+    report.regions_after = label_regions(paper, FILL_TOLERANCE)[1]
+    report.elapsed_ms = (time.perf_counter() - start) * 1000
+    return paper, report
+
+
+def _close_task(task: Tuple[str, str, Dict]) -> GapReport:
+    src, dst, settings = task
+    page = load_image(src, cv2.IMREAD_GRAYSCALE)
+    result, report = close_gaps(page, **settings)
+    write_image(dst, result)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도안의 끊긴 선 잇기 (색칠 새는 곳 막기)")
+    parser.add_argument('inputs', nargs='+', help='도안 파일 또는 디렉토리')
+    parser.add_argument('--out', default=None,
+                        help='결과 저장 디렉토리 (기본값: 제자리 덮어쓰기)')
+    parser.add_argument('--max-gap', type=int, default=DEFAULT_MAX_GAP,
+                        help=f'이을 최대 틈 px (기본값 {DEFAULT_MAX_GAP})')
+    parser.add_argument('--max-angle', type=float, default=DEFAULT_MAX_ANGLE,
+                        help=f'선 방향과 잇는 방향의 최대 각도 (기본값 {DEFAULT_MAX_ANGLE:g})')
+    parser.add_argument('--min-region', type=int, default=DEFAULT_MIN_REGION,
+                        help=f'이보다 작은 흰 칸은 메움 px (기본값 {DEFAULT_MIN_REGION}, 0=끔)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS_PER_MP,
+                        help=f'메가픽셀당 시간 예산 ms (기본값 {DEFAULT_BUDGET_MS_PER_MP:g})')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    files = []
+    for item in map(Path, args.inputs):
+        if item.is_dir():
+            files.extend(sorted(p for p in item.iterdir() if p.suffix.lower() == '.png'))
+        elif item.is_file():
+            files.append(item)
+    if not files:
+        print("❌ 처리할 도안이 없습니다.")
+        return 1
+
+    out_dir = Path(args.out) if args.out else None
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    settings = {'max_gap': args.max_gap, 'max_angle': args.max_angle,
+                'min_region': args.min_region, 'budget_ms_per_mp': args.budget}
+    tasks = [(str(path), str(out_dir / path.name if out_dir else path), settings)
+             for path in files]
+
+    print(f"🔗 틈 잇기: {len(tasks)}개 (최대 {args.max_gap}px, {args.max_angle:g}°)")
+    totals = {'gaps_closed': 0, 'speckles_filled': 0, 'truncated': 0}
+    failed = 0
+    for (src, *_), outcome in run_batch(_close_task, tasks, args.jobs):
+        name = Path(src).name
+        if not outcome.ok:
+            print(f"   ❌ {name}: {outcome.error}")
+            failed += 1
+            continue
+        report = outcome.value
+        print(f"   ✅ {name}: {report.summary()}")
+        for key in totals:
+            totals[key] += getattr(report, key)
+    print(f"📊 틈 {totals['gaps_closed']}개, 작은 칸 {totals['speckles_filled']}개, "
+          f"예산 초과 {totals['truncated']}개, 실패 {failed}개")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,101 @@
+"""
+여러 카테고리 도안을 한 프로세스에서 한 번에 생성
+
+카테고리마다 generate_images_gemini.py 를 따로 실행하면 매번 인터프리터/cv2/google-genai
+import 와 클라이언트 생성을 반복하고, 실행마다 coloring_pages.json 전체를 다시 읽고
+덮어씁니다. 이 스크립트는 클라이언트와 카탈로그를 한 번만 준비하고, 모든 카테고리의
+요청을 하나의 생성 파이프라인(generation_pipeline)에 넣어 모델별 전역 속도 제한
+(rate_limiter) 안에서 함께 처리합니다.
+
+    - 주제 선정은 카테고리마다 한 번의 호출로 먼저 끝냅니다.
+    - 완료된 페이지는 바로 카탈로그 저장소(catalog_store)에 등록하고, coloring_pages.json 은
+      --checkpoint-every 장마다 그리고 마지막에 한 번 원자적으로 내보냅니다
+      (중단돼도 JSON 이 깨지지 않고 완료된 도안까지는 남음).
+    - 페이지는 완료 순서와 무관하게 (카테고리 순서, 주제 순서) 대로 등록됩니다.
+
+사용 예:
+    python scripts/generate_all.py
+    python scripts/generate_all.py ocean desserts --count 5 --style simple
+"""
+
+import argparse
 import os
-import subprocess
 import sys
 
+from catalog_store import open_catalog
+from generate_images_gemini import (
+    build_page_requests, ensure_category, generate_subjects, generation_stages,
+    print_generation_report, style_prompts
+)
+from generation_engine import batch_timestamp, page_registrar
+from generation_pipeline import run_pipeline
+
 # Categories to generate
 categories = ["forest", "ocean", "fairy", "vehicles", "dinosaurs", "desserts"]
 style = "cartoon"
 count = 20
+# 이 장수만큼 새로 완료될 때마다 coloring_pages.json 내보내기
+CHECKPOINT_EVERY = 10
 
-def run_gen(cat):
-    print(f"\n>>> Generating {cat}...")
-    subprocess.run([sys.executable, "scripts/generate_images_gemini.py", cat, style, str(count)])
 
-if __name__ == "__main__":
-    for cat in categories:
-        run_gen(cat)
+def generate_all(category_ids, style, count, output_dir="assets/images",
+                 checkpoint_every=CHECKPOINT_EVERY):
+    """모든 카테고리의 도안을 한 배치로 생성하고 등록된 개수를 반환합니다."""
+    os.makedirs(output_dir, exist_ok=True)
+    catalog = open_catalog()
+    timestamp = batch_timestamp()
+
+    page_requests = []
+    for category_id in category_ids:
+        ensure_category(catalog, category_id)
+        print(f"\n>>> '{category_id}' 주제 {count}개 선정 중...")
+        subjects = generate_subjects(category_id, count)
+        print(f"선정된 주제: {', '.join(subjects)}")
+        page_requests += build_page_requests(category_id, style, subjects, timestamp,
+                                             output_dir, start_index=len(page_requests))
+
+    register = page_registrar(catalog, page_requests)
+    succeeded = [0]
+
+    def checkpoint(request, outcome, done, total, elapsed):
+        register(request, outcome, done, total, elapsed)
+        if not outcome.ok:
+            return
+        succeeded[0] += 1
+        if succeeded[0] % checkpoint_every == 0:
+            catalog.export_json()
+            print(f"  💾 체크포인트 저장 ({succeeded[0]}/{total})")
+
+    print(f"\n🎨 {len(category_ids)}개 카테고리, {len(page_requests)}장 생성 시작")
+    results, stats = run_pipeline(generation_stages(), page_requests, on_complete=checkpoint)
+    added = sum(1 for _, outcome in results if outcome.ok)
+    catalog.export_json()
+    catalog.close()
+    print(f"\n저장 및 등록 완료: {added}/{len(page_requests)}개")
+    print_generation_report(stats)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 카테고리 도안을 한 번에 생성")
+    parser.add_argument('categories', nargs='*', default=categories,
+                        help=f"카테고리 ID (기본값 {' '.join(categories)})")
+    parser.add_argument('--style', default=style, choices=sorted(style_prompts),
+                        help=f'스타일 (기본값 {style})')
+    parser.add_argument('--count', type=int, default=count,
+                        help=f'카테고리당 도안 수 (기본값 {count})')
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help=f'이 장수마다 coloring_pages.json 내보내기 (기본값 {CHECKPOINT_EVERY})')
+    args = parser.parse_args()
+
+    if not os.getenv("GEMINI_API_KEY"):
+        print("오류: .env 파일 또는 환경 변수에 GEMINI_API_KEY를 입력해주세요.")
+        return 1
+    added = generate_all(args.categories, args.style, args.count,
+                         checkpoint_every=max(1, args.checkpoint_every))
     print("\nAll categories generated!")
+    return 0 if added else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,19 @@
 import os
-import time
-import json
-import datetime
 import random
 from google import genai
 from google.genai import types
 from dotenv import load_dotenv
 
+from catalog_store import open_catalog
+from generation_engine import (
+    PageRequest, batch_timestamp, concurrency_from_env, page_registrar, run_generation
+)
+from rate_limiter import RateLimiter
+
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 client = genai.Client(api_key=GEMINI_API_KEY)
-
-def load_config():
-    config_path = 'assets/data/coloring_pages.json'
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_config(config):
-    config_path = 'assets/data/coloring_pages.json'
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+limiter = RateLimiter()
 
 def generate_forest_collection():
     subjects = [
@@ -52,66 +46,60 @@ def generate_forest_collection():
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         
-    config = load_config()
+    catalog = open_catalog()
     # Ensure category exists
-    if not any(c['id'] == category_id for c in config['categories']):
-        config['categories'].append({"id": category_id, "nameKey": "categoryForest", "isFree": True})
+    catalog.add_category({"id": category_id, "nameKey": "categoryForest", "isFree": True})
 
     image_models = ['imagen-4.0-generate-001', 'imagen-4.0-fast-generate-001']
 
+    # File names/ids are fixed before any request so concurrent requests never collide
+    timestamp = batch_timestamp()
+    page_requests = []
     for i, subject in enumerate(subjects):
-        try:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-            filename = f"forest_{timestamp}_{i}.png"
-            output_path = os.path.join(output_dir, filename)
-            
-            final_prompt = (
-                f"A coloring book page of {subject}. "
-                f"Style: {style_prompt}. "
-                "Requirements: Single main subject centered, strictly black and white line art, pure white background, no shading, no gray tones, no colors, high contrast, clean white space. "
-                "CRITICAL: NO TEXT, NO LETTERS, NO WORDS, NO NUMBERS, NO SYMBOLS, NO WATERMARKS, NO SIGNATURES."
-            )
-            
-            print(f"[{i+1}/20] Generating: {subject}")
-            
-            success = False
-            for model in image_models:
-                try:
-                    response = client.models.generate_images(
-                        model=model,
-                        prompt=final_prompt,
-                        config=types.GenerateImagesConfig(
-                            number_of_images=1,
-                            aspect_ratio="3:4",
-                            output_mime_type="image/png"
-                        )
+        filename = f"forest_{timestamp}_{i}.png"
+        page_requests.append(PageRequest(i, subject, os.path.join(output_dir, filename), {
+            "id": f"forest_{timestamp}_{i}",
+            "name": subject,
+            "nameKey": f"pageForest{i+1}",
+            "imagePath": f"assets/images/{filename}",
+            "categoryId": category_id
+        }))
+
+    async def generate(request: PageRequest) -> None:
+        final_prompt = (
+            f"A coloring book page of {request.subject}. "
+            f"Style: {style_prompt}. "
+            "Requirements: Single main subject centered, strictly black and white line art, pure white background, no shading, no gray tones, no colors, high contrast, clean white space. "
+            "CRITICAL: NO TEXT, NO LETTERS, NO WORDS, NO NUMBERS, NO SYMBOLS, NO WATERMARKS, NO SIGNATURES."
+        )
+        for model in image_models:
+            try:
+                response = await limiter.call(
+                    model, client.aio.models.generate_images,
+                    model=model,
+                    prompt=final_prompt,
+                    config=types.GenerateImagesConfig(
+                        number_of_images=1,
+                        aspect_ratio="3:4",
+                        output_mime_type="image/png"
                     )
-                    if response.generated_images:
-                        response.generated_images[0].image.save(output_path)
-                        success = True
-                        break
-                except Exception as e:
-                    print(f"  Model {model} failed: {e}")
-                    continue
-            
-            if success:
-                new_page = {
-                    "id": f"forest_{timestamp}_{i}",
-                    "name": subject,
-                    "nameKey": f"pageForest{i+1}",
-                    "imagePath": f"assets/images/{filename}",
-                    "categoryId": category_id
-                }
-                config['pages'].append(new_page)
-                print(f"  Success: {filename}")
-                save_config(config) # Save progress after each success
-            else:
-                print(f"  Failed to generate image for: {subject}")
-            
-            time.sleep(2) # Avoid rate limits
-            
-        except Exception as e:
-            print(f"  Error: {e}")
+                )
+            except Exception as e:
+                print(f"  [{request.index + 1}] Model {model} failed: {e}")
+                continue
+            if response.generated_images:
+                response.generated_images[0].image.save(request.output_path)
+                return
+        raise RuntimeError("all models failed")
+
+    # Each completed page is registered in the catalog store right away (one row insert,
+    # positions reserved in subject order); the JSON is exported once at the end
+    print(f"Generating {len(page_requests)} pages ({concurrency_from_env()} concurrent requests)")
+    run_generation(generate, page_requests, on_complete=page_registrar(catalog, page_requests))
+    catalog.export_json()
+    catalog.close()
+    print("Throughput per model:")
+    print(limiter.format_report())
 
     print("\nForest collection generation complete!")
 
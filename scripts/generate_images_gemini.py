@@ -1,77 +1,51 @@
 import os
-import time
-import json
-import datetime
 import sys
 import random
-import cv2
-import numpy as np
 from google import genai
 from google.genai import types
 from dotenv import load_dotenv
 
+from auto_threshold import parse_threshold
+from catalog_store import open_catalog
+from generation_engine import (
+    PageRequest, batch_timestamp, concurrency_from_env, page_registrar
+)
+from generation_pipeline import PROCESS, THREAD, Stage, format_stage_stats, run_pipeline
+from page_stages import (
+    apply_bw_postprocess, bw_postprocess, encode_stage, postprocess_stage, register_stage
+)
+from rate_limiter import RateLimiter
+
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
 # Gemini 설정
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-# 새로운 SDK 클라이언트 초기화
+# 흑백 후처리 임계값: 0-255 정수 또는 auto/otsu/triangle/lineart (이미지별 자동 선택)
+BW_THRESHOLD = parse_threshold(os.getenv("BW_THRESHOLD", "200"))
+
+# 새로운 SDK 클라이언트 초기화 (동기 호출과 client.aio 비동기 호출이 공유)
 client = genai.Client(api_key=GEMINI_API_KEY)
+# 모든 API 호출이 공유하는 모델별 속도 제한 (고정 sleep 대신)
+limiter = RateLimiter()
 
 def load_config():
-    config_path = 'assets/data/coloring_pages.json'
-    if os.path.exists(config_path):
-        with open(config_path, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                pass
-    return {"categories": [], "pages": []}
+    """카탈로그 내용 (읽기 전용, 등록은 catalog_store 로)"""
+    with open_catalog() as catalog:
+        return catalog.to_config()
 
-def save_config(config):
-    config_path = 'assets/data/coloring_pages.json'
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
-
-def apply_bw_postprocess(image_path: str, threshold_value: int = 200):
+def save_postprocessed(image_bytes: bytes, output_path: str,
+                       threshold_value=BW_THRESHOLD) -> bool:
     """
-    이미지를 흑백(이진화)으로 변환합니다.
-    - 회색 톤 제거 및 선명한 선 확보
-    - 배경 반전 보정
+    API 가 돌려준 이미지 bytes 를 메모리에서 흑백 변환하고, 여러 PNG 설정 중 가장 작은
+    무손실 결과로 한 번만 저장합니다 (export_optimizer).
+    후처리에 실패하면 원본 bytes 를 그대로 저장하고 False 를 반환합니다.
+    (postprocess_stage → encode_stage → register_stage 를 한 번에 실행)
     """
-    try:
-        # 이미지 로드
-        img = cv2.imread(image_path)
-        if img is None:
-            print(f"  경고: 이미지를 불러올 수 없습니다: {image_path}")
-            return False
-        
-        # 그레이스케일 변환
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # 이진화 (임계값 기반)
-        _, binary = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_BINARY)
-        
-        # 배경 반전 확인 및 보정
-        # 코너 픽셀들을 확인하여 배경이 검은색이면 반전
-        h, w = binary.shape
-        corners = [binary[0, 0], binary[0, -1], binary[-1, 0], binary[-1, -1]]
-        if np.mean(corners) < 128:
-            binary = cv2.bitwise_not(binary)
-            
-        # 가벼운 노이즈 제거만 수행
-        kernel = np.ones((2, 2), np.uint8)
-        binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
-        
-        # 저장 (원본 덮어쓰기)
-        cv2.imwrite(image_path, binary)
-        print(f"  ✓ 기본 흑백 변환 완료")
-        return True
-        
-    except Exception as e:
-        print(f"  경고: 후처리 실패 - {e}")
-        return False
+    page = {'path': output_path, 'image': image_bytes, 'threshold_value': threshold_value}
+    return register_stage(encode_stage(postprocess_stage(page)))
+
 def generate_subjects(category_id, count):
     """
     Gemini를 사용하여 주어진 카테고리에 적합한 색칠공부 주제 목록을 생성합니다.
@@ -102,7 +76,8 @@ def generate_subjects(category_id, count):
     for model_name in models_to_try:
         try:
             print(f"주제 생성 시도 중 (모델: {model_name})...")
-            response = client.models.generate_content(
+            response = limiter.call_sync(
+                model_name, client.models.generate_content,
                 model=model_name,
                 contents=prompt
             )
@@ -124,6 +99,94 @@ style_prompts = {
     "simple": "extremely simple shapes, very thick borders, minimal detail, perfect for young children"
 }
 
+# 시스템 리스트 기반 이미지 모델 후보
+image_models = [
+    'imagen-4.0-generate-001',
+    'imagen-4.0-fast-generate-001'
+]
+
+def ensure_category(catalog, category_id):
+    """카테고리가 카탈로그에 없으면 기본 카테고리로 추가합니다."""
+    if not catalog.has_category(category_id):
+        print(f"경고: 카테고리 '{category_id}'가 JSON에 없습니다. 기본 카테고리로 추가합니다.")
+        catalog.add_category({
+            "id": category_id,
+            "nameKey": f"category{category_id.capitalize()}"
+        })
+
+def build_page_requests(category_id, style, subjects, timestamp,
+                        output_dir="assets/images", start_index=0):
+    """
+    주제마다 PageRequest 를 만듭니다. 파일 이름/페이지 id 는 요청 전에
+    (카테고리, 배치 시각, 카테고리 안 순번) 으로 정해 동시 요청끼리 겹치지 않게 합니다.
+    start_index 는 여러 카테고리를 한 배치로 돌릴 때 전체 요청 순번의 시작값입니다.
+    """
+    page_requests = []
+    for i, subject in enumerate(subjects):
+        filename = f"{category_id}_{timestamp}_{i}.png"
+        page_requests.append(PageRequest(start_index + i, subject, os.path.join(output_dir, filename), {
+            "id": f"{category_id}_{timestamp}_{i}",
+            "name": subject,
+            "nameKey": f"page{subject.replace(' ', '')}",
+            "imagePath": f"assets/images/{filename}",
+            "categoryId": category_id
+        }, style=style))
+    return page_requests
+
+def build_prompt(subject, style):
+    # 최종 프롬프트 구성 (글자 배제 강화)
+    return (
+        f"A coloring book page of a single {subject}. "
+        f"Style: {style_prompts[style]}. "
+        "Requirements: Single main subject centered in the frame, strictly black and white line art, pure white background, no shading, no gray tones, no colors, high contrast, clean white space for coloring. "
+        "CRITICAL: ABSOLUTELY NO TEXT, NO LETTERS, NO WORDS, NO NUMBERS, NO SYMBOLS, NO LABELS, NO CAPTIONS, NO WATERMARKS, NO SIGNATURES. "
+        "The image must be 100% DRAWING ONLY. DO NOT INCLUDE ANY ALPHABETIC OR NUMERIC CHARACTERS AT ALL."
+    )
+
+async def fetch_image(request: PageRequest) -> dict:
+    """파이프라인 첫 단계: 모델 후보를 차례로 시도해 응답 이미지 bytes 를 받아 옵니다."""
+    final_prompt = build_prompt(request.subject, request.style or "cartoon")
+    for img_model in image_models:
+        try:
+            image_response = await limiter.call(
+                img_model, client.aio.models.generate_images,
+                model=img_model,
+                prompt=final_prompt,
+                config=types.GenerateImagesConfig(
+                    number_of_images=1,
+                    aspect_ratio="3:4",
+                    output_mime_type="image/png"
+                )
+            )
+        except Exception as img_e:
+            print(f"  [{request.subject}] 모델 {img_model} 실패: {img_e}")
+            continue
+
+        if image_response.generated_images:
+            # 응답 bytes 는 후처리 단계(프로세스 풀)로 넘기고 바로 다음 요청을 받음
+            return {
+                'path': request.output_path,
+                'name': request.subject,
+                'image': image_response.generated_images[0].image.image_bytes,
+                'threshold_value': BW_THRESHOLD,
+            }
+    raise RuntimeError("모든 모델 시도 실패")
+
+def generation_stages(concurrency=None):
+    """생성 → 후처리 → 인코딩 → 저장 파이프라인 단계 (동시 요청 수 기본값은 환경 변수)"""
+    return [
+        Stage('fetch', fetch_image, workers=concurrency or concurrency_from_env()),
+        Stage('postprocess', postprocess_stage, kind=PROCESS),
+        Stage('encode', encode_stage, kind=PROCESS),
+        Stage('register', register_stage, kind=THREAD),
+    ]
+
+def print_generation_report(stats):
+    print("⏱️  단계별 처리 현황")
+    print(format_stage_stats(stats))
+    print("📈 모델별 처리량")
+    print(limiter.format_report())
+
 def generate_coloring_pages(category_id, style, count, output_dir="assets/images"):
     """
     주어진 카테고리에 대해 이미지를 생성하고 설정 파일을 업데이트합니다.
@@ -135,95 +198,32 @@ def generate_coloring_pages(category_id, style, count, output_dir="assets/images
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    config = load_config()
+    catalog = open_catalog()
     
     # 카테고리 존재 확인
-    category_exists = any(c['id'] == category_id for c in config['categories'])
-    if not category_exists:
-        print(f"경고: 카테고리 '{category_id}'가 JSON에 없습니다. 기본 카테고리로 추가합니다.")
-        config['categories'].append({
-            "id": category_id,
-            "nameKey": f"category{category_id.capitalize()}"
-        })
+    ensure_category(catalog, category_id)
 
     # 주제 생성
     print(f"'{category_id}' 카테고리에 대한 {count}개의 주제를 선정 중...")
     subjects = generate_subjects(category_id, count)
     print(f"선정된 주제: {', '.join(subjects)}")
 
-    # 시스템 리스트 기반 이미지 모델 후보
-    image_models = [
-        'imagen-4.0-generate-001',
-        'imagen-4.0-fast-generate-001'
-    ]
-
-    for subject in subjects:
-        try:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-            filename = f"{category_id}_{timestamp}.png"
-            output_path = os.path.join(output_dir, filename)
-            
-            print(f"[{subject}] 이미지 생성 시도 중 ({filename})...")
-            
-            # 최종 프롬프트 구성 (글자 배제 강화)
-            final_prompt = (
-                f"A coloring book page of a single {subject}. "
-                f"Style: {style_prompts[style]}. "
-                "Requirements: Single main subject centered in the frame, strictly black and white line art, pure white background, no shading, no gray tones, no colors, high contrast, clean white space for coloring. "
-                "CRITICAL: ABSOLUTELY NO TEXT, NO LETTERS, NO WORDS, NO NUMBERS, NO SYMBOLS, NO LABELS, NO CAPTIONS, NO WATERMARKS, NO SIGNATURES. "
-                "The image must be 100% DRAWING ONLY. DO NOT INCLUDE ANY ALPHABETIC OR NUMERIC CHARACTERS AT ALL."
-            )
+    page_requests = build_page_requests(category_id, style, subjects, batch_timestamp(), output_dir)
 
-            success = False
-            for img_model in image_models:
-                try:
-                    print(f"  사용 모델: {img_model}")
-                    image_response = client.models.generate_images(
-                        model=img_model, 
-                        prompt=final_prompt,
-                        config=types.GenerateImagesConfig(
-                            number_of_images=1,
-                            aspect_ratio="3:4",
-                            output_mime_type="image/png"
-                        )
-                    )
-
-                    if image_response.generated_images:
-                        # 이미지 저장
-                        image_response.generated_images[0].image.save(output_path)
-                        
-                        # 흑백 후처리 적용
-                        print(f"  흑백 후처리 적용 중...")
-                        apply_bw_postprocess(output_path)
-                        
-                        success = True
-                        break
-                except Exception as img_e:
-                    print(f"  모델 {img_model} 실패: {img_e}")
-                    continue
-
-            if success:
-                # JSON 업데이트
-                page_id = f"{category_id}_{timestamp}"
-                new_page = {
-                    "id": page_id,
-                    "name": subject,
-                    "nameKey": f"page{subject.replace(' ', '')}",
-                    "imagePath": f"assets/images/{filename}",
-                    "categoryId": category_id
-                }
-                config['pages'].append(new_page)
-                print(f"저장 및 등록 완료: {subject}")
-            else:
-                print(f"이미지 생성 실패 ({subject}): 모든 모델 시도 실패")
-
-            # Quota 및 Timestamp 중복 방지
-            time.sleep(5.0)
-
-        except Exception as e:
-            print(f"에러 발생 ({subject}): {e}")
+    concurrency = concurrency_from_env()
+    print(f"이미지 생성 중 (동시 요청 {concurrency}개, 후처리/인코딩은 병렬 파이프라인)...")
+    # 성공한 페이지는 완료되는 즉시 카탈로그에 등록 (위치는 주제 순서대로 예약)
+    results, stats = run_pipeline(generation_stages(concurrency), page_requests,
+                                  on_complete=page_registrar(catalog, page_requests, None))
+    for request, outcome in results:
+        if not outcome.ok:
+            print(f"  ❌ {request.subject}: {outcome.error}")
+    added = sum(1 for _, outcome in results if outcome.ok)
+    print(f"저장 및 등록 완료: {added}/{len(page_requests)}개")
+    print_generation_report(stats)
 
-    save_config(config)
+    catalog.export_json()
+    catalog.close()
     print("\n설정 파일(coloring_pages.json) 업데이트가 완료되었습니다.")
 
 if __name__ == "__main__":
@@ -1,43 +1,59 @@
+import asyncio
 import os
-import time
-import json
-import datetime
 import requests
 import sys
 import random
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
 from PIL import Image
 from io import BytesIO
 
+from catalog_store import open_catalog
+from generation_engine import (
+    PageRequest, batch_timestamp, concurrency_from_env, page_registrar, run_generation
+)
+from rate_limiter import RateLimiter
+
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
 # OpenAI 설정
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+# 재시도는 RateLimiter 가 모델별 예산과 함께 처리하므로 SDK 자체 재시도는 끔
+client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+# 이미지 생성 요청이 모두 공유하는 비동기 클라이언트 (연결 풀 재사용)
+async_client = AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+# 모든 API 호출이 공유하는 모델별 속도 제한 (고정 sleep 대신)
+limiter = RateLimiter()
 
 def load_config():
-    config_path = 'assets/data/coloring_pages.json'
-    if os.path.exists(config_path):
-        with open(config_path, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                pass
-    return {"categories": [], "pages": []}
+    """카탈로그 내용 (읽기 전용, 등록은 catalog_store 로)"""
+    with open_catalog() as catalog:
+        return catalog.to_config()
 
-def save_config(config):
-    config_path = 'assets/data/coloring_pages.json'
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+def save_cropped(img_data: bytes, output_path: str):
+    """다운로드한 이미지를 3:4 비율로 가운데 크롭해 PNG 로 저장 (1024x1792 -> 1024x1365)"""
+    img = Image.open(BytesIO(img_data))
+    width, height = img.size
+    
+    target_width = width
+    target_height = int(width * (4 / 3)) # 3:4 비율 (너비가 3, 높이가 4)
+    
+    if height > target_height:
+        top = (height - target_height) // 2
+        bottom = top + target_height
+        img = img.crop((0, top, target_width, bottom))
+    
+    # 저장
+    img.save(output_path, "PNG")
 
 def generate_subjects(category_id, count):
     """
     GPT를 사용하여 주어진 카테고리에 적합한 색칠공부 주제 목록을 생성합니다.
     """
     try:
-        response = client.chat.completions.create(
+        response = limiter.call_sync(
+            "gpt-3.5-turbo", client.chat.completions.create,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that generates coloring book subjects."},
@@ -58,13 +74,12 @@ def generate_coloring_pages(category_id, count, output_dir="assets/images"):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    config = load_config()
+    catalog = open_catalog()
     
     # 카테고리 존재 확인
-    category_exists = any(c['id'] == category_id for c in config['categories'])
-    if not category_exists:
+    if not catalog.has_category(category_id):
         print(f"경고: 카테고리 '{category_id}'가 JSON에 없습니다. 기본 카테고리로 추가합니다.")
-        config['categories'].append({
+        catalog.add_category({
             "id": category_id,
             "nameKey": f"category{category_id.capitalize()}"
         })
@@ -82,65 +97,47 @@ def generate_coloring_pages(category_id, count, output_dir="assets/images"):
         "high quality illustration, professional coloring page, portrait 3:4 aspect ratio"
     )
 
-    for subject in subjects:
-        try:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-            filename = f"{category_id}_{timestamp}.png"
-            output_path = os.path.join(output_dir, filename)
-            
-            print(f"[{subject}] 이미지 생성 시도 중 (DALL-E)...")
-            
-            # DALL-E 3를 이용한 이미지 생성 (세로형으로 생성 후 후처리 크롭)
-            response = client.images.generate(
-                model="dall-e-3",
-                prompt=f"{subject}, {STYLE}",
-                size="1024x1792",  # DALL-E 3 세로형 기본
-                quality="hd",
-                style="natural",
-                n=1
-            )
-
-            image_url = response.data[0].url
-            
-            # 이미지 다운로드
-            img_response = requests.get(image_url)
-            img_data = img_response.content
-            
-            # 3:4 비율로 크롭 (1024x1792 -> 1024x1365)
-            img = Image.open(BytesIO(img_data))
-            width, height = img.size
-            
-            target_width = width
-            target_height = int(width * (4 / 3)) # 3:4 비율 (너비가 3, 높이가 4)
-            
-            if height > target_height:
-                top = (height - target_height) // 2
-                bottom = top + target_height
-                img = img.crop((0, top, target_width, bottom))
-            
-            # 저장
-            img.save(output_path, "PNG")
-
-            # JSON 업데이트
-            page_id = f"{category_id}_{timestamp}"
-            new_page = {
-                "id": page_id,
-                "name": subject,
-                "nameKey": f"page{subject.replace(' ', '')}",
-                "imagePath": f"assets/images/{filename}",
-                "categoryId": category_id
-            }
-            config['pages'].append(new_page)
-            
-            print(f"저장 및 등록 완료: {subject} ({filename})")
-            
-            # Rate Limit 방지
-            time.sleep(2)
+    # 파일 이름/페이지 id 는 요청 전에 (배치 시각, 순번) 으로 정해 동시 요청끼리 겹치지 않게 함
+    timestamp = batch_timestamp()
+    page_requests = []
+    for i, subject in enumerate(subjects):
+        filename = f"{category_id}_{timestamp}_{i}.png"
+        page_requests.append(PageRequest(i, subject, os.path.join(output_dir, filename), {
+            "id": f"{category_id}_{timestamp}_{i}",
+            "name": subject,
+            "nameKey": f"page{subject.replace(' ', '')}",
+            "imagePath": f"assets/images/{filename}",
+            "categoryId": category_id
+        }))
+
+    async def generate(request: PageRequest) -> None:
+        # DALL-E 3를 이용한 이미지 생성 (세로형으로 생성 후 후처리 크롭)
+        response = await limiter.call(
+            "dall-e-3", async_client.images.generate,
+            model="dall-e-3",
+            prompt=f"{request.subject}, {STYLE}",
+            size="1024x1792",  # DALL-E 3 세로형 기본
+            quality="hd",
+            style="natural",
+            n=1
+        )
+
+        # 이미지 다운로드, 크롭, 저장은 이벤트 루프를 막지 않도록 스레드에서
+        img_response = await asyncio.to_thread(requests.get, response.data[0].url)
+        await asyncio.to_thread(save_cropped, img_response.content, request.output_path)
 
-        except Exception as e:
-            print(f"이미지 생성 중 에러 발생 ({subject}): {e}")
+    concurrency = concurrency_from_env()
+    print(f"이미지 생성 중 (DALL-E, 동시 요청 {concurrency}개)...")
+    # 성공한 페이지는 완료되는 즉시 카탈로그에 등록 (위치는 주제 순서대로 예약)
+    results = run_generation(generate, page_requests, concurrency,
+                             on_complete=page_registrar(catalog, page_requests))
+    added = sum(1 for _, outcome in results if outcome.ok)
+    print(f"저장 및 등록 완료: {added}/{len(page_requests)}개")
+    print("📈 모델별 처리량")
+    print(limiter.format_report())
 
-    save_config(config)
+    catalog.export_json()
+    catalog.close()
     print("\n설정 파일(coloring_pages.json) 업데이트가 완료되었습니다.")
 
 if __name__ == "__main__":
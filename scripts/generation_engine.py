@@ -0,0 +1,157 @@
+"""
+이미지 생성 API 동시 요청 엔진 (asyncio)
+
+도안 생성 스크립트는 주제 하나씩 요청하고 다음 요청 전에 몇 초씩 쉬어서, 카테고리 하나를
+만드는 시간 대부분이 응답 대기였습니다. 이 엔진은 요청을 동시에 최대 concurrency 개까지
+띄워 두고(asyncio.Semaphore), 끝나는 순서대로 결과를 받아 진행 상황을 보여 줍니다.
+
+    - 프로바이더 클라이언트는 스크립트에서 하나만 만들어 모든 요청이 공유합니다
+      (Gemini: client.aio, OpenAI: AsyncOpenAI).
+    - 파일 이름과 페이지 id 는 요청 전에 (배치 시각, 순번) 으로 정해 두므로
+      같은 초에 끝난 요청끼리 겹치지 않습니다.
+    - 결과는 완료 순서와 무관하게 요청 순서대로 돌려주고, 카탈로그 위치도 요청 순서대로
+      미리 예약하므로 coloring_pages.json 에 등록되는 순서는 항상 같습니다 (page_registrar).
+
+동시 요청 수는 GENERATION_CONCURRENCY 환경 변수로 바꿀 수 있습니다 (기본값 4).
+
+사용 예:
+    from catalog_store import open_catalog
+    from generation_engine import PageRequest, page_registrar, run_generation
+
+    async def generate(request: PageRequest) -> None:
+        response = await client.aio.models.generate_images(...)
+        ...  # request.output_path 에 저장, 실패하면 예외
+
+    with open_catalog() as catalog:
+        results = run_generation(generate, requests,
+                                 on_complete=page_registrar(catalog, requests))
+        catalog.export_json()
+"""
+
+import asyncio
+import datetime
+import os
+import time
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+)
+
+from batch_executor import TaskOutcome
+
+DEFAULT_CONCURRENCY = 4
+
+
+def concurrency_from_env(default: int = DEFAULT_CONCURRENCY) -> int:
+    """GENERATION_CONCURRENCY 환경 변수 (없거나 잘못되면 default, 최소 1)"""
+    try:
+        return max(1, int(os.getenv("GENERATION_CONCURRENCY", default)))
+    except ValueError:
+        return default
+
+
+def batch_timestamp() -> str:
+    """한 번의 생성 배치가 공유하는 파일 이름용 시각 (초 단위)"""
+    return datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+
+
+class PageRequest:
+    """
+    도안 한 장의 생성 요청
+
+    index 는 배치 안의 요청 순번(0부터)이며 결과 정렬, 카탈로그 위치와 파일 이름에 쓰입니다.
+    page 는 생성에 성공했을 때 카탈로그(coloring_pages.json)에 추가할 항목입니다.
+    style 은 프롬프트 스타일이며, 여러 카테고리를 한 배치로 돌릴 때 요청마다 다를 수 있습니다.
+    """
+
+    def __init__(self, index: int, subject: str, output_path: str,
+                 page: Dict[str, Any], style: Optional[str] = None):
+        self.index = index
+        self.subject = subject
+        self.output_path = output_path
+        self.page = page
+        self.style = style
+
+
+Generate = Callable[[PageRequest], Awaitable[Any]]
+
+
+async def generate_concurrently(func: Generate, requests: Sequence[PageRequest],
+                                concurrency: int) -> AsyncIterator[Tuple[PageRequest, TaskOutcome]]:
+    """
+    requests 마다 func 를 최대 concurrency 개까지 동시에 실행하고
+    (요청, TaskOutcome) 을 완료된 순서대로 내보냅니다.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(request: PageRequest) -> Tuple[PageRequest, TaskOutcome]:
+        async with semaphore:
+            try:
+                return request, TaskOutcome(True, await func(request))
+            except Exception as e:
+                return request, TaskOutcome(False, error=f"{type(e).__name__}: {e}")
+
+    # 태스크를 요청 순서대로 만들어 세마포어도 요청 순서대로 얻게 함
+    tasks = [asyncio.ensure_future(run_one(request)) for request in requests]
+    for future in asyncio.as_completed(tasks):
+        yield await future
+
+
+def print_progress(request: PageRequest, outcome: TaskOutcome,
+                   done: int, total: int, elapsed: float) -> None:
+    """run_generation 의 기본 on_complete: 완료될 때마다 한 줄씩 출력"""
+    if outcome.ok:
+        print(f"  [{done}/{total}] ✅ {request.subject} ({elapsed:.1f}s)")
+    else:
+        print(f"  [{done}/{total}] ❌ {request.subject}: {outcome.error}")
+
+
+def run_generation(func: Generate, requests: Sequence[PageRequest],
+                   concurrency: Optional[int] = None,
+                   on_complete: Optional[Callable[..., None]] = print_progress
+                   ) -> List[Tuple[PageRequest, TaskOutcome]]:
+    """
+    생성 요청들을 동시에 실행하고 (요청, TaskOutcome) 을 요청 순서대로 반환합니다.
+
+    Args:
+        func: 요청 하나를 처리하는 코루틴 함수 (실패 시 예외)
+        concurrency: 동시 요청 수 (None 이면 concurrency_from_env())
+        on_complete: 요청이 끝날 때마다 (요청, outcome, 완료 수, 전체 수, 경과 초) 로 호출
+    """
+    requests = list(requests)
+    if concurrency is None:
+        concurrency = concurrency_from_env()
+
+    async def collect() -> List[Tuple[PageRequest, TaskOutcome]]:
+        start = time.perf_counter()
+        results = []
+        async for request, outcome in generate_concurrently(func, requests, concurrency):
+            results.append((request, outcome))
+            if on_complete:
+                on_complete(request, outcome, len(results), len(requests),
+                            time.perf_counter() - start)
+        return results
+
+    results = asyncio.run(collect()) if requests else []
+    return sorted(results, key=lambda item: item[0].index)
+
+
+def page_registrar(catalog, requests: Sequence[PageRequest],
+                   on_complete: Optional[Callable[..., None]] = print_progress
+                   ) -> Callable[..., None]:
+    """
+    요청이 성공할 때마다 page 항목을 바로 카탈로그(catalog_store.CatalogStore)에 등록하는
+    on_complete 를 만듭니다. 위치는 요청 순서대로 미리 예약하므로 완료 순서와 무관하게
+    요청 순서대로 내보내지며, 중간에 중단돼도 끝난 요청은 저장소에 남습니다.
+
+    Args:
+        on_complete: 등록 전에 함께 호출할 on_complete (None 이면 출력 없음)
+    """
+    base = catalog.reserve_positions(len(requests))
+
+    def register(request: PageRequest, outcome: TaskOutcome, *progress: Any) -> None:
+        if on_complete:
+            on_complete(request, outcome, *progress)
+        if outcome.ok:
+            catalog.add_page(request.page, base + request.index)
+
+    return register
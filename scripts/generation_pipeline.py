@@ -0,0 +1,234 @@
+"""
+생성 → 후처리 → 인코딩 → 등록 단계를 겹쳐 실행하는 생산자/소비자 파이프라인
+
+단계(Stage)들을 크기가 제한된 큐로 잇고, 항목 하나가 한 단계를 끝내면 바로 다음 단계
+큐로 넘깁니다. 네트워크를 기다리는 동안 앞서 받은 이미지의 OpenCV 처리가 진행되므로
+CPU 와 네트워크가 서로를 기다리며 놀지 않습니다.
+
+    - ASYNC 단계:   이벤트 루프에서 코루틴으로 실행 (API 요청 등 I/O)
+    - PROCESS 단계: 공유 프로세스 풀에서 실행 (후처리/인코딩 등 CPU 작업).
+                    워커는 새 프로세스(forkserver)이므로 함수는 가볍게 import 되는
+                    모듈의 최상위 함수여야 하고, 값은 pickle 가능해야 함
+    - THREAD 단계:  스레드에서 실행 (파일 쓰기 등 짧은 블로킹 작업)
+
+큐가 가득 차면 앞 단계 워커가 기다리므로(backpressure) 느린 단계 앞에 결과가 무한정
+쌓이지 않습니다. 단계별로 처리 시간(busy), 다음 큐가 차서 기다린 시간(blocked),
+앞 큐가 비어 기다린 시간(starved), 최대 큐 길이를 재고, 점유율
+busy / (워커 수 × 전체 시간) 이 가장 높은 단계를 병목으로 보고합니다.
+
+한 단계에서 실패한 항목은 남은 단계를 건너뛰고 실패로 기록되며, 결과는 완료 순서와
+무관하게 입력 순서대로 돌려줍니다 (on_complete 는 generation_engine.page_registrar 와 호환).
+
+사용 예:
+    from generation_pipeline import PROCESS, THREAD, Stage, format_stage_stats, run_pipeline
+
+    results, stats = run_pipeline([
+        Stage('fetch', fetch, workers=4),
+        Stage('postprocess', postprocess_task, kind=PROCESS),
+        Stage('register', save, kind=THREAD),
+    ], requests)
+    print(format_stage_stats(stats))
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from batch_executor import TaskOutcome, default_jobs, init_worker
+
+ASYNC = 'async'
+THREAD = 'thread'
+PROCESS = 'process'
+
+# 단계 사이 큐의 기본 크기 (다음 단계 워커 수의 배수)
+DEFAULT_QUEUE_FACTOR = 2
+
+# 큐를 닫을 때 넣는 표시
+_DONE = object()
+
+
+class Stage:
+    """
+    파이프라인 단계 하나
+
+    func 는 이전 단계의 값(첫 단계는 입력 항목)을 받아 다음 단계로 넘길 값을 반환하고,
+    실패하면 예외를 던집니다. ASYNC 단계의 func 는 코루틴 함수여야 합니다.
+    workers 는 동시에 처리할 항목 수이며, None 이면 PROCESS 단계는 프로세스 풀 크기,
+    나머지는 1 입니다.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any],
+                 workers: Optional[int] = None, kind: str = ASYNC):
+        if kind not in (ASYNC, THREAD, PROCESS):
+            raise ValueError(f"지원하지 않는 단계 종류입니다: {kind}")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.kind = kind
+
+
+class StageStats:
+    """단계 하나의 처리량/대기 시간 계측"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.failed = 0
+        self.busy = 0.0         # func 실행 시간 합
+        self.blocked = 0.0      # 다음 큐가 가득 차서 기다린 시간 합 (backpressure)
+        self.starved = 0.0      # 입력 큐가 비어서 기다린 시간 합
+        self.max_queue = 0      # 이 단계 입력 큐의 최대 길이
+        self.elapsed = 0.0      # 파이프라인 전체 시간
+
+    @property
+    def occupancy(self) -> float:
+        """워커들이 실제로 일한 시간 비율 (0-1)"""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.busy / (self.workers * self.elapsed)
+
+
+def _worker_context(stages: Sequence[Stage]) -> multiprocessing.context.BaseContext:
+    """
+    PROCESS 단계 워커용 multiprocessing 컨텍스트
+
+    기본 fork 는 이벤트 루프 스레드와 API 클라이언트(소켓, 잠금)를 가진 부모 프로세스를
+    그대로 복제하므로, 깨끗한 forkserver(없으면 spawn) 프로세스를 씁니다. 워커는 단계
+    함수의 모듈만 import 하며, 실행 중인 스크립트(__main__)는 다시 실행하지 않습니다.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(sorted({stage.func.__module__ for stage in stages
+                                           if stage.kind == PROCESS}))
+    return context
+
+
+async def run_pipeline_async(stages: Sequence[Stage], items: Sequence[Any],
+                             processes: Optional[int] = None,
+                             queue_factor: int = DEFAULT_QUEUE_FACTOR,
+                             on_complete: Optional[Callable[..., None]] = None
+                             ) -> Tuple[List[Tuple[Any, TaskOutcome]], List[StageStats]]:
+    """run_pipeline 의 코루틴 버전 (이미 실행 중인 이벤트 루프에서 사용)"""
+    items = list(items)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    pool = None
+    if any(stage.kind == PROCESS for stage in stages):
+        processes = processes or default_jobs()
+        pool = ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                                   mp_context=_worker_context(stages))
+
+    workers = [stage.workers or (processes if stage.kind == PROCESS else 1)
+               for stage in stages]
+    queues = [asyncio.Queue(maxsize=max(1, queue_factor * count)) for count in workers]
+    stats = [StageStats(stage.name, count) for stage, count in zip(stages, workers)]
+    outcomes: Dict[int, TaskOutcome] = {}
+    remaining = list(workers)   # 단계별로 아직 끝나지 않은 워커 수
+
+    def finish(position: int, outcome: TaskOutcome) -> None:
+        outcomes[position] = outcome
+        if on_complete:
+            on_complete(items[position], outcome, len(outcomes), len(items),
+                        time.perf_counter() - start)
+
+    async def put(index: int, entry: Any, source: Optional[StageStats]) -> None:
+        queue = queues[index]
+        start = time.perf_counter()
+        await queue.put(entry)
+        if source is not None:
+            source.blocked += time.perf_counter() - start
+        stats[index].max_queue = max(stats[index].max_queue, queue.qsize())
+
+    async def call(stage: Stage, value: Any) -> Any:
+        if stage.kind == PROCESS:
+            return await loop.run_in_executor(pool, stage.func, value)
+        if stage.kind == THREAD:
+            return await asyncio.to_thread(stage.func, value)
+        return await stage.func(value)
+
+    async def worker(index: int) -> None:
+        stage, stat = stages[index], stats[index]
+        last = index == len(stages) - 1
+        while True:
+            start = time.perf_counter()
+            entry = await queues[index].get()
+            stat.starved += time.perf_counter() - start
+            if entry is _DONE:
+                break
+            position, value = entry
+            start = time.perf_counter()
+            try:
+                value = await call(stage, value)
+            except Exception as e:
+                stat.failed += 1
+                finish(position, TaskOutcome(
+                    False, error=f"{stage.name}: {type(e).__name__}: {e}"))
+                continue
+            finally:
+                stat.busy += time.perf_counter() - start
+                stat.items += 1
+            if last:
+                finish(position, TaskOutcome(True, value))
+            else:
+                await put(index + 1, (position, value), stat)
+        # 이 단계의 마지막 워커가 끝나면 다음 단계도 닫음
+        remaining[index] -= 1
+        if remaining[index] == 0 and not last:
+            for _ in range(workers[index + 1]):
+                await put(index + 1, _DONE, None)
+
+    async def feed() -> None:
+        for position, item in enumerate(items):
+            await put(0, (position, item), None)
+        for _ in range(workers[0]):
+            await put(0, _DONE, None)
+
+    try:
+        await asyncio.gather(feed(), *(worker(index)
+                                       for index, count in enumerate(workers)
+                                       for _ in range(count)))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - start
+    for stat in stats:
+        stat.elapsed = elapsed
+    return [(item, outcomes[position]) for position, item in enumerate(items)], stats
+
+
+def run_pipeline(stages: Sequence[Stage], items: Sequence[Any],
+                 processes: Optional[int] = None,
+                 queue_factor: int = DEFAULT_QUEUE_FACTOR,
+                 on_complete: Optional[Callable[..., None]] = None
+                 ) -> Tuple[List[Tuple[Any, TaskOutcome]], List[StageStats]]:
+    """
+    items 를 stages 에 차례로 흘려 보내고 ((항목, TaskOutcome) 목록, 단계별 계측) 을 반환합니다.
+
+    Args:
+        processes: PROCESS 단계용 프로세스 풀 크기 (None 이면 CPU 코어 수)
+        queue_factor: 단계 입력 큐 크기 = 그 단계 워커 수 × queue_factor
+        on_complete: 항목이 마지막 단계를 마치거나 실패할 때마다
+                     (항목, outcome, 완료 수, 전체 수, 경과 초) 로 호출
+                     (generation_engine.print_progress 와 같은 형식, 이벤트 루프에서 실행)
+    """
+    if not items:
+        return [], []
+    return asyncio.run(run_pipeline_async(stages, items, processes, queue_factor, on_complete))
+
+
+def format_stage_stats(stats: Sequence[StageStats]) -> str:
+    """단계별 점유율/대기 시간 표와 병목 단계"""
+    lines = [f"   {'stage':<14}{'workers':>8}{'items':>7}{'fail':>6}{'busy':>8}"
+             f"{'blocked':>9}{'starved':>9}{'queue':>7}{'occupancy':>11}"]
+    for stat in stats:
+        lines.append(f"   {stat.name:<14}{stat.workers:>8}{stat.items:>7}{stat.failed:>6}"
+                     f"{stat.busy:>7.1f}s{stat.blocked:>8.1f}s{stat.starved:>8.1f}s"
+                     f"{stat.max_queue:>7}{stat.occupancy * 100:>10.0f}%")
+    if stats:
+        bottleneck = max(stats, key=lambda stat: stat.occupancy)
+        lines.append(f"   병목: {bottleneck.name} (점유율 {bottleneck.occupancy * 100:.0f}%)")
+    return '\n'.join(lines)
@@ -0,0 +1,96 @@
+"""
+메모리 내 이미지 입출력 (bytes ↔ ndarray)
+
+변환 함수들이 파일 경로 대신 인코딩된 이미지 bytes 나 ndarray 를 직접 주고받을 수
+있도록 디코드/인코드를 한곳에 모았습니다. 생성기는 API 가 돌려준 이미지 bytes 를
+바로 후처리에 넘기고, 최종 PNG 를 한 번만 인코딩해 저장합니다.
+
+사용 예:
+    from image_io import decode_image, encode_png, load_image
+
+    img = decode_image(png_bytes)                 # BGR ndarray
+    gray = load_image(source, cv2.IMREAD_GRAYSCALE)  # bytes, ndarray, 경로 모두 허용
+    data = encode_png(result)                     # PNG bytes
+    write_image('out.png', result)                # 파일로 저장
+
+0/255 두 값뿐인 단일 채널 이미지는 1비트 PNG 로 인코딩합니다 (디코드하면 같은 0/255).
+"""
+
+import os
+from typing import List, Optional, Sequence, Union
+
+import cv2
+import numpy as np
+
+from bitmap import is_binary
+from stage_profiler import profile_stage
+
+# 변환 함수가 받는 입력: 인코딩된 이미지 bytes, 디코드된 ndarray, 또는 파일 경로
+ImageSource = Union[bytes, bytearray, memoryview, np.ndarray, str, os.PathLike]
+
+
+def decode_image(data: Union[bytes, bytearray, memoryview],
+                 flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """인코딩된 이미지(PNG, JPEG, WebP 등) bytes 를 디코드합니다."""
+    with profile_stage('decode'):
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+    if image is None:
+        raise ValueError("이미지 데이터를 디코드할 수 없습니다")
+    return image
+
+
+def png_params(image: np.ndarray) -> List[int]:
+    """흑백(0/255) 이미지면 1비트 PNG 로 쓰는 인코딩 파라미터"""
+    if is_binary(image):
+        return [cv2.IMWRITE_PNG_BILEVEL, 1]
+    return []
+
+
+def encode_png(image: np.ndarray, params: Optional[Sequence[int]] = None) -> bytes:
+    """ndarray 를 PNG bytes 로 인코딩합니다 (params 가 없으면 흑백은 1비트)."""
+    with profile_stage('encode'):
+        if params is None:
+            params = png_params(image)
+        ok, buffer = cv2.imencode('.png', image, list(params))
+    if not ok:
+        raise ValueError("PNG 인코딩에 실패했습니다")
+    return buffer.tobytes()
+
+
+def load_image(source: ImageSource, flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """
+    bytes, ndarray, 파일 경로 중 무엇이든 ndarray 로 돌려줍니다.
+
+    ndarray 는 flags 에 맞게 채널만 변환하고 복사하지 않습니다.
+    """
+    if isinstance(source, np.ndarray):
+        if source.ndim == 3 and source.shape[2] == 4:
+            source = cv2.cvtColor(source, cv2.COLOR_BGRA2BGR)
+        if flags == cv2.IMREAD_GRAYSCALE and source.ndim == 3:
+            return cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
+        if flags == cv2.IMREAD_COLOR and source.ndim == 2:
+            return cv2.cvtColor(source, cv2.COLOR_GRAY2BGR)
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return decode_image(source, flags)
+    with profile_stage('image'):
+        image = cv2.imread(os.fspath(source), flags)
+    if image is None:
+        raise ValueError(f"이미지를 불러올 수 없습니다: {source}")
+    return image
+
+
+def write_image(path: str, image: np.ndarray) -> bool:
+    """cv2.imwrite 와 같지만 PNG 로 저장하는 흑백 이미지는 1비트로 씁니다."""
+    with profile_stage('imwrite'):
+        params = png_params(image) if str(path).lower().endswith('.png') else []
+        return cv2.imwrite(os.fspath(path), image, params)
+
+
+def write_bytes(path: str, data: bytes) -> None:
+    """인코딩된 이미지를 임시 파일에 쓴 뒤 교체 (중단되어도 반쯤 쓴 파일이 남지 않음)"""
+    tmp_path = f"{path}.tmp"
+    with profile_stage('write'):
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -8,15 +8,80 @@ import sys
 import cv2
 import numpy as np
 from pathlib import Path
+from typing import Optional, Union
+
+from auto_threshold import is_auto, parse_threshold, resolve_threshold
+from batch_executor import run_batch
+from batch_manifest import SKIP_UNCHANGED, BatchManifest
+from bitmap import is_binary
+from conversion_cache import ConversionCache, cached_convert
+from gap_closing import close_gaps
+from image_io import ImageSource, encode_png, load_image, write_image
+from pipeline_recipes import run_recipe
+import stage_profiler
+from stage_profiler import profiled
+from svg_export import DEFAULT_TOLERANCE as SVG_TOLERANCE, export_svg_file, format_stats
+
+# 변환 결과 캐시 키에 들어가는 파이프라인 버전 (알고리즘이 바뀌면 올릴 것)
+PIPELINE_VERSION = "bw-2"
+
+
+@profiled('pure_bw')
+def pure_bw(
+    image: ImageSource,
+    threshold_value: Union[int, str] = 200,
+    line_thickness_adjust: int = 0,
+    denoise: bool = True,
+    invert_if_needed: bool = True,
+    speckle_size: int = 8
+) -> np.ndarray:
+    """
+    이미지를 완벽한 흑백(0/255)으로 변환한 배열을 반환합니다. (디스크 입출력 없음)
+    
+    Args:
+        image: 인코딩된 이미지 bytes, BGR/그레이스케일 ndarray 또는 파일 경로
+        threshold_value: 이진화 임계값 (0-255, 높을수록 더 많은 부분이 흰색)
+            또는 'auto'/'otsu'/'triangle'/'lineart' (히스토그램으로 자동 선택)
+        line_thickness_adjust: 선 두께 조정 (-2~2, 양수면 두꺼워짐)
+        denoise: 노이즈 제거 여부
+        invert_if_needed: 배경이 어두우면 자동 반전
+        speckle_size: 이 면적(px) 미만의 고립된 검정 점 제거 (denoise 시)
+    
+    Returns:
+        uint8 흑백 이미지
+    """
+    # 이미지 로드 및 그레이스케일 변환
+    if isinstance(image, np.ndarray) and image.ndim == 2:
+        gray = image
+    else:
+        gray = cv2.cvtColor(load_image(image), cv2.COLOR_BGR2GRAY)
+    
+    # 블러 → 이진화(+배경 반전) → 선 두께 조정 → 노이즈 제거 (recipes/pure_bw.json)
+    return run_recipe(
+        'pure_bw', gray,
+        threshold=resolve_threshold(gray, threshold_value),
+        line_thickness_adjust=line_thickness_adjust,
+        denoise=denoise,
+        invert_if_needed=invert_if_needed,
+        speckle_size=speckle_size,
+    )
+
+
+def convert_to_pure_bw_bytes(data: bytes, **options) -> bytes:
+    """인코딩된 이미지 bytes 를 흑백 변환해 PNG bytes 로 반환 (옵션은 pure_bw 와 동일)"""
+    return encode_png(pure_bw(data, **options))
 
 
 def convert_to_pure_bw(
     image_path: str,
     output_path: str = None,
-    threshold_value: int = 200,
+    threshold_value: Union[int, str] = 200,
     line_thickness_adjust: int = 0,
     denoise: bool = True,
-    invert_if_needed: bool = True
+    invert_if_needed: bool = True,
+    speckle_size: int = 8,
+    verbose: bool = True,
+    gap_settings: Optional[dict] = None
 ) -> str:
     """
     이미지를 완벽한 흑백으로 변환합니다.
@@ -25,79 +90,111 @@ def convert_to_pure_bw(
         image_path: 원본 이미지 경로
         output_path: 저장할 경로 (None이면 원본 덮어쓰기)
         threshold_value: 이진화 임계값 (0-255, 높을수록 더 많은 부분이 흰색)
+            또는 'auto'/'otsu'/'triangle'/'lineart' (자동 선택 시 선택값을 함께 출력)
         line_thickness_adjust: 선 두께 조정 (-2~2, 양수면 두꺼워짐)
         denoise: 노이즈 제거 여부
         invert_if_needed: 배경이 어두우면 자동 반전
+        speckle_size: 이 면적(px) 미만의 고립된 검정 점 제거 (denoise 시)
+        verbose: 완료 메시지 출력 여부
+        gap_settings: 저장 전에 끊긴 선을 이을 때의 close_gaps 인자 (None 이면 생략)
     
     Returns:
         저장된 파일 경로
     """
-    # 이미지 로드
-    img = cv2.imread(image_path)
-    if img is None:
-        raise ValueError(f"이미지를 불러올 수 없습니다: {image_path}")
-    
-    # 그레이스케일 변환
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    
-    # 노이즈 제거 (선택적)
-    if denoise:
-        gray = cv2.GaussianBlur(gray, (3, 3), 0)
-    
-    # 적응형 이진화 또는 단순 이진화 선택
-    # 적응형: 조명이 불균일한 이미지에 좋음
-    # 단순: 균일한 배경에 좋음
-    
-    # 먼저 단순 이진화 시도
-    _, binary = cv2.threshold(gray, threshold_value, 255, cv2.THRESH_BINARY)
-    
-    # 배경이 어두운지 확인하고 필요시 반전
-    if invert_if_needed:
-        # 코너 픽셀들의 평균으로 배경색 추정
-        corners = [
-            binary[0, 0], binary[0, -1], 
-            binary[-1, 0], binary[-1, -1]
-        ]
-        avg_corner = np.mean(corners)
-        
-        # 배경이 검정(0에 가까움)이면 반전
-        if avg_corner < 128:
-            binary = cv2.bitwise_not(binary)
-    
-    # 선 두께 조정
-    if line_thickness_adjust != 0:
-        kernel = np.ones((3, 3), np.uint8)
-        if line_thickness_adjust > 0:
-            # 침식 (선이 두꺼워짐 - 검정 영역 확장)
-            binary = cv2.erode(binary, kernel, iterations=abs(line_thickness_adjust))
-        else:
-            # 팽창 (선이 얇아짐 - 흰색 영역 확장)
-            binary = cv2.dilate(binary, kernel, iterations=abs(line_thickness_adjust))
-    
-    # 작은 노이즈 점 제거
-    if denoise:
-        # 흰색 노이즈 제거 (검정 배경의 흰 점)
-        kernel_small = np.ones((2, 2), np.uint8)
-        binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel_small)
-        # 검정 노이즈 제거 (흰색 배경의 검정 점)
-        binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel_small)
+    gray = cv2.cvtColor(load_image(image_path), cv2.COLOR_BGR2GRAY)
+    threshold = resolve_threshold(gray, threshold_value)
+    binary = pure_bw(gray, threshold, line_thickness_adjust,
+                     denoise, invert_if_needed, speckle_size)
+    gap_report = None
+    if gap_settings is not None:
+        binary, gap_report = close_gaps(binary, **gap_settings)
     
     # 저장 경로 결정
     if output_path is None:
         output_path = image_path
     
     # 저장
-    cv2.imwrite(output_path, binary)
-    print(f"✓ 변환 완료: {output_path}")
+    write_image(output_path, binary)
+    if verbose:
+        chosen = f" (임계값 {threshold}, {threshold_value})" if is_auto(threshold_value) else ""
+        print(f"✓ 변환 완료: {output_path}{chosen}")
+        if gap_report is not None:
+            print(f"  🔗 {gap_report.summary()}")
     
     return output_path
 
 
+def is_pure_bw(image_path: str) -> bool:
+    """이미 0/255 두 값만 있는(흑백 변환이 끝난) 이미지인지 확인"""
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return False
+    return is_binary(gray)
+
+
+def _convert_file_task(task: tuple) -> tuple:
+    """
+    워커 프로세스에서 실행되는 작업:
+    (입력 경로, 출력 경로, 임계값 또는 자동 방식, 캐시 디렉토리 또는 None, 계측 여부,
+     SVG 곡선 허용 오차 또는 None, 끊긴 선 잇기 설정 또는 None)
+    
+    Returns:
+        (출력 경로, 상태, 사용한 임계값, 계측 이벤트 목록, SVG 내보내기 통계 또는 None,
+         GapReport 또는 None)
+        - 상태는 'converted', 'cached', 'already-bw' 중 하나
+        - SVG 는 출력 파일 옆에 같은 이름(.svg)으로 저장
+    """
+    src, dst, threshold_value, cache_dir, profile, svg_tolerance, gap_settings = task
+    if profile:
+        stage_profiler.enable()
+    gap_report = None
+    
+    def finish(status: str, threshold) -> tuple:
+        svg_stats = None
+        if svg_tolerance is not None:
+            svg_stats = export_svg_file(dst, tolerance=svg_tolerance)
+        return dst, status, threshold, stage_profiler.collect(), svg_stats, gap_report
+    
+    # 제자리 덮어쓰기 모드에서 이미 흑백인 파일은 다시 이진화하지 않음
+    # (모폴로지/점 제거가 반복 적용되어 선이 점점 깎이는 것을 방지)
+    if os.path.abspath(src) == os.path.abspath(dst) and is_pure_bw(src):
+        return finish('already-bw', None)
+    
+    cache = ConversionCache(cache_dir) if cache_dir else None
+    
+    # 자동 임계값은 캐시 조회 전에 골라 실제 값으로 캐시 키를 만듦
+    gray = None
+    if is_auto(threshold_value):
+        gray = cv2.cvtColor(load_image(src), cv2.COLOR_BGR2GRAY)
+        threshold_value = resolve_threshold(gray, threshold_value)
+    
+    def convert(outputs: dict) -> dict:
+        nonlocal gap_report
+        binary = pure_bw(src if gray is None else gray, threshold_value)
+        if gap_settings is not None:
+            binary, gap_report = close_gaps(binary, **gap_settings)
+        write_image(outputs['bw'], binary)
+        return {'bw': True}
+    
+    params = {'bw': {'threshold': threshold_value, 'denoise': True, 'speckle_size': 8}}
+    if gap_settings is not None:
+        params['bw']['close_gaps'] = gap_settings
+    _, hits = cached_convert(cache, src, {'bw': dst}, params, PIPELINE_VERSION, convert)
+    return finish('cached' if hits else 'converted', threshold_value)
+
+
 def process_directory(
     input_dir: str,
     output_dir: str = None,
-    threshold_value: int = 200,
-    extensions: tuple = ('.png', '.jpg', '.jpeg', '.webp')
+    threshold_value: Union[int, str] = 200,
+    extensions: tuple = ('.png', '.jpg', '.jpeg', '.webp'),
+    jobs: int = 0,
+    use_cache: bool = True,
+    force: bool = False,
+    prune_orphans: bool = False,
+    profile: str = None,
+    svg_tolerance: float = None,
+    gap_settings: dict = None
 ):
     """
     디렉토리 내 모든 이미지를 처리합니다.
@@ -105,8 +202,16 @@ def process_directory(
     Args:
         input_dir: 입력 디렉토리
         output_dir: 출력 디렉토리 (None이면 원본 위치에 '_bw' 접미사 추가)
-        threshold_value: 이진화 임계값
+        threshold_value: 이진화 임계값 또는 자동 방식('auto'/'otsu'/'triangle'/'lineart',
+            파일마다 히스토그램으로 골라 결과 옆에 출력)
         extensions: 처리할 파일 확장자
+        jobs: 워커 프로세스 수 (0이면 CPU 코어 수만큼 자동)
+        use_cache: 같은 내용/설정의 이전 변환 결과를 캐시에서 재사용
+        force: 매니페스트를 무시하고 변경되지 않은 파일도 다시 변환
+        prune_orphans: 원본이 삭제된 파일의 출력을 삭제
+        profile: 단계별 계측 결과(Chrome trace JSON)를 저장할 경로 (None이면 계측 안 함)
+        svg_tolerance: 결과를 SVG 로도 내보낼 때의 곡선 허용 오차 px (None이면 내보내지 않음)
+        gap_settings: 끊긴 선 잇기 설정 (gap_closing.close_gaps 인자, None이면 생략)
     """
     input_path = Path(input_dir)
     
@@ -118,26 +223,83 @@ def process_directory(
     
     processed = 0
     errors = 0
+    cache_hits = 0
+    cache = ConversionCache() if use_cache else None
+    cache_dir = str(cache.root) if cache else None
     
-    for file in input_path.iterdir():
-        if file.suffix.lower() in extensions:
-            try:
-                if output_path:
-                    out_file = output_path / file.name
-                else:
-                    out_file = file  # 원본 덮어쓰기
-                
-                convert_to_pure_bw(
-                    str(file),
-                    str(out_file),
-                    threshold_value=threshold_value
-                )
+    # 매니페스트로 새로 추가되었거나 바뀐 파일만 변환
+    manifest = BatchManifest.for_directory("bw", str(input_path))
+    params = {'threshold': threshold_value, 'speckle_size': 8, 'version': PIPELINE_VERSION}
+    if gap_settings is not None:
+        params['close_gaps'] = gap_settings
+    skipped = {}
+    
+    files = [
+        file for file in sorted(input_path.iterdir())
+        if file.is_file() and file.suffix.lower() in extensions
+    ]
+    tasks = []
+    for file in files:
+        if output_path:
+            out_file = output_path / file.name
+        else:
+            out_file = file  # 원본 덮어쓰기
+        reason = None if force else manifest.check(str(file), 'bw', str(out_file), params)
+        if reason:
+            skipped[reason] = skipped.get(reason, 0) + 1
+            continue
+        tasks.append((str(file), str(out_file), threshold_value, cache_dir, bool(profile),
+                      svg_tolerance, gap_settings))
+    
+    if prune_orphans:
+        for removed in manifest.remove_orphans(str(file) for file in files):
+            print(f"🗑 원본이 없는 출력 삭제: {removed}")
+    
+    # 파일 단위로 워커 프로세스에 분배, 결과는 입력 순서대로 출력
+    profile_events = []
+    chosen_thresholds = []
+    for (src, *_), outcome in run_batch(_convert_file_task, tasks, jobs):
+        if outcome.ok:
+            dst, status, threshold, events, svg_stats, gap_report = outcome.value
+            profile_events.extend(events)
+            if status == 'already-bw':
+                print(f"- 이미 흑백 이미지라 건너뜀: {dst}")
+                skipped[status] = skipped.get(status, 0) + 1
+            else:
+                notes = []
+                if is_auto(threshold_value):
+                    notes.append(f"임계값 {threshold}")
+                    chosen_thresholds.append(threshold)
+                if status == 'cached':
+                    notes.append("캐시")
+                suffix = f" ({', '.join(notes)})" if notes else ""
+                print(f"✓ 변환 완료: {dst}{suffix}")
                 processed += 1
-            except Exception as e:
-                print(f"✗ 오류 ({file.name}): {e}")
-                errors += 1
+                cache_hits += status == 'cached'
+            if gap_report:
+                print(f"  🔗 {gap_report.summary()}")
+            if svg_stats:
+                print(f"  {format_stats(Path(svg_stats['svg_path']).name, svg_stats)}")
+            manifest.record(src, 'bw', dst, params)
+            manifest.save_if_due()
+        else:
+            print(f"✗ 오류 ({Path(src).name}): {outcome.error}")
+            errors += 1
+    manifest.save()
     
     print(f"\n처리 완료: {processed}개 성공, {errors}개 실패")
+    if chosen_thresholds:
+        print(f"자동 임계값({threshold_value}): 최소 {min(chosen_thresholds)}, "
+              f"중앙 {int(np.median(chosen_thresholds))}, 최대 {max(chosen_thresholds)}")
+    if skipped:
+        already = sum(skipped.values()) - skipped.get(SKIP_UNCHANGED, 0)
+        print(f"건너뜀: 변경 없음 {skipped.get(SKIP_UNCHANGED, 0)}개, "
+              f"이미 처리된 파일 {already}개 (--force 로 다시 변환)")
+    if profile:
+        stage_profiler.report(profile_events, profile)
+    if cache:
+        removed, _ = cache.prune()
+        print(f"캐시 적중: {cache_hits}개 (LRU 정리: {removed}개 삭제)")
 
 
 def interactive_threshold(image_path: str):
@@ -178,21 +340,62 @@ if __name__ == "__main__":
     
     if len(sys.argv) < 2:
         print("사용법:")
-        print("  단일 파일: python image_postprocess.py <이미지경로> [임계값]")
-        print("  디렉토리:  python image_postprocess.py <디렉토리경로> [임계값]")
+        print("  단일 파일: python image_postprocess.py <이미지경로> [임계값|auto]")
+        print("  디렉토리:  python image_postprocess.py <디렉토리경로> [임계값|auto] [--jobs N]")
+        print("             [--no-cache] [--force] [--prune-orphans] [--profile TRACE.json] [--svg]")
+        print("             [--close-gaps]")
         print("  인터랙티브: python image_postprocess.py <이미지경로> --interactive")
         print("\n예시:")
         print("  python image_postprocess.py assets/images/cat.png")
         print("  python image_postprocess.py assets/images/cat.png 180")
         print("  python image_postprocess.py assets/images/ 200")
+        print("  python image_postprocess.py assets/images/ 200 --jobs 8")
+        print("  python image_postprocess.py assets/images/ auto   # 파일별 히스토그램으로 자동 선택")
+        print("  python image_postprocess.py assets/images/ 200 --svg   # 결과 옆에 .svg 도 저장")
+        print("  python image_postprocess.py raw/ auto --close-gaps     # 끊긴 선을 이어 색칠 새는 곳 막기")
+        print("  (자동 방식: auto=lineart, otsu, triangle)")
         sys.exit(1)
     
-    target = sys.argv[1]
+    # --jobs N 옵션 분리 (디렉토리 처리 시 워커 프로세스 수)
+    args = sys.argv[1:]
+    jobs = 0
+    if "--jobs" in args:
+        idx = args.index("--jobs")
+        try:
+            jobs = int(args[idx + 1])
+        except (IndexError, ValueError):
+            print("잘못된 --jobs 값입니다.")
+            sys.exit(1)
+        del args[idx:idx + 2]
+    
+    # --profile PATH: 단계별 계측 결과를 Chrome trace JSON 으로 저장
+    profile = None
+    if "--profile" in args:
+        idx = args.index("--profile")
+        if idx + 1 >= len(args):
+            print("--profile 에 저장할 경로를 지정해주세요.")
+            sys.exit(1)
+        profile = args[idx + 1]
+        del args[idx:idx + 2]
+    
+    # --no-cache: 변환 결과 캐시를 사용하지 않음
+    # --force: 변경 없는 파일도 다시 변환, --prune-orphans: 원본이 없는 출력 삭제
+    # --svg: 결과를 SVG 벡터로도 내보냄 (기본 허용 오차)
+    # --close-gaps: 결과의 끊긴 선을 이음 (기본 설정)
+    flags = {"--no-cache", "--force", "--prune-orphans", "--svg", "--close-gaps"}
+    use_cache = "--no-cache" not in args
+    force = "--force" in args
+    prune_orphans = "--prune-orphans" in args
+    svg_tolerance = SVG_TOLERANCE if "--svg" in args else None
+    gap_settings = {} if "--close-gaps" in args else None
+    args = [arg for arg in args if arg not in flags]
+    
+    target = args[0]
     threshold = 200  # 기본값
     
     # 옵션 파싱
-    if len(sys.argv) > 2:
-        if sys.argv[2] == "--interactive":
+    if len(args) > 1:
+        if args[1] == "--interactive":
             if os.path.isfile(target):
                 threshold = interactive_threshold(target)
                 convert_to_pure_bw(target, threshold_value=threshold)
@@ -201,16 +404,26 @@ if __name__ == "__main__":
             sys.exit(0)
         else:
             try:
-                threshold = int(sys.argv[2])
+                threshold = parse_threshold(args[1])
             except ValueError:
-                print(f"잘못된 임계값: {sys.argv[2]}")
+                print(f"잘못된 임계값: {args[1]}")
                 sys.exit(1)
     
     # 파일 또는 디렉토리 처리
     if os.path.isfile(target):
-        convert_to_pure_bw(target, threshold_value=threshold)
+        if profile:
+            stage_profiler.enable()
+        output = convert_to_pure_bw(target, threshold_value=threshold,
+                                    gap_settings=gap_settings)
+        if svg_tolerance is not None:
+            svg_stats = export_svg_file(output, tolerance=svg_tolerance)
+            print(f"  {format_stats(Path(svg_stats['svg_path']).name, svg_stats)}")
+        if profile:
+            stage_profiler.report(stage_profiler.collect(), profile)
     elif os.path.isdir(target):
-        process_directory(target, threshold_value=threshold)
+        process_directory(target, threshold_value=threshold, jobs=jobs, use_cache=use_cache,
+                          force=force, prune_orphans=prune_orphans, profile=profile,
+                          svg_tolerance=svg_tolerance, gap_settings=gap_settings)
     else:
         print(f"파일 또는 디렉토리를 찾을 수 없습니다: {target}")
         sys.exit(1)
@@ -0,0 +1,108 @@
+"""
+생성된 도안의 CPU 후처리 단계 (흑백 변환 → 인코딩 → 저장)
+
+generation_pipeline 의 PROCESS 단계 함수는 새 워커 프로세스(forkserver/spawn)에서
+모듈 이름으로 다시 import 되므로, API 클라이언트를 만드는 생성 스크립트와 분리해
+OpenCV 처리에 필요한 모듈만 import 합니다.
+
+단계 사이에는 page dict 가 오갑니다:
+    path, name, image(API 응답 bytes), threshold_value
+    → postprocess_stage: binary, threshold (실패 시 error)
+    → encode_stage:      data, encoding, baseline_bytes
+    → register_stage:    path 에 data 저장
+"""
+
+import cv2
+import numpy as np
+
+from auto_threshold import is_auto, resolve_threshold
+from conversion_cache import format_size
+from export_optimizer import optimize_encode
+from image_io import ImageSource, load_image, write_bytes, write_image
+from pipeline_recipes import run_recipe
+
+DEFAULT_BW_THRESHOLD = 200
+
+
+def bw_postprocess(image: ImageSource, threshold_value=DEFAULT_BW_THRESHOLD, speckle_size: int = 8):
+    """
+    이미지를 흑백(이진화)으로 변환한 배열을 반환합니다. (디스크 입출력 없음)
+    - 회색 톤 제거 및 선명한 선 확보
+    - 배경 반전 보정
+    - speckle_size 미만의 고립된 검정 점 제거
+    
+    image: 인코딩된 이미지 bytes(API 응답 그대로), ndarray 또는 파일 경로
+    threshold_value: 0-255 정수 또는 'auto'/'otsu'/'triangle'/'lineart'
+    """
+    if isinstance(image, np.ndarray) and image.ndim == 2:
+        gray = image
+    else:
+        gray = cv2.cvtColor(load_image(image), cv2.COLOR_BGR2GRAY)
+    # 이진화 → 배경 반전 보정 → 가벼운 노이즈 제거 (recipes/gemini_bw.json)
+    return run_recipe('gemini_bw', gray,
+                      threshold=resolve_threshold(gray, threshold_value),
+                      speckle_size=speckle_size)
+
+
+def apply_bw_postprocess(image_path: str, threshold_value=DEFAULT_BW_THRESHOLD, speckle_size: int = 8):
+    """
+    저장된 이미지 파일을 흑백(이진화)으로 변환해 덮어씁니다. (bw_postprocess 참고)
+    """
+    try:
+        binary = bw_postprocess(image_path, threshold_value, speckle_size)
+        
+        # 저장 (원본 덮어쓰기)
+        write_image(image_path, binary)
+        print(f"  ✓ 기본 흑백 변환 완료")
+        return True
+        
+    except Exception as e:
+        print(f"  경고: 후처리 실패 - {e}")
+        return False
+
+
+def postprocess_stage(page: dict) -> dict:
+    """
+    파이프라인 CPU 단계: API 응답 bytes(page['image'])를 흑백 변환해 page['binary'] 에 담습니다.
+    실패하면 page['error'] 만 남기고 넘겨, 인코딩 단계가 원본을 그대로 저장하게 합니다.
+    """
+    try:
+        gray = cv2.cvtColor(load_image(page['image']), cv2.COLOR_BGR2GRAY)
+        page['threshold'] = resolve_threshold(gray, page.get('threshold_value', DEFAULT_BW_THRESHOLD))
+        page['binary'] = bw_postprocess(gray, page['threshold'])
+    except Exception as e:
+        page['error'] = str(e)
+    return page
+
+
+def encode_stage(page: dict) -> dict:
+    """
+    파이프라인 CPU 단계: 흑백 결과를 여러 PNG 설정 중 가장 작은 무손실 결과로 인코딩해
+    page['data'] 에 담습니다 (export_optimizer). 후처리에 실패했으면 원본 bytes 를 씁니다.
+    """
+    binary = page.pop('binary', None)
+    if binary is None:
+        page['data'] = page['image']
+        return page
+    choice = optimize_encode(binary)
+    page.update(data=choice.data, encoding=choice.name, baseline_bytes=choice.baseline_bytes)
+    # 원본 응답은 더 필요 없으므로 다음 단계로 넘기지 않음
+    del page['image']
+    return page
+
+
+def register_stage(page: dict) -> bool:
+    """파이프라인 마지막 단계: 최종 bytes 를 한 번만 저장하고 결과를 출력 (후처리 성공 여부 반환)"""
+    write_bytes(page['path'], page['data'])
+    prefix = f"  [{page['name']}]" if page.get('name') else " "
+    if 'error' in page:
+        print(f"{prefix} 경고: 후처리 실패 - {page['error']}")
+        return False
+    threshold_value = page.get('threshold_value', DEFAULT_BW_THRESHOLD)
+    if is_auto(threshold_value):
+        print(f"{prefix} ✓ 기본 흑백 변환 완료 (임계값 {page['threshold']}, {threshold_value})")
+    else:
+        print(f"{prefix} ✓ 기본 흑백 변환 완료")
+    print(f"{prefix} ✓ 인코딩: {page['encoding']}, {format_size(len(page['data']))} "
+          f"(기본 PNG {format_size(page['baseline_bytes'])})")
+    return True
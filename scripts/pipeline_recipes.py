@@ -0,0 +1,481 @@
+"""
+선언적 파이프라인 레시피와 단계 융합 실행기
+
+그레이스케일, 블러, 이진화, 코너 기반 반전, 모폴로지 같은 공통 블록을
+이름 붙은 단계로 등록해 두고, 스타일은 JSON(또는 PyYAML 이 있으면 YAML)
+레시피로 정의합니다. 레시피는 scripts/recipes/<이름>.json 에 둡니다.
+
+    {
+      "name": "gemini_bw",
+      "params": {"threshold": 200, "speckle_size": 8},
+      "stages": [
+        {"stage": "grayscale"},
+        {"stage": "threshold", "value": "$threshold"},
+        {"stage": "invert_if_dark_corners"},
+        {"stage": "morphology", "op": "open", "kernel": 2},
+        {"stage": "remove_speckles", "min_area": "$speckle_size"}
+      ]
+    }
+
+"$이름" 값은 실행 시 파라미터(없으면 레시피의 params 기본값)로 치환되고,
+"when" 이 거짓인 단계는 건너뜁니다.
+
+실행 전에 결과가 비트 단위로 같은 범위에서 인접 단계를 합칩니다.
+    - 항등 단계 제거 (1px 커널 모폴로지/블러, 0 반복, 연속 반전 2회)
+    - threshold + invert → THRESH_BINARY_INV 한 번
+    - threshold + invert_if_dark_corners → 입력 코너 4픽셀로 반전 여부를 먼저
+      정한 뒤 BINARY 또는 BINARY_INV 한 번
+    - 같은 커널의 연속 erode/dilate (open/close 를 풀어 쓴 것 포함) → 반복 횟수 합산
+      (사각 커널은 OpenCV 가 한 번의 큰 커널 연산으로 처리)
+중간 결과는 실행기가 가진 두 개의 버퍼를 번갈아 쓰며(dst=) 이미지 크기가 같으면
+다음 실행에서도 재사용합니다. 실행기는 스레드 안전하지 않으므로 스레드마다
+따로 만들어 쓰세요 (run_recipe 는 스레드별 실행기를 사용).
+"""
+
+import argparse
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from component_filter import filter_components, remove_speckles
+from gap_closing import (
+    DEFAULT_BUDGET_MS_PER_MP, DEFAULT_MAX_ANGLE, DEFAULT_MAX_GAP, DEFAULT_MIN_REGION,
+    close_gaps
+)
+from image_io import load_image, write_image
+from stage_profiler import profile_stage
+
+try:
+    import yaml
+except ImportError:  # YAML 레시피는 선택 기능
+    yaml = None
+
+RECIPE_DIR = Path(__file__).resolve().parent / "recipes"
+
+
+class StageSpec:
+    """등록된 단계: func(src, dst, **params) -> 결과 배열"""
+
+    def __init__(self, name: str, func: Callable[..., np.ndarray], uses_dst: bool,
+                 profile: bool):
+        self.name = name
+        self.func = func
+        self.uses_dst = uses_dst
+        self.profile = profile
+
+
+STAGES: Dict[str, StageSpec] = {}
+
+
+def register_stage(name: str, uses_dst: bool = True, profile: bool = True):
+    """
+    단계 함수를 레지스트리에 등록하는 데코레이터
+
+    uses_dst 가 True 면 func 는 dst 버퍼(None 일 수 있음)에 결과를 써서 반환해야 합니다.
+    profile 이 False 면 실행기가 구간을 따로 계측하지 않습니다 (함수가 직접 계측하는 경우).
+    """
+    def decorator(func: Callable[..., np.ndarray]) -> Callable[..., np.ndarray]:
+        if name in STAGES:
+            raise ValueError(f"이미 등록된 단계입니다: {name}")
+        STAGES[name] = StageSpec(name, func, uses_dst, profile)
+        return func
+    return decorator
+
+
+_THRESH_TYPES = {
+    'binary': cv2.THRESH_BINARY,
+    'binary_inv': cv2.THRESH_BINARY_INV,
+}
+_MORPH_SHAPES = {
+    'rect': cv2.MORPH_RECT,
+    'ellipse': cv2.MORPH_ELLIPSE,
+    'cross': cv2.MORPH_CROSS,
+}
+
+
+def _kernel(size, shape: str = 'rect') -> np.ndarray:
+    width, height = (size, size) if isinstance(size, int) else size
+    if shape == 'rect':
+        return np.ones((height, width), np.uint8)
+    return cv2.getStructuringElement(_MORPH_SHAPES[shape], (width, height))
+
+
+@register_stage('grayscale')
+def _grayscale(src, dst):
+    if src.ndim == 2:
+        return src
+    return cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=dst)
+
+
+@register_stage('gaussian_blur')
+def _gaussian_blur(src, dst, ksize=3, sigma=0):
+    # 짝수 크기는 다음 홀수로 (기존 basic 방식과 동일)
+    if ksize % 2 == 0:
+        ksize += 1
+    return cv2.GaussianBlur(src, (ksize, ksize), sigma, dst=dst)
+
+
+@register_stage('bilateral')
+def _bilateral(src, dst, d=9, sigma_color=75, sigma_space=75):
+    return cv2.bilateralFilter(src, d, sigma_color, sigma_space, dst=dst)
+
+
+@register_stage('threshold')
+def _threshold(src, dst, value=127, max_value=255, type='binary'):
+    _, result = cv2.threshold(src, value, max_value, _THRESH_TYPES[type], dst=dst)
+    return result
+
+
+@register_stage('adaptive_threshold')
+def _adaptive_threshold(src, dst, block_size=11, c=2, method='gaussian', type='binary'):
+    adaptive = (cv2.ADAPTIVE_THRESH_GAUSSIAN_C if method == 'gaussian'
+                else cv2.ADAPTIVE_THRESH_MEAN_C)
+    return cv2.adaptiveThreshold(src, 255, adaptive, _THRESH_TYPES[type],
+                                 block_size, c, dst=dst)
+
+
+@register_stage('invert')
+def _invert(src, dst):
+    return cv2.bitwise_not(src, dst=dst)
+
+
+def _dark_corners(image: np.ndarray) -> bool:
+    """코너 4픽셀 평균이 128 미만이면 배경이 어두운 것으로 판단"""
+    corners = [image[0, 0], image[0, -1], image[-1, 0], image[-1, -1]]
+    return np.mean(corners) < 128
+
+
+@register_stage('invert_if_dark_corners')
+def _invert_if_dark_corners(src, dst):
+    if _dark_corners(src):
+        return cv2.bitwise_not(src, dst=dst)
+    return src
+
+
+@register_stage('morphology')
+def _morphology(src, dst, op='open', kernel=2, shape='rect', iterations=1):
+    ops = {
+        'erode': cv2.MORPH_ERODE, 'dilate': cv2.MORPH_DILATE,
+        'open': cv2.MORPH_OPEN, 'close': cv2.MORPH_CLOSE,
+    }
+    return cv2.morphologyEx(src, ops[op], _kernel(kernel, shape),
+                            dst=dst, iterations=iterations)
+
+
+@register_stage('adjust_thickness')
+def _adjust_thickness(src, dst, amount=0, kernel=3):
+    # 흰 배경/검은 선 기준: 양수면 선을 두껍게(erode), 음수면 얇게(dilate)
+    op = 'erode' if amount > 0 else 'dilate'
+    return _morphology(src, dst, op=op, kernel=kernel, iterations=abs(amount))
+
+
+@register_stage('canny')
+def _canny(src, dst, low=50, high=150):
+    return cv2.Canny(src, low, high, edges=dst)
+
+
+@register_stage('dodge', uses_dst=False)
+def _dodge(src, dst, ksize=21, scale=256.0):
+    """연필 스케치 효과: gray / (255 - blur(255 - gray))"""
+    blurred = cv2.GaussianBlur(cv2.bitwise_not(src), (ksize, ksize), 0)
+    return cv2.divide(src, cv2.bitwise_not(blurred), scale=scale)
+
+
+@register_stage('scale_abs')
+def _scale_abs(src, dst, alpha=1.0, beta=0.0):
+    return cv2.convertScaleAbs(src, dst=dst, alpha=alpha, beta=beta)
+
+
+@register_stage('remove_speckles', uses_dst=False, profile=False)
+def _remove_speckles(src, dst, min_area=8):
+    return remove_speckles(src, min_area=min_area)
+
+
+@register_stage('remove_components', uses_dst=False, profile=False)
+def _remove_components(src, dst, min_area=50, connectivity=8):
+    return filter_components(src, connectivity=connectivity, min_area=min_area)
+
+
+@register_stage('close_gaps', uses_dst=False, profile=False)
+def _close_gaps(src, dst, max_gap=DEFAULT_MAX_GAP, max_angle=DEFAULT_MAX_ANGLE,
+                min_region=DEFAULT_MIN_REGION, budget_ms_per_mp=DEFAULT_BUDGET_MS_PER_MP):
+    # 흰 배경/검은 선 도안에 사용 (보고서가 필요하면 gap_closing.close_gaps 를 직접 호출)
+    return close_gaps(src, max_gap, max_angle, min_region, budget_ms_per_mp)[0]
+
+
+# 융합 단계 (레시피에 직접 쓰지 않고 컴파일 시 생성)
+@register_stage('threshold_auto_invert')
+def _threshold_auto_invert(src, dst, value=127, max_value=255, type='binary'):
+    # 이진화 결과의 코너 = 입력 코너의 이진화 결과이므로 먼저 반전 여부를 결정
+    corners = np.array([[src[0, 0], src[0, -1]], [src[-1, 0], src[-1, -1]]])
+    _, binary_corners = cv2.threshold(corners, value, max_value, _THRESH_TYPES[type])
+    if _dark_corners(binary_corners):
+        type = 'binary_inv' if type == 'binary' else 'binary'
+    return _threshold(src, dst, value, max_value, type)
+
+
+class Op:
+    """컴파일된 단계 (파라미터가 모두 확정된 상태)"""
+
+    def __init__(self, stage: str, params: Dict[str, Any]):
+        self.stage = stage
+        self.params = params
+
+    def __repr__(self) -> str:
+        return f"Op({self.stage}, {self.params})"
+
+
+class Recipe:
+    """레시피 정의 (이름, 기본 파라미터, 단계 목록)"""
+
+    def __init__(self, name: str, stages: List[Dict[str, Any]],
+                 params: Optional[Dict[str, Any]] = None, description: str = ''):
+        self.name = name
+        self.stages = stages
+        self.params = params or {}
+        self.description = description
+        for entry in stages:
+            if entry.get('stage') not in STAGES:
+                raise ValueError(f"{name}: 등록되지 않은 단계입니다: {entry.get('stage')}")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Recipe':
+        return cls(data['name'], data['stages'], data.get('params'),
+                   data.get('description', ''))
+
+    def _resolve(self, value: Any, params: Dict[str, Any]) -> Any:
+        if isinstance(value, str) and value.startswith('$'):
+            key = value[1:]
+            if key not in params:
+                raise KeyError(f"{self.name}: 파라미터가 없습니다: {key}")
+            return params[key]
+        if isinstance(value, list):
+            return [self._resolve(item, params) for item in value]
+        return value
+
+    def compile(self, **overrides: Any) -> List[Op]:
+        """파라미터를 치환하고 융합한 실행 계획을 만듭니다."""
+        unknown = set(overrides) - set(self.params)
+        if unknown:
+            raise KeyError(f"{self.name}: 알 수 없는 파라미터: {', '.join(sorted(unknown))}")
+        params = dict(self.params, **overrides)
+
+        ops = []
+        for entry in self.stages:
+            if not self._resolve(entry.get('when', True), params):
+                continue
+            stage_params = {
+                key: self._resolve(value, params)
+                for key, value in entry.items() if key not in ('stage', 'when')
+            }
+            ops.append(Op(entry['stage'], stage_params))
+        return fuse(ops)
+
+
+def _lower_morphology(op: Op) -> List[Op]:
+    """open/close/adjust_thickness 를 erode/dilate 기본 연산으로 풀어 씀"""
+    if op.stage == 'adjust_thickness':
+        amount = op.params.get('amount', 0)
+        if amount == 0:
+            return []
+        op = Op('morphology', {'op': 'erode' if amount > 0 else 'dilate',
+                               'kernel': op.params.get('kernel', 3),
+                               'iterations': abs(amount)})
+    if op.stage != 'morphology':
+        return [op]
+
+    params = dict({'op': 'open', 'kernel': 2, 'shape': 'rect', 'iterations': 1}, **op.params)
+    kernel = params['kernel']
+    size = (kernel, kernel) if isinstance(kernel, int) else tuple(kernel)
+    if params['iterations'] == 0 or max(size) <= 1:
+        return []
+    # open/close 는 반복 1회일 때만 erode/dilate 의 연속과 같음
+    if params['op'] in ('open', 'close') and params['iterations'] == 1:
+        order = ['erode', 'dilate'] if params['op'] == 'open' else ['dilate', 'erode']
+        return [Op('morphology', dict(params, op=name)) for name in order]
+    return [Op('morphology', params)]
+
+
+def _morph_key(op: Op) -> Optional[Tuple]:
+    if op.stage != 'morphology' or op.params['op'] not in ('erode', 'dilate'):
+        return None
+    kernel = op.params['kernel']
+    return (op.params['op'], json.dumps(kernel), op.params['shape'])
+
+
+def fuse(ops: List[Op]) -> List[Op]:
+    """결과가 같은 범위에서 인접 단계를 합쳐 패스 수를 줄입니다."""
+    lowered = []
+    for op in ops:
+        if op.stage == 'gaussian_blur' and op.params.get('ksize', 3) <= 1:
+            continue
+        lowered.extend(_lower_morphology(op))
+
+    fused: List[Op] = []
+    for op in lowered:
+        prev = fused[-1] if fused else None
+        if prev is not None:
+            # 반전 두 번은 항등
+            if op.stage == 'invert' and prev.stage == 'invert':
+                fused.pop()
+                continue
+            # threshold(+max 255) 뒤의 반전은 반대 종류의 threshold 한 번으로
+            if (op.stage == 'invert' and prev.stage == 'threshold'
+                    and prev.params.get('max_value', 255) == 255):
+                kind = prev.params.get('type', 'binary')
+                prev.params['type'] = 'binary_inv' if kind == 'binary' else 'binary'
+                continue
+            if op.stage == 'invert_if_dark_corners' and prev.stage == 'threshold':
+                fused[-1] = Op('threshold_auto_invert', prev.params)
+                continue
+            # 같은 커널의 연속 erode/dilate 는 반복 횟수 합산
+            key = _morph_key(op)
+            if key is not None and key == _morph_key(prev):
+                prev.params['iterations'] += op.params['iterations']
+                continue
+        fused.append(Op(op.stage, dict(op.params)))
+    return fused
+
+
+class RecipeExecutor:
+    """컴파일된 계획을 실행하며 중간 버퍼 두 개를 번갈아 재사용"""
+
+    def __init__(self, recipe: Recipe):
+        self.recipe = recipe
+        self._plans: Dict[str, List[Op]] = {}
+        self._buffers: List[Optional[np.ndarray]] = [None, None]
+
+    def plan(self, **params: Any) -> List[Op]:
+        key = json.dumps(params, sort_keys=True, default=str)
+        if key not in self._plans:
+            self._plans[key] = self.recipe.compile(**params)
+        return self._plans[key]
+
+    def _buffer(self, slot: int, shape: Tuple[int, ...], avoid: np.ndarray) -> np.ndarray:
+        buffer = self._buffers[slot]
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[slot] = np.empty(shape, np.uint8)
+        if buffer is avoid:
+            return self._buffer(1 - slot, shape, avoid)
+        return buffer
+
+    def run(self, image: np.ndarray, **params: Any) -> np.ndarray:
+        """
+        image 에 레시피를 적용합니다. 입력 배열은 수정하지 않으며,
+        반환값은 내부 버퍼가 아닌 새 배열입니다.
+        """
+        plan = self.plan(**params)
+        current = image
+        for index, op in enumerate(plan):
+            spec = STAGES[op.stage]
+            last = index == len(plan) - 1
+            dst = None
+            if spec.uses_dst and not last and current.ndim == 2:
+                dst = self._buffer(index % 2, current.shape, current)
+            if spec.profile:
+                with profile_stage(op.stage):
+                    current = spec.func(current, dst, **op.params)
+            else:
+                current = spec.func(current, dst, **op.params)
+        if current is image or any(current is buffer for buffer in self._buffers):
+            current = current.copy()
+        return current
+
+
+def load_recipe(name_or_path: str) -> Recipe:
+    """레시피 이름(scripts/recipes 안) 또는 JSON/YAML 파일 경로로 레시피를 읽습니다."""
+    path = Path(name_or_path)
+    if not path.suffix:
+        candidates = [RECIPE_DIR / f"{name_or_path}{ext}" for ext in ('.json', '.yaml', '.yml')]
+        path = next((c for c in candidates if c.exists()), candidates[0])
+    if not path.exists():
+        raise FileNotFoundError(f"레시피를 찾을 수 없습니다: {name_or_path}")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix in ('.yaml', '.yml'):
+            if yaml is None:
+                raise ImportError("YAML 레시피를 읽으려면 PyYAML 이 필요합니다: pip install pyyaml")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    data.setdefault('name', path.stem)
+    return Recipe.from_dict(data)
+
+
+def available_recipes() -> List[str]:
+    """scripts/recipes 에 있는 레시피 이름 목록"""
+    if not RECIPE_DIR.exists():
+        return []
+    return sorted({
+        p.stem for p in RECIPE_DIR.iterdir()
+        if p.suffix in ('.json', '.yaml', '.yml')
+    })
+
+
+_local = threading.local()
+
+
+def run_recipe(name: str, image: np.ndarray, **params: Any) -> np.ndarray:
+    """이름으로 레시피를 실행합니다 (스레드별로 레시피/실행기/버퍼를 재사용)."""
+    executors = getattr(_local, 'executors', None)
+    if executors is None:
+        executors = _local.executors = {}
+    executor = executors.get(name)
+    if executor is None:
+        executor = executors[name] = RecipeExecutor(load_recipe(name))
+    return executor.run(image, **params)
+
+
+def _parse_param(text: str) -> Tuple[str, Any]:
+    key, _, value = text.partition('=')
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파이프라인 레시피 확인/실행")
+    parser.add_argument('command', choices=['list', 'plan', 'run'])
+    parser.add_argument('recipe', nargs='?', help='레시피 이름 또는 JSON/YAML 경로')
+    parser.add_argument('input', nargs='?', help='run: 입력 이미지')
+    parser.add_argument('output', nargs='?', help='run: 출력 이미지')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        type=_parse_param, help='레시피 파라미터 지정 (값은 JSON)')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name in available_recipes():
+            recipe = load_recipe(name)
+            print(f"   {name:<14}{recipe.description}")
+        return 0
+
+    if args.recipe is None:
+        parser.error("레시피 이름이 필요합니다")
+    recipe = load_recipe(args.recipe)
+    params = dict(args.set)
+
+    if args.command == 'plan':
+        ops = recipe.compile(**params)
+        print(f"📋 {recipe.name}: 단계 {len(recipe.stages)}개 → 실행 {len(ops)}개")
+        for op in ops:
+            print(f"   {op.stage:<24}{json.dumps(op.params, ensure_ascii=False)}")
+        return 0
+
+    if args.input is None or args.output is None:
+        parser.error("run 에는 입력/출력 이미지 경로가 필요합니다")
+    result = RecipeExecutor(recipe).run(load_image(args.input), **params)
+    if not write_image(args.output, result):
+        print(f"❌ 저장 실패: {args.output}")
+        return 1
+    print(f"✅ {args.input} → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
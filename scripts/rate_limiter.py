@@ -0,0 +1,266 @@
+"""
+프로바이더 API 호출용 적응형 속도 제한 (모델별 토큰 버킷 + 429 대응 백오프)
+
+고정 sleep 대신 모델마다 분당 요청 수(rpm)와 동시 요청 수 예산을 두고 호출 간격을
+맞춥니다. 프로바이더가 요청을 제한하면(429, RESOURCE_EXHAUSTED 등):
+
+    - 응답의 retry-after / retryDelay 힌트가 있으면 그만큼, 없으면 지터를 넣은 지수
+      백오프(full jitter)만큼 그 모델의 모든 요청을 멈춘 뒤 같은 모델로 재시도합니다.
+    - 그 모델의 rpm 을 절반으로 낮추고(최소 MIN_RPM), 이후 성공할 때마다 설정값까지
+      조금씩 올립니다 (AIMD). 다른 요청들도 낮아진 간격을 따르므로 연속 실패가 멈춥니다.
+      이미 낮춘 뒤에 돌아온, 그 전에 보낸 요청들의 제한 응답으로는 다시 낮추지 않습니다.
+    - max_retries 를 넘기거나 제한 오류가 아니면 예외를 그대로 던져, 호출한 쪽이
+      다음 모델로 넘어가거나 실패로 기록합니다.
+
+토큰 버킷은 "다음 요청 가능 시각"만 기억하는 방식(GCRA)이라 잠금이 없고, 같은 리미터를
+비동기 호출(call)과 동기 호출(call_sync)이 함께 쓸 수 있습니다.
+
+모델별 예산은 DEFAULT_LIMITS 에 있으며 RATE_LIMITS 환경 변수로 바꿀 수 있습니다.
+    RATE_LIMITS="imagen-4.0-generate-001=20/4,dall-e-3=5"   # 모델=rpm[/동시 요청 수]
+
+사용 예:
+    from rate_limiter import RateLimiter
+
+    limiter = RateLimiter()
+    response = await limiter.call(model, client.aio.models.generate_images,
+                                  model=model, prompt=prompt)
+    ...
+    print(limiter.format_report())
+"""
+
+import asyncio
+import os
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# 모델별 (rpm, 동시 요청 수) — 무료/기본 등급 기준의 보수적인 값
+DEFAULT_LIMITS: Dict[str, Tuple[float, int]] = {
+    'imagen-4.0-generate-001': (10, 4),
+    'imagen-4.0-fast-generate-001': (20, 4),
+    'dall-e-3': (5, 2),
+}
+# 목록에 없는 모델 (주제 생성용 텍스트 모델 등)
+FALLBACK_LIMIT: Tuple[float, int] = (30, 4)
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 2.0      # 첫 재시도 백오프 상한 (초)
+BACKOFF_MAX = 60.0      # 백오프 상한 (초)
+# 적응: 제한될 때 rpm 배율, 성공할 때마다 늘리는 rpm (설정 rpm 대비 비율), rpm 하한
+DECREASE_FACTOR = 0.5
+INCREASE_FRACTION = 0.1
+MIN_RPM = 1.0
+# rpm 을 다시 낮추기 전 최소 간격 (초, 한 번의 제한 구간에서 연달아 반토막 나지 않도록)
+DECREASE_COOLDOWN = 10.0
+# 한 번에 몰아서 보낼 수 있는 요청 수 (버킷 크기)
+BURST = 2
+
+_THROTTLE_CODES = {429, 503}
+_THROTTLE_PATTERN = re.compile(
+    r'RESOURCE_EXHAUSTED|rate.?limit|too many requests|quota', re.IGNORECASE
+)
+_RETRY_HINT_PATTERN = re.compile(
+    r"""retry.?(?:after|delay)['"]?\s*[:=]?\s*['"]?(\d+(?:\.\d+)?)\s*s?""", re.IGNORECASE
+)
+
+
+def limits_from_env(defaults: Dict[str, Tuple[float, int]] = DEFAULT_LIMITS
+                    ) -> Dict[str, Tuple[float, int]]:
+    """RATE_LIMITS 환경 변수(모델=rpm[/동시 요청 수], 쉼표 구분)로 defaults 를 덮어씀"""
+    limits = dict(defaults)
+    for item in os.getenv("RATE_LIMITS", "").split(','):
+        if '=' not in item:
+            continue
+        model, value = (part.strip() for part in item.split('=', 1))
+        rpm, _, concurrency = value.partition('/')
+        try:
+            base = limits.get(model, FALLBACK_LIMIT)
+            limits[model] = (float(rpm), int(concurrency) if concurrency else base[1])
+        except ValueError:
+            print(f"경고: RATE_LIMITS 항목을 해석할 수 없습니다: {item}")
+    return limits
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """SDK 예외에서 HTTP 상태 코드 (OpenAI: status_code, google-genai: code)"""
+    for attr in ('status_code', 'code', 'status'):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_throttle(error: Exception) -> bool:
+    """프로바이더의 요청 제한(429/503, 할당량 초과) 오류인지"""
+    return _status_code(error) in _THROTTLE_CODES or bool(_THROTTLE_PATTERN.search(str(error)))
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """오류가 알려 주는 재시도 대기 시간(초): retry-after 헤더 또는 메시지의 retryDelay"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers is not None:
+        try:
+            return float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+    match = _RETRY_HINT_PATTERN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+def backoff_delay(attempt: int, hint: Optional[float] = None) -> float:
+    """attempt 번째 재시도 전 대기 시간 (힌트가 있으면 힌트 + 작은 지터, 없으면 full jitter)"""
+    if hint is not None:
+        return hint + random.uniform(0, 1.0)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class ModelBudget:
+    """모델 하나의 rpm/동시 요청 예산과 호출 통계"""
+
+    def __init__(self, model: str, rpm: float, concurrency: int):
+        self.model = model
+        self.max_rpm = rpm
+        self.rpm = rpm
+        self.concurrency = max(1, concurrency)
+        self._next_time = 0.0           # 다음 요청을 보낼 수 있는 가장 이른 시각
+        self._paused_until = 0.0        # 제한된 뒤 모든 요청을 멈출 시각
+        self._decreased_at = 0.0        # 마지막으로 rpm 을 낮춘 시각
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.stats = {'requests': 0, 'ok': 0, 'throttled': 0, 'retries': 0, 'failed': 0}
+
+    def reserve(self) -> float:
+        """요청 하나의 전송 시각을 예약하고 지금부터 기다릴 시간(초)을 반환"""
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now
+        interval = 60.0 / self.rpm
+        # 버킷이 가득 차 있으면 BURST 개까지는 바로 보낼 수 있음
+        start = max(now - (BURST - 1) * interval, self._next_time, self._paused_until)
+        self._next_time = start + interval
+        self.stats['requests'] += 1
+        return max(0.0, start - now)
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """현재 이벤트 루프용 동시 요청 세마포어 (asyncio.run 마다 새로 만듦)"""
+        loop_id = id(asyncio.get_running_loop())
+        if loop_id not in self._semaphores:
+            self._semaphores = {loop_id: asyncio.Semaphore(self.concurrency)}
+        return self._semaphores[loop_id]
+
+    def throttled(self, sent_at: float, delay: float) -> None:
+        """
+        sent_at 에 보낸 요청이 제한됨: rpm 을 낮추고 delay 초 동안 이 모델의 요청을 멈춤
+        (마지막으로 낮추기 전에 보낸 요청이거나 DECREASE_COOLDOWN 안이면 같은 제한 구간으로 보고
+        다시 낮추지 않음)
+        """
+        self.stats['throttled'] += 1
+        now = time.monotonic()
+        if sent_at > self._decreased_at and now - self._decreased_at >= DECREASE_COOLDOWN:
+            self.rpm = max(MIN_RPM, self.rpm * DECREASE_FACTOR)
+            self._decreased_at = now
+        self._paused_until = max(self._paused_until, now + delay)
+
+    def succeeded(self) -> None:
+        self.stats['ok'] += 1
+        self.rpm = min(self.max_rpm, self.rpm + self.max_rpm * INCREASE_FRACTION)
+        self.finished = time.monotonic()
+
+    def failed(self) -> None:
+        self.stats['failed'] += 1
+        self.finished = time.monotonic()
+
+    def throughput(self) -> float:
+        """실제 성공 처리량 (분당 성공 수)"""
+        if self.started is None or self.finished is None or self.finished <= self.started:
+            return 0.0
+        return self.stats['ok'] * 60.0 / (self.finished - self.started)
+
+
+class RateLimiter:
+    """모델별 ModelBudget 을 관리하며 프로바이더 호출을 속도 제한/재시도로 감쌉니다."""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 max_retries: int = MAX_RETRIES):
+        self.limits = limits if limits is not None else limits_from_env()
+        self.max_retries = max_retries
+        self.budgets: Dict[str, ModelBudget] = {}
+
+    def budget(self, model: str) -> ModelBudget:
+        if model not in self.budgets:
+            rpm, concurrency = self.limits.get(model, FALLBACK_LIMIT)
+            self.budgets[model] = ModelBudget(model, rpm, concurrency)
+        return self.budgets[model]
+
+    def _retry_delay(self, budget: ModelBudget, error: Exception, attempt: int,
+                     sent_at: float) -> Optional[float]:
+        """재시도할 오류면 대기 시간, 아니면 None (실패로 기록)"""
+        if not is_throttle(error) or attempt >= self.max_retries:
+            budget.failed()
+            return None
+        delay = backoff_delay(attempt, retry_after(error))
+        budget.throttled(sent_at, delay)
+        budget.stats['retries'] += 1
+        print(f"  ⏳ {budget.model} 요청 제한, {delay:.1f}초 후 재시도 "
+              f"({attempt + 1}/{self.max_retries}, rpm {budget.rpm:.1f})")
+        return delay
+
+    async def call(self, model: str, func: Callable[..., Awaitable[Any]], /,
+                   *args: Any, **kwargs: Any) -> Any:
+        """
+        model 예산 안에서 await func(*args, **kwargs) (요청 제한 시 백오프 후 재시도)
+
+        model/func 는 위치 전용이므로 API 의 model= 키워드 인자를 그대로 넘길 수 있습니다.
+        """
+        budget = self.budget(model)
+        attempt = 0
+        while True:
+            async with budget.semaphore():
+                await asyncio.sleep(budget.reserve())
+                sent_at = time.monotonic()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    delay = self._retry_delay(budget, e, attempt, sent_at)
+                    if delay is None:
+                        raise
+                else:
+                    budget.succeeded()
+                    return result
+            # 기다리는 동안에는 동시 요청 자리를 다른 요청에 양보
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def call_sync(self, model: str, func: Callable[..., Any], /,
+                  *args: Any, **kwargs: Any) -> Any:
+        """call 의 동기 버전 (주제 생성처럼 한 번씩 하는 호출용)"""
+        budget = self.budget(model)
+        attempt = 0
+        while True:
+            time.sleep(budget.reserve())
+            sent_at = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(budget, e, attempt, sent_at)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                budget.succeeded()
+                return result
+
+    def format_report(self) -> str:
+        """모델별 실제 처리량과 제한/재시도 통계"""
+        lines = [f"   {'model':<30}{'ok':>5}{'fail':>6}{'429':>6}{'retry':>7}"
+                 f"{'rpm':>7}{'ok/min':>8}"]
+        for budget in self.budgets.values():
+            stats = budget.stats
+            lines.append(f"   {budget.model[:29]:<30}{stats['ok']:>5}{stats['failed']:>6}"
+                         f"{stats['throttled']:>6}{stats['retries']:>7}"
+                         f"{budget.rpm:>7.1f}{budget.throughput():>8.1f}")
+        return '\n'.join(lines)
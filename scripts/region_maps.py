@@ -0,0 +1,226 @@
+"""
+색칠 영역 라벨 맵 사전 계산 (앱의 flood fill 을 조회로 대체하기 위한 데이터)
+
+앱의 FloodFillService 는 탭할 때마다 RGBA 바이트 위에서 BFS 를 돌립니다. 여기서는
+도안의 칠할 수 있는 흰 영역을 미리 4-연결 성분으로 라벨링해 두어, 앱이 탭한 픽셀의
+라벨만 읽고 같은 라벨 픽셀을 칠할 수 있게 합니다.
+
+    - 칠할 수 있는 픽셀: 흰색(255)과의 차이가 앱 기본 허용 오차(32) 이내인 픽셀
+    - 연결성: 4-연결 (앱 BFS 가 상하좌우만 탐색)
+    - 라벨: 0 = 선(경계), 1..regionCount = 영역 (위→아래, 왼→오른쪽 첫 픽셀 순)
+
+저장 형식 (기본 rle, assets/regions/<이름>.rgn):
+    헤더 16바이트, 리틀 엔디언
+        b'RGN1', width (uint32), height (uint32), regionCount (uint32)
+    이어서 zlib 압축된 런 목록: 행 우선으로 (label uint16, length uint16) 반복
+        (길이 65535 초과 런은 나눠 씀, 런은 행 경계를 넘을 수 있음)
+    Flutter 의 이미지 디코더는 16비트 PNG 를 8비트 RGBA 로 줄이므로, 앱에서는
+    ByteData + ZLibDecoder 만으로 읽을 수 있는 이 형식을 씁니다.
+    --format png16 은 같은 라벨을 16비트 그레이스케일 PNG 로 저장합니다 (확인/도구용).
+
+coloring_pages.json 의 해당 페이지에 regionCount, regionMapPath 를 기록합니다.
+
+사용 예:
+    python scripts/region_maps.py                 # assets/images 전체 → assets/regions
+    python scripts/region_maps.py --force --jobs 4
+"""
+
+import argparse
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from batch_executor import add_jobs_argument, run_batch
+from catalog_store import apply_page_updates
+from conversion_cache import PROJECT_ROOT, format_size
+from export_optimizer import DEFAULT_IMAGES_DIR
+from image_io import load_image, write_bytes
+from stage_profiler import profile_stage
+
+REGIONS_DIR = PROJECT_ROOT / "assets" / "regions"
+# 앱 FloodFillService.floodFill 의 기본 tolerance
+FILL_TOLERANCE = 32
+MAX_REGIONS = 65535
+
+RLE_MAGIC = b'RGN1'
+_HEADER = struct.Struct('<4sIII')
+_MAX_RUN = 65535
+FORMATS = {'rle': '.rgn', 'png16': '.png'}
+
+
+def fillable_mask(gray: np.ndarray, tolerance: int = FILL_TOLERANCE) -> np.ndarray:
+    """흰 종이에서 탭했을 때 칠해지는 픽셀 (255 - tolerance 이상)"""
+    return cv2.compare(gray, 255 - tolerance, cv2.CMP_GE)
+
+
+def label_regions(gray: np.ndarray, tolerance: int = FILL_TOLERANCE) -> Tuple[np.ndarray, int]:
+    """
+    칠할 수 있는 영역을 4-연결 성분으로 라벨링합니다.
+
+    Returns:
+        (uint16 라벨 맵, 영역 수)  — 라벨 0 은 선(경계)
+
+    Raises:
+        ValueError: 영역이 65535 개를 넘어 16비트 라벨로 표현할 수 없을 때
+    """
+    with profile_stage('label_regions'):
+        count, labels = cv2.connectedComponents(
+            fillable_mask(gray, tolerance), connectivity=4, ltype=cv2.CV_32S
+        )
+    regions = count - 1
+    if regions > MAX_REGIONS:
+        raise ValueError(f"영역이 너무 많습니다: {regions}개 (최대 {MAX_REGIONS})")
+    return labels.astype(np.uint16), regions
+
+
+def encode_rle(labels: np.ndarray, regions: int) -> bytes:
+    """라벨 맵을 헤더 + zlib(런 목록) 으로 인코딩"""
+    height, width = labels.shape
+    flat = labels.ravel()
+    with profile_stage('encode_rle'):
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(flat)) + 1])
+        lengths = np.diff(np.append(starts, flat.size))
+        values = flat[starts]
+        # 65535 를 넘는 런은 여러 개로 나눔 (마지막 조각에 나머지)
+        pieces = (lengths + _MAX_RUN - 1) // _MAX_RUN
+        run_lengths = np.full(int(pieces.sum()), _MAX_RUN, dtype=np.int64)
+        last = np.cumsum(pieces) - 1
+        run_lengths[last] = lengths - (pieces - 1) * _MAX_RUN
+        runs = np.empty((run_lengths.size, 2), dtype='<u2')
+        runs[:, 0] = np.repeat(values, pieces)
+        runs[:, 1] = run_lengths
+        body = zlib.compress(runs.tobytes(), 9)
+    return _HEADER.pack(RLE_MAGIC, width, height, regions) + body
+
+
+def decode_rle(data: bytes) -> Tuple[np.ndarray, int]:
+    """encode_rle 의 역변환: (uint16 라벨 맵, 영역 수)"""
+    magic, width, height, regions = _HEADER.unpack_from(data)
+    if magic != RLE_MAGIC:
+        raise ValueError(f"영역 맵 형식이 아닙니다: {magic!r}")
+    runs = np.frombuffer(zlib.decompress(data[_HEADER.size:]), dtype='<u2').reshape(-1, 2)
+    labels = np.repeat(runs[:, 0], runs[:, 1].astype(np.int64))
+    if labels.size != width * height:
+        raise ValueError(f"런 길이 합({labels.size})이 이미지 크기와 다릅니다")
+    return labels.reshape(height, width), regions
+
+
+def load_region_map(path: str) -> Tuple[np.ndarray, Optional[int]]:
+    """저장된 영역 맵 읽기 (png16 은 영역 수를 알 수 없어 최대 라벨을 반환)"""
+    if path.endswith(FORMATS['rle']):
+        with open(path, 'rb') as f:
+            return decode_rle(f.read())
+    labels = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if labels is None:
+        raise ValueError(f"영역 맵을 불러올 수 없습니다: {path}")
+    return labels, int(labels.max())
+
+
+def encode_region_map(labels: np.ndarray, regions: int, fmt: str = 'rle') -> bytes:
+    if fmt == 'rle':
+        return encode_rle(labels, regions)
+    ok, buffer = cv2.imencode('.png', labels, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+    if not ok:
+        raise ValueError("16비트 PNG 인코딩 실패")
+    return buffer.tobytes()
+
+
+def map_path_for(image_path: Path, fmt: str = 'rle',
+                 out_dir: Path = REGIONS_DIR) -> Path:
+    return out_dir / f"{image_path.stem}{FORMATS[fmt]}"
+
+
+def build_region_map(image_path: str, map_path: str, fmt: str = 'rle',
+                     tolerance: int = FILL_TOLERANCE) -> Dict:
+    """이미지 하나의 영역 맵을 만들어 저장하고 통계를 반환"""
+    gray = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    labels, regions = label_regions(gray, tolerance)
+    data = encode_region_map(labels, regions, fmt)
+    write_bytes(map_path, data)
+    return {'regions': regions, 'bytes': len(data), 'shape': labels.shape}
+
+
+def _project_path(path: Path) -> str:
+    """JSON 경로 형식 (프로젝트 루트 기준 상대 경로)"""
+    return path.resolve().relative_to(PROJECT_ROOT).as_posix()
+
+
+def _update_page_regions(results: Dict[str, Tuple[int, str]]) -> int:
+    """{imagePath: (regionCount, regionMapPath)} 를 카탈로그에 기록하고 coloring_pages.json 을 내보냄"""
+    return apply_page_updates({
+        image_path: {'regionCount': count, 'regionMapPath': map_path}
+        for image_path, (count, map_path) in results.items()
+    })
+
+
+def _region_task(task: Tuple[str, str, str, int]) -> Dict:
+    image_path, map_path, fmt, tolerance = task
+    return build_region_map(image_path, map_path, fmt, tolerance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도안별 색칠 영역 라벨 맵 사전 계산")
+    parser.add_argument('directory', nargs='?', default=str(DEFAULT_IMAGES_DIR),
+                        help='도안 디렉토리 (기본값 assets/images)')
+    parser.add_argument('--out', default=str(REGIONS_DIR),
+                        help='영역 맵 저장 디렉토리 (기본값 assets/regions)')
+    parser.add_argument('--format', choices=FORMATS, default='rle',
+                        help='rle: 앱용 zlib 런 길이 형식 (기본값), png16: 16비트 라벨 PNG')
+    parser.add_argument('--tolerance', type=int, default=FILL_TOLERANCE,
+                        help=f'흰색과의 허용 차이 (기본값 {FILL_TOLERANCE}, 앱 flood fill 과 동일)')
+    parser.add_argument('--force', action='store_true',
+                        help='도안보다 새로운 영역 맵이 있어도 다시 계산')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    images = sorted(p for p in directory.iterdir()
+                    if p.suffix.lower() in ('.png', '.webp'))
+    if not images:
+        print(f"❌ 도안이 없습니다: {directory}")
+        return 1
+
+    tasks = []
+    skipped = 0
+    for image in images:
+        map_path = map_path_for(image, args.format, out_dir)
+        if (not args.force and map_path.exists()
+                and map_path.stat().st_mtime >= image.stat().st_mtime):
+            skipped += 1
+            continue
+        tasks.append((str(image), str(map_path), args.format, args.tolerance))
+
+    print(f"🧩 영역 맵 계산: {len(tasks)}개 (형식 {args.format}, 건너뜀 {skipped}개)")
+    results = {}
+    total_bytes = failed = 0
+    for (image_path, map_path, *_), outcome in run_batch(_region_task, tasks, args.jobs):
+        name = Path(image_path).name
+        if not outcome.ok:
+            print(f"   ❌ {name}: {outcome.error}")
+            failed += 1
+            continue
+        stats = outcome.value
+        total_bytes += stats['bytes']
+        print(f"   ✅ {name}: 영역 {stats['regions']}개, {format_size(stats['bytes'])}")
+        try:
+            key = _project_path(Path(image_path))
+        except ValueError:  # 프로젝트 밖의 디렉토리는 JSON 에 기록하지 않음
+            continue
+        results[key] = (stats['regions'], _project_path(Path(map_path)))
+
+    updated = _update_page_regions(results)
+    print(f"📊 완료: {len(tasks) - failed}개, 실패 {failed}개, 합계 {format_size(total_bytes)}")
+    if updated:
+        print(f"   📝 coloring_pages.json regionCount/regionMapPath {updated}개 갱신")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
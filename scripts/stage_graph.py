@@ -0,0 +1,118 @@
+"""
+이름 붙은 처리 단계(stage)의 DAG 와 이미지별 메모
+
+여러 스타일이 같은 앞단 처리(디코드, 그레이스케일, 전처리, 에지 검출 등)를
+공유할 때, 각 단계를 한 이미지당 한 번만 계산하고 재사용합니다.
+
+사용 예:
+    graph = StageGraph()
+    graph.add('gray', lambda image: cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), 'image')
+    graph.add('edges', lambda gray: cv2.Canny(gray, 50, 150), 'gray')
+
+    memo = graph.memo(image=img)       # 이미지 하나당 메모 하나
+    edges = memo.get('edges')          # gray → edges 순으로 계산
+    edges = memo.get('edges')          # 캐시 적중
+
+    print(graph.format_counters())     # 단계별 적중/미스 집계
+
+binary=True 로 등록한 단계(결과가 0/255 뿐인 단계)는 그래프를 pack_binary=True 로
+만들면 메모에 1비트로 압축해 보관하고, get() 할 때 0/255 uint8 로 되돌려 줍니다.
+한 이미지의 여러 스타일을 만드는 동안 쌓이는 이진 중간 결과의 메모리가 8배 줄어듭니다.
+"""
+
+from typing import Any, Callable, Dict, Tuple
+
+from bitmap import PackedBitmap
+from stage_profiler import profile_stage
+
+
+class Stage:
+    """의존 단계들의 결과를 인자로 받아 값을 계산하는 처리 단계"""
+
+    def __init__(self, name: str, func: Callable[..., Any], deps: Tuple[str, ...],
+                 binary: bool = False):
+        self.name = name
+        self.func = func
+        self.deps = deps
+        self.binary = binary
+
+
+class StageGraph:
+    """처리 단계 DAG 와 단계별 적중/미스 카운터"""
+
+    def __init__(self, pack_binary: bool = False):
+        self.stages: Dict[str, Stage] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.pack_binary = pack_binary
+
+    def add(self, name: str, func: Callable[..., Any], *deps: str,
+            binary: bool = False) -> None:
+        """
+        단계를 등록합니다. 의존 단계는 먼저 등록되어 있거나 메모의 입력이어야 합니다.
+
+        binary 는 결과가 항상 0/255 uint8 단일 채널일 때만 True 로 지정하세요.
+        """
+        if name in self.stages:
+            raise ValueError(f"이미 등록된 단계입니다: {name}")
+        self.stages[name] = Stage(name, func, tuple(deps), binary)
+        self.counters[name] = {'hits': 0, 'misses': 0}
+
+    def memo(self, **inputs: Any) -> 'StageMemo':
+        """입력값(예: image=...)으로 초기화된 이미지별 메모를 만듭니다."""
+        return StageMemo(self, inputs)
+
+    def reset_counters(self) -> None:
+        for counter in self.counters.values():
+            counter['hits'] = 0
+            counter['misses'] = 0
+
+    def snapshot_counters(self) -> Dict[str, Dict[str, int]]:
+        """현재 카운터의 복사본 (워커 프로세스에서 결과와 함께 돌려줄 때 사용)"""
+        return {name: dict(counter) for name, counter in self.counters.items()}
+
+    def merge_counters(self, counters: Dict[str, Dict[str, int]]) -> None:
+        """다른 그래프(예: 워커 프로세스)의 카운터를 합산합니다."""
+        for name, counter in counters.items():
+            target = self.counters.setdefault(name, {'hits': 0, 'misses': 0})
+            target['hits'] += counter['hits']
+            target['misses'] += counter['misses']
+
+    def format_counters(self) -> str:
+        """단계별 적중/미스 집계를 표 형태 문자열로 반환"""
+        lines = [f"   {'stage':<24}{'hits':>8}{'misses':>8}"]
+        for name, counter in self.counters.items():
+            if counter['hits'] or counter['misses']:
+                lines.append(
+                    f"   {name:<24}{counter['hits']:>8}{counter['misses']:>8}"
+                )
+        return "\n".join(lines)
+
+
+class StageMemo:
+    """한 이미지에 대한 단계 결과 캐시"""
+
+    def __init__(self, graph: StageGraph, inputs: Dict[str, Any]):
+        self.graph = graph
+        self.values: Dict[str, Any] = dict(inputs)
+
+    def get(self, name: str) -> Any:
+        """단계 결과를 반환합니다. 처음 요청된 단계만 계산합니다."""
+        if name in self.values:
+            if name in self.graph.counters:
+                self.graph.counters[name]['hits'] += 1
+            value = self.values[name]
+            return value.unpack() if isinstance(value, PackedBitmap) else value
+
+        stage = self.graph.stages.get(name)
+        if stage is None:
+            raise KeyError(f"등록되지 않은 단계 또는 입력입니다: {name}")
+
+        args = [self.get(dep) for dep in stage.deps]
+        self.graph.counters[name]['misses'] += 1
+        with profile_stage(name):
+            value = stage.func(*args)
+        if stage.binary and self.graph.pack_binary:
+            self.values[name] = PackedBitmap.pack(value)
+        else:
+            self.values[name] = value
+        return value
@@ -0,0 +1,226 @@
+"""
+처리 단계별 시간/메모리 계측
+
+비활성 상태(기본값)에서는 profile_stage() 가 아무 일도 하지 않는 공용 컨텍스트를
+돌려주므로 오버헤드가 전역 변수 확인 한 번 수준입니다. 활성화하면 단계마다
+소요 시간과 tracemalloc 기준 할당 바이트를 기록하고, Chrome trace
+(chrome://tracing, https://ui.perfetto.dev) JSON 과 단계별 집계 표로 내보냅니다.
+
+사용 예:
+    import stage_profiler
+    from stage_profiler import profile_stage, profiled
+
+    @profiled('clahe')
+    def enhance(gray): ...
+
+    with profile_stage('threshold'):
+        ...
+
+    stage_profiler.enable()
+    ...
+    events = stage_profiler.collect()
+    stage_profiler.write_chrome_trace(events, 'trace.json')
+    print(stage_profiler.format_table(events))
+
+할당 바이트는 NumPy/OpenCV 배열을 포함한 tracemalloc 추적 메모리 기준이며,
+프로세스 전역 값이므로 타일 스레드처럼 여러 스레드가 동시에 실행되는 단계에서는
+근삿값입니다. 여러 워커 프로세스의 이벤트는 collect() 결과를 모아 합치면 됩니다.
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class StageProfiler:
+    """단계 구간을 Chrome trace 'X'(complete) 이벤트로 기록"""
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.events: List[Dict[str, Any]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stack(self) -> List[Dict[str, Any]]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def stage(self, name: str) -> '_StageSpan':
+        return _StageSpan(self, name)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """기록된 이벤트를 꺼내고 비웁니다 (워커에서 결과와 함께 돌려줄 때 사용)"""
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+
+class _StageSpan:
+    """profile_stage() 한 번의 구간 (중첩 시 부모의 자식 시간/최대 메모리에 반영)"""
+
+    __slots__ = ('profiler', 'name', 'frame')
+
+    def __init__(self, profiler: StageProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.frame = None
+
+    def __enter__(self) -> '_StageSpan':
+        profiler = self.profiler
+        stack = profiler._stack()
+        current = 0
+        if profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # 자식 구간이 peak 를 초기화하기 전에 부모의 최대값을 보존
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+        self.frame = {
+            'start_ns': time.perf_counter_ns(),
+            'wall_us': time.time_ns() // 1000,
+            'mem_start': current,
+            'peak': current,
+            'child_ns': 0,
+        }
+        stack.append(self.frame)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        profiler = self.profiler
+        duration = time.perf_counter_ns() - self.frame['start_ns']
+        stack = profiler._stack()
+        stack.pop()
+
+        args = {'self_us': (duration - self.frame['child_ns']) / 1000}
+        if profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(self.frame['peak'], peak)
+            args['alloc_bytes'] = current - self.frame['mem_start']
+            args['peak_bytes'] = peak - self.frame['mem_start']
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        if stack:
+            stack[-1]['child_ns'] += duration
+
+        event = {
+            'name': self.name, 'cat': 'stage', 'ph': 'X',
+            'ts': self.frame['wall_us'], 'dur': duration / 1000,
+            'pid': os.getpid(), 'tid': threading.get_ident(),
+            'args': args,
+        }
+        with profiler._lock:
+            profiler.events.append(event)
+
+
+_profiler: Optional[StageProfiler] = None
+
+
+def enable(memory: bool = True) -> StageProfiler:
+    """현재 프로세스의 계측을 켭니다 (이미 켜져 있으면 기존 프로파일러 반환)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = StageProfiler(memory=memory)
+    return _profiler
+
+
+def disable() -> None:
+    global _profiler
+    if _profiler is not None and _profiler.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _profiler = None
+
+
+def is_enabled() -> bool:
+    return _profiler is not None
+
+
+def profile_stage(name: str):
+    """with 문으로 구간을 계측합니다. 비활성 시 아무 일도 하지 않습니다."""
+    if _profiler is None:
+        return _NULL_CONTEXT
+    return _profiler.stage(name)
+
+
+def profiled(name: str) -> Callable[[Callable], Callable]:
+    """함수 호출 전체를 name 단계로 계측하는 데코레이터"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _profiler.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def collect() -> List[Dict[str, Any]]:
+    """현재 프로세스에서 기록된 이벤트를 꺼냅니다 (비활성이면 빈 목록)"""
+    return _profiler.drain() if _profiler is not None else []
+
+
+def write_chrome_trace(events: List[Dict[str, Any]], path: str) -> None:
+    """chrome://tracing / Perfetto 에서 열 수 있는 JSON 으로 저장"""
+    start = min((event['ts'] for event in events), default=0)
+    trace = [dict(event, ts=event['ts'] - start) for event in events]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+
+
+def summarize(events: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """단계별 호출 수, 전체/자체 시간(ms), 최대 시간, 할당/최대 메모리 집계"""
+    summary: Dict[str, Dict[str, float]] = {}
+    for event in events:
+        row = summary.setdefault(event['name'], {
+            'count': 0, 'total_ms': 0.0, 'self_ms': 0.0, 'max_ms': 0.0,
+            'alloc_bytes': 0, 'peak_bytes': 0,
+        })
+        duration_ms = event['dur'] / 1000
+        row['count'] += 1
+        row['total_ms'] += duration_ms
+        row['self_ms'] += event['args']['self_us'] / 1000
+        row['max_ms'] = max(row['max_ms'], duration_ms)
+        row['alloc_bytes'] += event['args'].get('alloc_bytes', 0)
+        row['peak_bytes'] = max(row['peak_bytes'], event['args'].get('peak_bytes', 0))
+    return summary
+
+
+def format_table(events: List[Dict[str, Any]]) -> str:
+    """자체 시간 내림차순의 단계별 집계 표"""
+    summary = summarize(events)
+    lines = [f"   {'stage':<24}{'calls':>7}{'total ms':>11}{'self ms':>10}"
+             f"{'max ms':>9}{'peak MB':>9}"]
+    for name, row in sorted(summary.items(), key=lambda item: -item[1]['self_ms']):
+        lines.append(
+            f"   {name:<24}{row['count']:>7}{row['total_ms']:>11.1f}{row['self_ms']:>10.1f}"
+            f"{row['max_ms']:>9.1f}{row['peak_bytes'] / 1024 ** 2:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    """변환 스크립트 공통 --profile 옵션"""
+    parser.add_argument(
+        '--profile', metavar='TRACE.json', default=None,
+        help='단계별 시간/메모리를 계측해 Chrome trace JSON 으로 저장하고 집계 표 출력'
+    )
+
+
+def report(events: List[Dict[str, Any]], path: str) -> None:
+    """배치 종료 시 trace 파일 저장과 집계 표 출력"""
+    write_chrome_trace(events, path)
+    print("⏱️  단계별 계측 (chrome://tracing 또는 ui.perfetto.dev 에서 열기)")
+    print(format_table(events))
+    print(f"   📄 trace: {path}")
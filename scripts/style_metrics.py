@@ -0,0 +1,150 @@
+"""
+도안 품질 지표와 자동 스타일 선택
+
+변환된 도안(흰 배경/검은 선)마다 색칠하기 좋은 정도를 빠르게 재는 지표를 계산하고,
+여러 스타일 결과 중 벌점이 가장 낮은 것을 고릅니다. 모든 지표는 전체 배열 연산
+(거리 변환, 연결 성분 1회, 세선화)으로 계산해 변환 시간의 일부만 씁니다.
+
+    - coverage:        잉크(검은 선) 비율
+    - width_cv:        선 두께의 변동 계수 (거리 변환의 능선 = 선 중심에서 잰 두께)
+    - regions:         칠할 수 있는 영역 수 (앱 flood fill 과 같은 4-연결)
+    - tiny_ratio:      영역 중 min_region 보다 작은(탭하기 어려운) 영역의 비율
+    - endpoints:       골격의 열린 끝점 수 (끊긴 선/잔선이 많을수록 큼)
+
+벌점은 지표별 벌점의 가중합이며(PENALTY_WEIGHTS), 범위형 지표(잉크 비율, 메가픽셀당
+영역 수)는 권장 범위를 벗어난 배율의 log2 로, 나머지는 값에 비례해 매깁니다.
+
+사용 예:
+    from style_metrics import choose_style
+
+    best, scores = choose_style({'clean': page1, 'detailed': page2})
+    print(format_scores(scores, best))
+"""
+
+import math
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+from gap_closing import DEFAULT_MIN_REGION, find_endpoints, skeletonize
+from region_maps import fillable_mask
+from stage_profiler import profile_stage
+
+# 권장 범위 (벗어난 배율의 log2 가 벌점)
+COVERAGE_RANGE = (0.03, 0.15)
+REGIONS_PER_MP_RANGE = (20.0, 400.0)
+
+PENALTY_WEIGHTS = {
+    'coverage': 1.0,
+    'width_cv': 1.0,
+    'regions': 1.0,
+    'tiny_ratio': 2.0,
+    'endpoints': 1.0,
+}
+# 골격 1000px 당 끝점 수가 이 값이면 endpoints 벌점 1
+_ENDPOINTS_PER_KPX_UNIT = 10.0
+# 잉크가 이 비율을 넘는 페이지(거의 검은 페이지)는 두께/골격 계산을 생략
+# (잉크 비율과 영역 수 벌점만으로 이미 탈락하고, 세선화가 가장 오래 걸리는 경우)
+_SATURATED_COVERAGE = 0.5
+
+
+def page_metrics(page: np.ndarray, min_region: int = DEFAULT_MIN_REGION) -> Dict[str, float]:
+    """흰 배경/검은 선 uint8 도안 하나의 품질 지표"""
+    with profile_stage('metrics'):
+        ink = cv2.compare(page, 128, cv2.CMP_LT)
+        ink_pixels = cv2.countNonZero(ink)
+        megapixels = page.shape[0] * page.shape[1] / 1e6
+        measure_lines = 0 < ink_pixels <= ink.size * _SATURATED_COVERAGE
+
+        # 선 두께: 거리 변환의 국소 최댓값(선 중심) 에서 2d - 1
+        widths = np.empty(0, np.float32)
+        if measure_lines:
+            distance = cv2.distanceTransform(ink, cv2.DIST_L2, 3)
+            ridge = (distance > 0) & (distance >= cv2.dilate(distance, np.ones((3, 3), np.uint8)))
+            widths = 2 * distance[ridge] - 1
+        width_mean = float(widths.mean()) if widths.size else 0.0
+        width_cv = float(widths.std() / width_mean) if width_mean > 0 else 0.0
+
+        _, _, stats, _ = cv2.connectedComponentsWithStats(fillable_mask(page), connectivity=4)
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        tiny_ratio = float(np.mean(areas < min_region)) if areas.size else 0.0
+
+        skeleton_pixels = endpoints = 0
+        if measure_lines:
+            skeleton = skeletonize(ink)
+            skeleton_pixels = int(np.count_nonzero(skeleton))
+            endpoints = len(find_endpoints(skeleton))
+
+    return {
+        'coverage': ink_pixels / ink.size,
+        'width_mean': width_mean,
+        'width_cv': width_cv,
+        'regions': int(areas.size),
+        'regions_per_mp': areas.size / megapixels,
+        'tiny_ratio': tiny_ratio,
+        'endpoints': endpoints,
+        'endpoints_per_kpx': endpoints * 1000 / skeleton_pixels if skeleton_pixels else 0.0,
+    }
+
+
+def _range_penalty(value: float, low: float, high: float) -> float:
+    """[low, high] 안이면 0, 벗어나면 벗어난 배율의 log2 (0 이하 값은 큰 벌점)"""
+    if value <= 0:
+        return 4.0
+    if value < low:
+        return math.log2(low / value)
+    if value > high:
+        return math.log2(value / high)
+    return 0.0
+
+
+def penalties(metrics: Dict[str, float]) -> Dict[str, float]:
+    """지표별 벌점 (가중치 적용 전)"""
+    return {
+        'coverage': _range_penalty(metrics['coverage'], *COVERAGE_RANGE),
+        'width_cv': metrics['width_cv'],
+        'regions': _range_penalty(metrics['regions_per_mp'], *REGIONS_PER_MP_RANGE),
+        'tiny_ratio': metrics['tiny_ratio'],
+        'endpoints': metrics['endpoints_per_kpx'] / _ENDPOINTS_PER_KPX_UNIT,
+    }
+
+
+def score(metrics: Dict[str, float]) -> float:
+    """가중 벌점 합 (낮을수록 좋음)"""
+    return sum(PENALTY_WEIGHTS[name] * value for name, value in penalties(metrics).items())
+
+
+def scored_metrics(page: np.ndarray,
+                   min_region: int = DEFAULT_MIN_REGION) -> Dict[str, float]:
+    """page_metrics 에 가중 벌점 합('score')을 더한 지표 (도안을 하나씩 비교할 때 사용)"""
+    metrics = page_metrics(page, min_region)
+    metrics['score'] = score(metrics)
+    return metrics
+
+
+def choose_style(pages: Dict[str, np.ndarray],
+                 min_region: int = DEFAULT_MIN_REGION) -> Tuple[str, Dict[str, Dict[str, float]]]:
+    """
+    스타일별 도안 중 벌점이 가장 낮은 스타일을 고릅니다.
+
+    Returns:
+        (선택된 스타일, {스타일: 지표 + 'score'})  — 동점이면 pages 순서상 앞의 스타일
+    """
+    if not pages:
+        raise ValueError("비교할 도안이 없습니다")
+    scores = {style: scored_metrics(page, min_region) for style, page in pages.items()}
+    best = min(scores, key=lambda style: scores[style]['score'])
+    return best, scores
+
+
+def format_scores(scores: Dict[str, Dict[str, float]], best: str = None) -> str:
+    """스타일별 지표 표 (선택된 스타일에 ★)"""
+    lines = [f"   {'style':<12}{'score':>7}{'ink%':>7}{'width':>7}{'cv':>6}"
+             f"{'regions':>9}{'tiny%':>7}{'ends':>6}"]
+    for style, m in sorted(scores.items(), key=lambda item: item[1]['score']):
+        mark = '★' if style == best else ' '
+        lines.append(f" {mark} {style:<12}{m['score']:>7.2f}{m['coverage'] * 100:>7.1f}"
+                     f"{m['width_mean']:>7.1f}{m['width_cv']:>6.2f}{m['regions']:>9}"
+                     f"{m['tiny_ratio'] * 100:>7.1f}{m['endpoints']:>6}")
+    return '\n'.join(lines)
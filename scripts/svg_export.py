@@ -0,0 +1,509 @@
+"""
+흑백 도안의 SVG 벡터 내보내기 (윤곽선 추적 + 베지어 곡선 맞춤)
+
+검은 선(잉크) 영역을 2배 격자로 늘려 cv2.findContours 로 윤곽선을 추적하고, 픽셀
+경계로 밀어낸 뒤 계단을 펴고 모서리에서 나눠 3차 베지어 곡선으로 근사합니다
+(Schneider 의 최소제곱 곡선 맞춤, tolerance 는 허용 오차 px). 2배 격자에서는 1px 선의
+양쪽 윤곽이 서로 다른 점을 지나므로 경계로 민 다음 펴도 선 폭이 유지되고, 가는 선
+주변에서는 허용 오차를 선 두께에 비례해 줄여 선이 무너지지 않게 합니다. 모든 윤곽선을
+evenodd 채우기의 path 하나에 1/2 px 단위 상대 좌표로 담아 작은 SVG 를 만듭니다.
+
+내보낸 곡선을 다시 래스터화해 원본과 픽셀 일치율(전체/잉크 IoU)을 함께 보고하므로
+tolerance 를 키울 때 품질 손실을 바로 확인할 수 있습니다.
+
+사용 예:
+    from svg_export import export_svg
+
+    stats = export_svg(page, 'page.svg', tolerance=1.0)
+    # {'bytes': ..., 'paths': ..., 'agreement': 0.998, 'ink_iou': 0.97}
+
+    python scripts/svg_export.py assets/images --tolerance 1.5 --jobs 4   # → assets/vector/
+"""
+
+import argparse
+import os
+import sys
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from batch_executor import add_jobs_argument, run_batch
+from conversion_cache import PROJECT_ROOT, format_size
+from image_io import load_image, write_bytes
+from stage_profiler import profile_stage
+
+# 앱에 번들되지 않는 (pubspec assets 에 없는) 벡터 도안 출력 위치
+VECTOR_DIR = PROJECT_ROOT / "assets" / "vector"
+DEFAULT_TOLERANCE = 1.0
+DEFAULT_PRECISION = 0
+# SVG 좌표 단위 (1 px = 2 단위): 소수점 없이도 반올림 오차가 1/4 px 이하라 가는 선이 유지됨
+SVG_UNITS_PER_PX = 2
+# 진행 방향이 이 각도(도) 이상 꺾이는 점은 곡선을 나누는 모서리로 취급
+CORNER_ANGLE = 60.0
+# 윤곽선 추적 격자 배율 (윤곽선 점 간격 1/2 px)
+_TRACE_SCALE = 2
+# 모서리 판정 범위와 계단 모양을 펴는 이동 평균 창 크기 (2배 격자 윤곽선 점 개수)
+_CORNER_SPAN = 3
+_SMOOTH_WINDOW = 2 * _TRACE_SCALE + 1
+# 허용 오차는 그 자리 선 두께의 이 비율을 넘지 않음 (최소 _MIN_ERROR px)
+THIN_ERROR_RATIO = 0.1
+_MIN_ERROR = 0.1
+_MAX_DEPTH = 24
+
+# 한 윤곽선(subpath) = 이어진 3차 베지어 곡선들, shape (n, 4, 2): p0, c1, c2, p3
+Subpath = np.ndarray
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    length = np.hypot(*vector)
+    return vector / length if length > 1e-9 else vector
+
+
+def _bezier_points(ctrl: np.ndarray, t: np.ndarray) -> np.ndarray:
+    mt = 1.0 - t
+    return ((mt ** 3)[:, None] * ctrl[0] + (3 * mt * mt * t)[:, None] * ctrl[1]
+            + (3 * mt * t * t)[:, None] * ctrl[2] + (t ** 3)[:, None] * ctrl[3])
+
+
+def _chord_parameters(points: np.ndarray) -> np.ndarray:
+    distances = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+    return distances / distances[-1] if distances[-1] > 0 else distances
+
+
+def _line_bezier(p0: np.ndarray, p3: np.ndarray) -> np.ndarray:
+    return np.array([p0, p0 + (p3 - p0) / 3, p3 - (p3 - p0) / 3, p3])
+
+
+def _generate_bezier(points: np.ndarray, u: np.ndarray,
+                     tan1: np.ndarray, tan2: np.ndarray) -> np.ndarray:
+    """끝점과 양 끝 접선 방향이 정해진 3차 베지어의 최소제곱 맞춤"""
+    p0, p3 = points[0], points[-1]
+    mt = 1.0 - u
+    b0, b1, b2, b3 = mt ** 3, 3 * mt * mt * u, 3 * mt * u * u, u ** 3
+    a1 = b1[:, None] * tan1
+    a2 = b2[:, None] * tan2
+    c00, c01, c11 = np.sum(a1 * a1), np.sum(a1 * a2), np.sum(a2 * a2)
+    rest = points - ((b0 + b1)[:, None] * p0 + (b2 + b3)[:, None] * p3)
+    x0, x1 = np.sum(a1 * rest), np.sum(a2 * rest)
+
+    det = c00 * c11 - c01 * c01
+    segment_length = np.hypot(*(p3 - p0))
+    if abs(det) > 1e-12:
+        alpha1 = (x0 * c11 - x1 * c01) / det
+        alpha2 = (c00 * x1 - c01 * x0) / det
+    else:
+        alpha1 = alpha2 = 0.0
+    # 해가 불안정하면 (음수/0 길이) 현 길이의 1/3 로 대체
+    epsilon = 1e-6 * segment_length
+    if alpha1 < epsilon or alpha2 < epsilon:
+        alpha1 = alpha2 = segment_length / 3
+    return np.array([p0, p0 + alpha1 * tan1, p3 + alpha2 * tan2, p3])
+
+
+def _reparameterize(points: np.ndarray, ctrl: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Newton-Raphson 한 단계로 각 점에 더 가까운 곡선 위 매개변수를 찾음"""
+    d1 = 3 * np.diff(ctrl, axis=0)
+    d2 = 2 * np.diff(d1, axis=0)
+    mt = 1.0 - u
+    q = _bezier_points(ctrl, u)
+    q1 = (mt * mt)[:, None] * d1[0] + (2 * mt * u)[:, None] * d1[1] + (u * u)[:, None] * d1[2]
+    q2 = mt[:, None] * d2[0] + u[:, None] * d2[1]
+    diff = q - points
+    numerator = np.sum(diff * q1, axis=1)
+    denominator = np.sum(q1 * q1, axis=1) + np.sum(diff * q2, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        step = np.where(np.abs(denominator) > 1e-12, numerator / denominator, 0.0)
+    return np.clip(u - step, 0.0, 1.0)
+
+
+def _max_error(points: np.ndarray, ctrl: np.ndarray, u: np.ndarray,
+               error_sq: np.ndarray) -> Tuple[float, int]:
+    """점별 허용 오차 대비 가장 큰 오차 비율과 그 위치 (비율 1 미만이면 허용)"""
+    errors = np.sum((_bezier_points(ctrl, u) - points) ** 2, axis=1) / error_sq
+    split = int(np.argmax(errors[1:-1])) + 1 if len(points) > 2 else len(points) // 2
+    return float(errors.max()), split
+
+
+def _fit_cubic(points: np.ndarray, tan1: np.ndarray, tan2: np.ndarray,
+               error_sq: np.ndarray, out: List[np.ndarray], depth: int = 0) -> None:
+    """points 를 점별 error_sq(제곱 px) 안으로 근사하는 베지어들을 out 에 추가"""
+    if len(points) == 2 or depth >= _MAX_DEPTH:
+        distance = np.hypot(*(points[-1] - points[0])) / 3
+        if len(points) == 2:
+            out.append(np.array([points[0], points[0] + tan1 * distance,
+                                 points[-1] + tan2 * distance, points[-1]]))
+        else:
+            out.extend(_line_bezier(a, b) for a, b in zip(points[:-1], points[1:]))
+        return
+
+    u = _chord_parameters(points)
+    ctrl = _generate_bezier(points, u, tan1, tan2)
+    error, split = _max_error(points, ctrl, u, error_sq)
+    if error < 1:
+        out.append(ctrl)
+        return
+    if error < 4:
+        for _ in range(4):
+            u = _reparameterize(points, ctrl, u)
+            ctrl = _generate_bezier(points, u, tan1, tan2)
+            error, split = _max_error(points, ctrl, u, error_sq)
+            if error < 1:
+                out.append(ctrl)
+                return
+
+    center = _normalize(points[split - 1] - points[split + 1])
+    if not center.any():
+        center = _normalize(points[split - 1] - points[split])
+    _fit_cubic(points[:split + 1], tan1, center, error_sq[:split + 1], out, depth + 1)
+    _fit_cubic(points[split:], -center, tan2, error_sq[split:], out, depth + 1)
+
+
+def _end_tangents(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    span = min(_CORNER_SPAN, len(points) - 1)
+    return (_normalize(points[span] - points[0]),
+            _normalize(points[-1 - span] - points[-1]))
+
+
+def _find_corners(points: np.ndarray, corner_angle: float) -> np.ndarray:
+    """닫힌 윤곽선에서 진행 방향이 corner_angle 이상 꺾이는 극대점의 인덱스"""
+    k = _CORNER_SPAN
+    before = points - np.roll(points, k, axis=0)
+    after = np.roll(points, -k, axis=0) - points
+    cos = np.sum(before * after, axis=1) / np.maximum(
+        np.hypot(*before.T) * np.hypot(*after.T), 1e-9)
+    turning = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+    # 주변 ±k 안에서 가장 크게 꺾이는 점만 남김
+    window = np.stack([np.roll(turning, shift) for shift in range(-k, k + 1)])
+    is_peak = (turning >= window.max(axis=0)) & (turning >= corner_angle)
+    return np.flatnonzero(is_peak)
+
+
+def _offset_from_ink(points: np.ndarray, is_hole: bool) -> np.ndarray:
+    """
+    findContours 의 점은 경계 픽셀의 중심이므로, 잉크 바깥쪽으로 0.5px 밀어
+    실제 픽셀 경계에 맞춥니다 (바깥 윤곽은 넓히고, 구멍 윤곽은 구멍 쪽으로).
+    """
+    tangent = np.roll(points, -1, axis=0) - np.roll(points, 1, axis=0)
+    normal = np.stack([tangent[:, 1], -tangent[:, 0]], axis=1)
+    normal /= np.maximum(np.hypot(*normal.T), 1e-9)[:, None]
+    area = cv2.contourArea(points.astype(np.float32), oriented=True)
+    shifted_area = cv2.contourArea((points + 0.5 * normal).astype(np.float32), oriented=True)
+    grows = abs(shifted_area) > abs(area)
+    sign = 1.0 if grows != is_hole else -1.0
+    return points + sign * 0.5 * normal
+
+
+def _to_pixel_coords(points: np.ndarray) -> np.ndarray:
+    """_TRACE_SCALE 배 격자의 픽셀 중심 좌표 → 원래 격자의 픽셀 중심 좌표"""
+    return (points + 0.5) / _TRACE_SCALE - 0.5
+
+
+def _stroke_widths(ink: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    잉크 픽셀마다 주변 선 두께(px) 추정값 (잉크 거리 변환의 주변 최댓값 × 2 - 1)
+
+    두께가 tolerance / THIN_ERROR_RATIO 이상이면 허용 오차에 영향이 없으므로
+    그 절반 거리까지만 살핍니다.
+    """
+    distance = cv2.distanceTransform(ink, cv2.DIST_L2, 3)
+    reach = max(1, int(np.ceil(tolerance / THIN_ERROR_RATIO / 2)))
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * reach + 1, 2 * reach + 1))
+    return cv2.dilate(distance, kernel) * 2 - 1
+
+
+def _pixel_square(point: np.ndarray) -> Subpath:
+    x, y = point
+    corners = np.array([[x - 0.5, y - 0.5], [x + 0.5, y - 0.5],
+                        [x + 0.5, y + 0.5], [x - 0.5, y + 0.5]])
+    return np.array([_line_bezier(a, b) for a, b in zip(corners, np.roll(corners, -1, axis=0))])
+
+
+def _fit_contour(contour: np.ndarray, is_hole: bool, tolerance: float,
+                 corner_angle: float, widths: np.ndarray) -> Subpath:
+    """
+    _TRACE_SCALE 배 격자의 윤곽선 하나를 베지어 subpath 로 근사합니다.
+    widths 는 원래 격자의 선 두께 맵 (_stroke_widths) 입니다.
+    """
+    points = contour.reshape(-1, 2).astype(np.float64)
+    if len(points) <= 4:
+        # 한 픽셀 (2배 격자의 2x2 블록): 픽셀 사각형
+        return _pixel_square(_to_pixel_coords(points.mean(axis=0)))
+
+    # 점별 허용 오차: 가는 선에서는 두께에 비례해 줄임
+    pixels = contour.reshape(-1, 2) // _TRACE_SCALE
+    error = np.clip(THIN_ERROR_RATIO * widths[pixels[:, 1], pixels[:, 0]],
+                    min(_MIN_ERROR, tolerance), tolerance)
+    error_sq = error.astype(np.float64) ** 2
+
+    # 2배 격자에서 픽셀 경계로 민 다음(선 양쪽이 겹치지 않음) 계단 모양을 이동 평균으로 폄
+    points = _to_pixel_coords(_offset_from_ink(points, is_hole))
+    window = min(_SMOOTH_WINDOW, len(points))
+    points = sum(np.roll(points, shift, axis=0)
+                 for shift in range(-(window // 2), window - window // 2)) / window
+
+    corners = _find_corners(points, corner_angle) if len(points) > 2 * _CORNER_SPAN + 1 else []
+    curves: List[np.ndarray] = []
+    if len(corners) == 0:
+        # 모서리 없는 매끈한 고리: 두 점에서 나누고 이음새의 접선을 공유
+        half = len(points) // 2
+        for start, end in ((0, half), (half, len(points))):
+            segment = np.vstack([points[start:end], points[end % len(points)]])
+            segment_error = np.append(error_sq[start:end], error_sq[end % len(points)])
+            prev_pt, next_pt = points[start - 1], points[(start + 1) % len(points)]
+            tan_start = _normalize(next_pt - prev_pt)
+            end_index = end % len(points)
+            tan_end = _normalize(points[end_index - 1] - points[(end_index + 1) % len(points)])
+            _fit_cubic(segment, tan_start, tan_end, segment_error, curves)
+    else:
+        points = np.roll(points, -corners[0], axis=0)
+        error_sq = np.roll(error_sq, -corners[0])
+        cuts = list(corners - corners[0]) + [len(points)]
+        closed = np.vstack([points, points[:1]])
+        closed_error = np.append(error_sq, error_sq[0])
+        for start, end in zip(cuts[:-1], cuts[1:]):
+            segment = closed[start:end + 1]
+            if len(segment) < 2:
+                continue
+            tan1, tan2 = _end_tangents(segment)
+            _fit_cubic(segment, tan1, tan2, closed_error[start:end + 1], curves)
+    return np.array(curves)
+
+
+def trace(page: np.ndarray, tolerance: float = DEFAULT_TOLERANCE,
+          corner_angle: float = CORNER_ANGLE) -> List[Subpath]:
+    """
+    흰 배경/검은 선 도안의 잉크 윤곽선을 베지어 subpath 목록으로 추적합니다.
+
+    좌표는 픽셀 중심 기준(픽셀 (x, y) 의 중심이 (x, y))입니다.
+    """
+    with profile_stage('trace'):
+        ink = cv2.compare(page, 128, cv2.CMP_LT)
+        widths = _stroke_widths(ink, tolerance)
+        ink = cv2.resize(ink, None, fx=_TRACE_SCALE, fy=_TRACE_SCALE,
+                         interpolation=cv2.INTER_NEAREST)
+        contours, hierarchy = cv2.findContours(ink, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_NONE)
+    if not contours:
+        return []
+    with profile_stage('bezier_fit'):
+        return [
+            _fit_contour(contour, hierarchy[0][i][3] != -1, tolerance, corner_angle, widths)
+            for i, contour in enumerate(contours)
+        ]
+
+
+def _format_number(value: float, precision: int) -> str:
+    text = f"{value:.{precision}f}".rstrip('0').rstrip('.') if precision else f"{value:.0f}"
+    if text in ('-0', ''):
+        return '0'
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+
+def _join_numbers(values: List[float], precision: int) -> str:
+    """SVG path 숫자 목록 (음수 앞 구분자 생략)"""
+    parts = []
+    for value in values:
+        text = _format_number(value, precision)
+        if parts and not text.startswith('-'):
+            parts.append(' ')
+        parts.append(text)
+    return ''.join(parts)
+
+
+def quantize(subpaths: List[Subpath], precision: int = DEFAULT_PRECISION) -> List[Subpath]:
+    """
+    SVG 에 쓰일 좌표(픽셀 모서리 기준, SVG_UNITS_PER_PX 단위)를 precision 자리로 반올림해
+    픽셀 중심 기준으로 되돌림
+    """
+    scale = SVG_UNITS_PER_PX * 10 ** precision
+    return [np.round((curves + 0.5) * scale) / scale - 0.5 for curves in subpaths]
+
+
+def path_data(subpaths: List[Subpath], precision: int = DEFAULT_PRECISION) -> str:
+    """subpath 들을 상대 좌표(c) SVG path 데이터로 변환 (좌표는 픽셀 모서리 기준, 1/2 px 단위)"""
+    commands = []
+    for curves in quantize(subpaths, precision):
+        if len(curves) == 0:
+            continue
+        # 반올림한 절대 좌표의 차이로 상대 좌표를 만들어 오차가 누적되지 않게 함
+        rounded = (curves + 0.5) * SVG_UNITS_PER_PX
+        current = rounded[0, 0]
+        parts = [f"M{_join_numbers(list(current), precision)}c"]
+        values = []
+        for curve in rounded:
+            values.extend((curve[1:] - current).ravel())
+            current = curve[3]
+        parts.append(_join_numbers(values, precision))
+        parts.append('z')
+        commands.append(''.join(parts))
+    return ''.join(commands)
+
+
+def to_svg(subpaths: List[Subpath], width: int, height: int,
+           precision: int = DEFAULT_PRECISION) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'viewBox="0 0 {width * SVG_UNITS_PER_PX} {height * SVG_UNITS_PER_PX}" '
+        f'width="{width}" height="{height}">'
+        f'<rect width="100%" height="100%" fill="#fff"/>'
+        f'<path fill-rule="evenodd" d="{path_data(subpaths, precision)}"/></svg>\n'
+    )
+
+
+def rasterize(subpaths: List[Subpath], shape: Tuple[int, int],
+              samples_per_curve: int = 8, supersample: int = 4) -> np.ndarray:
+    """
+    베지어 subpath 를 evenodd 로 채워 흰 배경/검은 선 이미지로 되돌립니다 (일치도 확인용).
+
+    cv2.fillPoly 는 경계에 걸친 픽셀을 모두 칠하므로 supersample 배로 그린 뒤 면적
+    평균을 내고, 절반 이상 덮인 픽셀만 잉크로 봅니다 (SVG 렌더러의 판정에 가까움).
+    """
+    height, width = shape
+    canvas = np.full((height * supersample, width * supersample), 255, np.uint8)
+    t = np.linspace(0.0, 1.0, samples_per_curve, endpoint=False)
+    polygons = []
+    for curves in subpaths:
+        if len(curves) == 0:
+            continue
+        points = np.vstack([_bezier_points(curve, t) for curve in curves])
+        # 픽셀 중심 좌표 → 확대 격자의 픽셀 중심 좌표, 4비트 소수점 (shift=4)
+        points = (points + 0.5) * supersample - 0.5
+        polygons.append(np.round(points * 16).astype(np.int32))
+    if polygons:
+        cv2.fillPoly(canvas, polygons, 0, lineType=cv2.LINE_8, shift=4)
+    page = cv2.resize(canvas, (width, height), interpolation=cv2.INTER_AREA)
+    return cv2.compare(page, 128, cv2.CMP_GE)
+
+
+def agreement(page: np.ndarray, rendered: np.ndarray) -> Tuple[float, float]:
+    """(전체 픽셀 일치율, 잉크 IoU)"""
+    ink = page < 128
+    rendered_ink = rendered < 128
+    union = np.count_nonzero(ink | rendered_ink)
+    iou = np.count_nonzero(ink & rendered_ink) / union if union else 1.0
+    return float(np.mean(ink == rendered_ink)), float(iou)
+
+
+def export_svg(page: np.ndarray, svg_path: Optional[str] = None,
+               tolerance: float = DEFAULT_TOLERANCE,
+               precision: int = DEFAULT_PRECISION) -> Dict:
+    """
+    도안을 SVG 로 내보내고 통계를 반환합니다.
+
+    Args:
+        page: 흰 배경/검은 선 uint8 그레이스케일 이미지
+        svg_path: 저장 경로 (None 이면 저장하지 않음)
+        tolerance: 곡선 맞춤 허용 오차 (px, 클수록 작고 거친 SVG)
+        precision: 좌표 소수점 자릿수
+
+    Returns:
+        {'svg': 문자열, 'bytes': 크기, 'gzip_bytes': gzip 전송 크기,
+         'paths': 윤곽선 수, 'curves': 곡선 수,
+         'agreement': 전체 픽셀 일치율, 'ink_iou': 잉크 영역 IoU}
+    """
+    height, width = page.shape[:2]
+    subpaths = quantize(trace(page, tolerance), precision)
+    svg = to_svg(subpaths, width, height, precision)
+    data = svg.encode('utf-8')
+    if svg_path is not None:
+        write_bytes(svg_path, data)
+    with profile_stage('rasterize'):
+        match, iou = agreement(page, rasterize(subpaths, (height, width)))
+    return {
+        'svg': svg, 'bytes': len(data), 'gzip_bytes': len(zlib.compress(data, 9)),
+        'paths': len(subpaths),
+        'curves': int(sum(len(curves) for curves in subpaths)),
+        'agreement': match, 'ink_iou': iou,
+    }
+
+
+def export_svg_file(image_path: str, svg_path: Optional[str] = None,
+                    tolerance: float = DEFAULT_TOLERANCE,
+                    precision: int = DEFAULT_PRECISION) -> Dict:
+    """PNG 등 이미지 파일을 SVG 로 내보냅니다 (svg_path 기본값: 같은 이름의 .svg)."""
+    page = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    if svg_path is None:
+        svg_path = str(Path(image_path).with_suffix('.svg'))
+    stats = export_svg(page, svg_path, tolerance, precision)
+    del stats['svg']
+    stats['raster_bytes'] = os.path.getsize(image_path)
+    stats['svg_path'] = svg_path
+    return stats
+
+
+def format_stats(name: str, stats: Dict) -> str:
+    """파일 하나의 내보내기 결과 한 줄"""
+    ratio = stats['bytes'] / stats['raster_bytes'] * 100 if stats.get('raster_bytes') else 0
+    return (f"🖋️ {name}: {format_size(stats['bytes'])} "
+            f"(PNG 대비 {ratio:.0f}%, gzip {format_size(stats['gzip_bytes'])}), "
+            f"윤곽선 {stats['paths']}개, 곡선 {stats['curves']}개, 일치 {stats['agreement'] * 100:.2f}%, 잉크 IoU {stats['ink_iou'] * 100:.1f}%")
+
+
+def _export_task(task: Tuple[str, str, float, int]) -> Dict:
+    image_path, svg_path, tolerance, precision = task
+    return export_svg_file(image_path, svg_path, tolerance, precision)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="흑백 도안을 SVG 벡터로 내보내기")
+    parser.add_argument('inputs', nargs='*',
+                        default=[str(PROJECT_ROOT / "assets" / "images")],
+                        help='PNG 파일 또는 디렉토리 (기본값 assets/images)')
+    parser.add_argument('--out', default=str(VECTOR_DIR),
+                        help='SVG 저장 디렉토리 (기본값 assets/vector)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='곡선 맞춤 허용 오차 px (기본값 1.0, 클수록 작고 거침)')
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                        help='좌표 소수점 자릿수 (기본값 0: 정수 px)')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    files = []
+    for item in map(Path, args.inputs):
+        if item.is_dir():
+            files.extend(sorted(p for p in item.iterdir() if p.suffix.lower() == '.png'))
+        elif item.is_file():
+            files.append(item)
+    if not files:
+        print("❌ 내보낼 PNG 가 없습니다.")
+        return 1
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [
+        (str(path), str(out_dir / f"{path.stem}.svg"),
+         args.tolerance, args.precision)
+        for path in files
+    ]
+
+    print(f"🖋️  SVG 내보내기: {len(tasks)}개 (tolerance {args.tolerance}px)")
+    total_svg = total_png = 0
+    agreements = []
+    failed = 0
+    for (image_path, *_), outcome in run_batch(_export_task, tasks, args.jobs):
+        name = Path(image_path).name
+        if not outcome.ok:
+            print(f"   ❌ {name}: {outcome.error}")
+            failed += 1
+            continue
+        stats = outcome.value
+        print(f"   {format_stats(name, stats)}")
+        total_svg += stats['bytes']
+        total_png += stats['raster_bytes']
+        agreements.append(stats['agreement'])
+
+    if agreements:
+        print(f"📊 SVG {format_size(total_svg)} / PNG {format_size(total_png)} "
+              f"({total_svg / total_png * 100:.0f}%), 평균 일치 "
+              f"{sum(agreements) / len(agreements) * 100:.2f}%, 실패 {failed}개")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
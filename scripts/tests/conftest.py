@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 스크립트들은 scripts/ 를 작업 디렉토리로 두고 서로를 직접 import 함
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
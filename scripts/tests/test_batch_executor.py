@@ -0,0 +1,29 @@
+import os
+
+from batch_executor import run_batch
+
+
+def square_or_crash(value):
+    if value == 5:
+        os._exit(1)  # 메모리 부족으로 강제 종료된 워커와 같은 상황
+    return value * value
+
+
+def square_or_raise(value):
+    if value == 3:
+        raise ValueError("bad page")
+    return value * value
+
+
+def test_worker_crash_fails_only_its_task():
+    results = list(run_batch(square_or_crash, range(12), jobs=2))
+    assert [task for task, _ in results] == list(range(12))
+    failed = [task for task, outcome in results if not outcome.ok]
+    assert failed == [5]
+    assert all(outcome.value == task * task for task, outcome in results if outcome.ok)
+
+
+def test_exception_fails_only_its_task():
+    results = list(run_batch(square_or_raise, range(6), jobs=3))
+    assert [task for task, outcome in results if not outcome.ok] == [3]
+    assert results[3][1].error == "ValueError: bad page"
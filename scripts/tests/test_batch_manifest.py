@@ -0,0 +1,36 @@
+import batch_manifest
+from batch_manifest import SKIP_ALREADY_PROCESSED, BatchManifest
+
+
+def _write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_output_hashes_follow_records(tmp_path):
+    manifest = BatchManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+    src = _write(tmp_path / "a.png", b"raw")
+    out = _write(tmp_path / "a_out.png", b"converted")
+    manifest.record(src, 'bw', out, {})
+
+    copy = _write(tmp_path / "copy.png", b"converted")
+    assert manifest.check(copy, 'bw', str(tmp_path / "copy_out.png"), {}) == SKIP_ALREADY_PROCESSED
+
+    # 같은 스타일을 다시 기록하면 이전 출력 해시는 잊음
+    _write(tmp_path / "a_out.png", b"converted again")
+    manifest.record(src, 'bw', out, {})
+    assert manifest.check(copy, 'bw', str(tmp_path / "copy_out.png"), {}) is None
+
+    manifest.remove_orphans([], delete_outputs=False)
+    assert not manifest._output_hashes
+
+
+def test_save_if_due(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_manifest, 'SAVE_EVERY', 2)
+    manifest = BatchManifest(str(tmp_path / "manifest.json"), str(tmp_path))
+    for i in range(3):
+        src = _write(tmp_path / f"{i}.png", bytes([i]))
+        manifest.record(src, 'bw', src, {})
+        saved = manifest.save_if_due()
+        assert saved == (i == 1)
+    assert len(BatchManifest(str(tmp_path / "manifest.json"), str(tmp_path)).entries) == 2
@@ -0,0 +1,29 @@
+import pytest
+
+import benchmark
+
+
+def _write_then(result):
+    def run(src, dst):
+        with open(dst, 'wb') as f:
+            f.write(b'png')
+        return result
+    return run
+
+
+def test_failed_case_is_not_reported_as_success(tmp_path, monkeypatch):
+    dst = tmp_path / 'out.png'
+    monkeypatch.setattr(benchmark, 'load_case', lambda name: _write_then(False))
+    with pytest.raises(RuntimeError):
+        benchmark.run_case('basic', 'in.png', str(dst), repeat=1)
+
+
+def test_stale_output_does_not_count(tmp_path, monkeypatch):
+    dst = tmp_path / 'out.png'
+    dst.write_bytes(b'old run')
+    monkeypatch.setattr(benchmark, 'load_case', lambda name: lambda src, dst: None)
+    with pytest.raises(RuntimeError):
+        benchmark.run_case('basic', 'in.png', str(dst), repeat=2)
+
+    monkeypatch.setattr(benchmark, 'load_case', lambda name: _write_then(True))
+    assert len(benchmark.run_case('basic', 'in.png', str(dst), repeat=2)['seconds']) == 2
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from catalog_store import CatalogStore
+
+
+def _write_json(path, pages, categories=({'id': 'forest'},)):
+    path.write_text(json.dumps({'categories': list(categories), 'pages': pages}))
+
+
+def _page(page_id, **fields):
+    return dict(id=page_id, categoryId='forest', imagePath=f'assets/images/{page_id}.png', **fields)
+
+
+def test_changed_json_keeps_unexported_pages(tmp_path):
+    json_path = tmp_path / 'coloring_pages.json'
+    _write_json(json_path, [_page('a'), _page('b')])
+    with CatalogStore(str(tmp_path / 'catalog.sqlite3'), json_path) as catalog:
+        catalog.add_page(_page('c'))
+        catalog.update_pages({'assets/images/b.png': {'title': 'store'}})
+        catalog.add_category({'id': 'ocean'})
+
+    # 내보내기 전에 JSON 이 바뀜 (git pull 등)
+    _write_json(json_path, [_page('a', title='pulled'), _page('b'), _page('d')])
+    with CatalogStore(str(tmp_path / 'catalog.sqlite3'), json_path) as catalog:
+        pages = catalog.pages()
+        assert [page['id'] for page in pages] == ['a', 'b', 'd', 'c']
+        assert pages[0]['title'] == 'pulled'
+        assert pages[1]['title'] == 'store'
+        assert [category['id'] for category in catalog.categories()] == ['forest', 'ocean']
+
+        catalog.export_json()
+        _write_json(json_path, [_page('a')])
+        # 내보낸 뒤에는 JSON 이 기준
+        assert catalog.sync_from_json()
+        assert [page['id'] for page in catalog.pages()] == ['a']
+
+
+def test_duplicate_ids_are_reported(tmp_path):
+    json_path = tmp_path / 'coloring_pages.json'
+    _write_json(json_path, [_page('a'), _page('b'), _page('a', title='copy')])
+    with pytest.raises(ValueError, match='중복된 페이지 id .*: a$'):
+        CatalogStore(str(tmp_path / 'catalog.sqlite3'), json_path)
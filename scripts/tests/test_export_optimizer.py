@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+
+import export_optimizer
+
+
+def test_webp_outside_project_keeps_going(tmp_path, monkeypatch):
+    for name in ('a.png', 'b.png'):
+        (tmp_path / name).write_bytes(b'\x89PNG' + b'0' * 100)
+
+    def fake_optimize(path, decode_budget, allow_webp):
+        choice = SimpleNamespace(name='webp-lossless', data=b'RIFF', ext='.webp')
+        return {'path': path, 'before': path.stat().st_size, 'choice': choice}
+
+    updates = []
+    monkeypatch.setattr(export_optimizer, '_optimize_file', fake_optimize)
+    monkeypatch.setattr(export_optimizer, '_update_page_references', updates.append)
+
+    before, after = export_optimizer.optimize_directory(tmp_path, allow_webp=True, jobs=1)
+
+    # 프로젝트 밖 디렉토리도 모든 파일을 처리하되 JSON 경로는 건드리지 않음
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.webp', 'b.webp']
+    assert (before, after) == (208, 8)
+    assert updates == []
@@ -0,0 +1,41 @@
+import sys
+
+import cv2
+import numpy as np
+
+from generation_pipeline import PROCESS, THREAD, Stage, run_pipeline
+from page_stages import encode_stage, postprocess_stage, register_stage
+
+
+# 부모 프로세스에서만 바꾸는 값: fork 된 워커라면 바뀐 값이 그대로 복제됨
+parent_state = {'forked': False}
+
+
+def inspect_worker(page: dict) -> dict:
+    page['forked'] = parent_state['forked']
+    # 워커가 생성 스크립트(API 클라이언트)를 import 하지 않았는지 확인용
+    page['gemini_loaded'] = 'generate_images_gemini' in sys.modules
+    return page
+
+
+def test_process_stages_run_in_fresh_workers(tmp_path):
+    image = np.full((64, 64, 3), 255, np.uint8)
+    cv2.circle(image, (32, 32), 20, (40, 40, 40), 3)
+    data = cv2.imencode('.png', image)[1].tobytes()
+    pages = [{'path': str(tmp_path / f'page{i}.png'), 'name': f'page{i}', 'image': data,
+              'threshold_value': 200} for i in range(3)]
+
+    parent_state['forked'] = True
+    results, stats = run_pipeline([
+        Stage('postprocess', postprocess_stage, kind=PROCESS),
+        Stage('check', inspect_worker, kind=PROCESS),
+        Stage('encode', encode_stage, kind=PROCESS),
+        Stage('register', lambda page: (register_stage(page), page), kind=THREAD),
+    ], pages, processes=2)
+
+    for page, outcome in results:
+        assert outcome.ok, outcome.error
+        saved, final = outcome.value
+        assert saved and not final['forked'] and not final['gemini_loaded']
+        written = cv2.imread(page['path'], cv2.IMREAD_GRAYSCALE)
+        assert set(np.unique(written)) <= {0, 255}
@@ -0,0 +1,22 @@
+import cv2
+import numpy as np
+
+import image_postprocess
+
+
+def test_close_gaps_writes_once(tmp_path, monkeypatch):
+    image = np.full((120, 160, 3), 255, np.uint8)
+    cv2.line(image, (10, 60), (70, 60), (0, 0, 0), 3)
+    cv2.line(image, (74, 60), (150, 60), (0, 0, 0), 3)
+    path = tmp_path / 'page.png'
+    cv2.imwrite(str(path), image)
+
+    writes = []
+    write_image = image_postprocess.write_image
+    monkeypatch.setattr(image_postprocess, 'write_image',
+                        lambda out, data: writes.append(out) or write_image(out, data))
+    output = image_postprocess.convert_to_pure_bw(str(path), gap_settings={}, verbose=False)
+
+    assert writes == [str(path)] and output == str(path)
+    result = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+    assert set(np.unique(result)) <= {0, 255}
@@ -0,0 +1,37 @@
+import asyncio
+
+from rate_limiter import RateLimiter
+
+
+class Throttled(Exception):
+    status_code = 429
+
+
+def test_call_forwards_model_keyword():
+    limiter = RateLimiter({'m': (6000, 2)})
+
+    async def generate(**kwargs):
+        return kwargs
+
+    result = asyncio.run(limiter.call('m', generate, model='m', prompt='p'))
+    assert result == {'model': 'm', 'prompt': 'p'}
+
+
+def test_call_sync_forwards_model_keyword():
+    limiter = RateLimiter({'m': (6000, 2)})
+    assert limiter.call_sync('m', lambda **kwargs: kwargs, model='m') == {'model': 'm'}
+
+
+def test_call_retries_throttled_request():
+    limiter = RateLimiter({'m': (6000, 2)})
+    attempts = []
+
+    async def generate(model):
+        attempts.append(model)
+        if len(attempts) == 1:
+            raise Throttled("429 Too Many Requests, retry after 0s")
+        return 'ok'
+
+    assert asyncio.run(limiter.call('m', generate, model='m')) == 'ok'
+    assert attempts == ['m', 'm']
+    assert limiter.budget('m').rpm < 6000
@@ -0,0 +1,28 @@
+import cv2
+import numpy as np
+import pytest
+
+from svg_export import export_svg
+
+
+def _strokes(width):
+    page = np.full((160, 160), 255, np.uint8)
+    cv2.line(page, (10, 12), (150, 12), 0, width)
+    cv2.line(page, (12, 24), (12, 150), 0, width)
+    cv2.line(page, (30, 30), (140, 95), 0, width)
+    cv2.circle(page, (95, 115), 30, 0, width)
+    return page
+
+
+@pytest.mark.parametrize('width', [1, 2, 3])
+def test_thin_strokes_survive(width):
+    # 가는 선의 양쪽 윤곽이 겹쳐 선이 사라지거나 가늘어지지 않아야 함
+    assert export_svg(_strokes(width))['ink_iou'] >= 0.95
+
+
+def test_three_pixel_bar_keeps_its_width():
+    page = np.full((40, 20), 255, np.uint8)
+    page[5:35, 4:7] = 0
+    stats = export_svg(page)
+    assert stats['ink_iou'] >= 0.95
+    assert stats['paths'] == 1
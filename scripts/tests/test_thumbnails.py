@@ -0,0 +1,36 @@
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from thumbnails import build_variants, variant_path_for
+
+
+def _line_art(size=(1300, 900)):
+    page = np.full(size, 255, np.uint8)
+    for i in range(0, size[0], 40):
+        cv2.circle(page, (size[1] // 2, size[0] // 2), i, 0, 2)
+    return page
+
+
+def test_variants_are_smaller_than_source(tmp_path):
+    source = tmp_path / "page.png"
+    Image.fromarray(_line_art()).convert('1').save(source, optimize=True)
+    results = build_variants(str(source), str(tmp_path))
+    for variant, (path, nbytes) in results.items():
+        if path is not None:
+            assert nbytes < os.path.getsize(source)
+            assert os.path.getsize(path) == nbytes
+
+
+def test_variant_not_smaller_than_source_is_skipped(tmp_path):
+    # 1비트 잡음: 줄인 회색조 변형이 1비트 원본보다 커짐
+    source = tmp_path / "noise.png"
+    noise = np.random.default_rng(0).integers(0, 2, (1100, 800), dtype=np.uint8) * 255
+    Image.fromarray(noise).convert('1').save(source, optimize=True)
+    stale = variant_path_for(source, 'full', tmp_path)
+    stale.write_bytes(b"old variant")
+    results = build_variants(str(source), str(tmp_path))
+    assert results['full'] == (None, 0)
+    assert not stale.exists()
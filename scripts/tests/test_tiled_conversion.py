@@ -0,0 +1,98 @@
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from canny_engine import _hysteresis
+from convert_to_coloring_pro import AUTO_STYLE, STYLES, ColoringBookConverter
+from tiling import tiled_hysteresis
+
+# 타일 변환이 전체 크기로 유지하는 uint8 평면 (디코드한 BGR + 그레이, 픽셀당 4 B)
+PAGE_BYTES_PER_PIXEL = 4
+
+
+# JPEG 는 IMREAD_GRAYSCALE 과 cvtColor 의 디코드 결과가 달라지는 경우
+@pytest.fixture(scope='module', params=['png', 'jpg'])
+def page(request, tmp_path_factory):
+    # 타일 경계를 가로지르는 긴 선/곡선과 그라데이션, 잡음이 섞인 컬러 페이지
+    rng = np.random.default_rng(7)
+    height, width = 900, 1300
+    ramp = np.linspace(60, 230, width, dtype=np.float64)
+    image = np.dstack([np.tile(ramp, (height, 1)),
+                       np.tile(ramp[::-1], (height, 1)),
+                       np.full((height, width), 180.0)])
+    image += rng.normal(0, 12, image.shape)
+    image = np.clip(image, 0, 255).astype(np.uint8)
+    for i in range(40):
+        center = tuple(int(v) for v in rng.integers((0, 0), (width, height)))
+        axes = tuple(int(v) for v in rng.integers(20, 400, 2))
+        color = tuple(int(v) for v in rng.integers(0, 255, 3))
+        cv2.ellipse(image, center, axes, float(rng.uniform(0, 180)), 0, 360, color,
+                    int(rng.integers(1, 6)))
+    # 경계를 따라 아주 약하게 이어지는 선 (히스테리시스가 타일 밖에서 이어받는 경우)
+    cv2.line(image, (0, 255), (width - 1, 260), (150, 150, 150), 1)
+    cv2.line(image, (10, 0), (1290, 899), (30, 30, 30), 2)
+    path = tmp_path_factory.mktemp('tiled') / f'page.{request.param}'
+    cv2.imwrite(str(path), image)
+    return path
+
+
+@pytest.mark.parametrize('style', STYLES + [AUTO_STYLE])
+def test_tiled_matches_whole_image(page, tmp_path, style):
+    converter = ColoringBookConverter(denoise_tier='fast')
+    whole = tmp_path / 'whole.png'
+    tiled = tmp_path / 'tiled.png'
+    assert converter.convert_styles(str(page), {style: str(whole)})[style]
+    assert converter.convert_tiled(str(page), str(tiled), style=style, tile_size=256, threads=2)
+
+    expected = cv2.imread(str(whole), cv2.IMREAD_GRAYSCALE)
+    actual = cv2.imread(str(tiled), cv2.IMREAD_GRAYSCALE)
+    assert np.count_nonzero(expected != actual) == 0
+
+
+def test_tiled_hysteresis_matches_whole_image():
+    # 작은 타일로 잘게 나눠 타일 모서리를 대각선으로 넘는 연결까지 확인
+    rng = np.random.default_rng(11)
+    candidates = rng.random((97, 131)) < 0.45
+    strong = candidates & (rng.random(candidates.shape) < 0.01)
+
+    def planes(window):
+        return [window[..., 0], window[..., 1]]
+
+    image = np.dstack([candidates, strong]).astype(np.uint8) * 255
+    expected = _hysteresis(candidates, strong)
+    for tile_size in (7, 16, 200):
+        actual = tiled_hysteresis(image, planes, tile_size=tile_size, halo=0, threads=1)
+        assert np.array_equal(actual, expected)
+
+
+def _noisy_page(path, size):
+    rng = np.random.default_rng(5)
+    image = np.clip(rng.normal(190, 12, (size, size, 3)), 0, 255).astype(np.uint8)
+    for _ in range(size * size // 20000):
+        center = tuple(int(v) for v in rng.integers(0, size, 2))
+        color = tuple(int(v) for v in rng.integers(0, 255, 3))
+        cv2.circle(image, center, int(rng.integers(5, 80)), color, int(rng.integers(1, 4)))
+    cv2.imwrite(str(path), image)
+
+
+@pytest.mark.parametrize('style', ['balanced', 'ultra'])
+def test_tiled_memory_does_not_grow_with_page_size(tmp_path, style):
+    # tracemalloc 은 NumPy 배열(OpenCV 가 돌려주는 배열 포함) 할당을 추적함
+    converter = ColoringBookConverter(denoise_tier='fast')
+    excess = {}
+    for size in (768, 1536):
+        page = tmp_path / f'page{size}.png'
+        _noisy_page(page, size)
+        tracemalloc.start()
+        try:
+            assert converter.convert_tiled(str(page), str(tmp_path / 'out.png'), style=style,
+                                           tile_size=256, threads=1)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        excess[size] = peak - PAGE_BYTES_PER_PIXEL * size * size
+
+    # 전체 크기 uint8 평면을 뺀 나머지(타일 작업 메모리)는 페이지가 4배가 되어도 그대로
+    assert excess[1536] <= excess[768] + 256 * 1024
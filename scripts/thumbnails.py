@@ -0,0 +1,274 @@
+"""
+카탈로그용 다중 해상도 도안 변형 생성 (thumbnail / list / full)
+
+카테고리 그리드나 목록에서도 원본 해상도 도안을 불러오지 않도록, 도안마다 긴 변 기준으로
+줄인 변형을 만듭니다. 세 크기는 도안 하나당 한 번 만든 가우시안 피라미드를 공유하며,
+각 크기는 자기보다 큰 가장 작은 피라미드 단계에서 INTER_AREA 로 마저 줄입니다.
+
+선 그림용 축소:
+    단순 평균 축소는 1-2px 선을 옅은 회색으로 만들어 작은 썸네일에서 선이 사라집니다.
+    피라미드의 각 단계를 만들기 전에 잉크(255 - 밝기)를 2x2 최댓값으로 팽창시키고
+    (단계마다 선이 반 픽셀씩만 굵어짐), 마지막에 잉크 농도를 감마 곡선으로 올려
+    옅어진 가는 선을 진하게 만듭니다.
+
+크기:
+    원본 도안은 1비트 PNG 라 8비트 회색조로 그대로 저장하면 줄인 변형이 원본보다
+    커집니다. 잉크 농도를 INK_LEVELS 단계로 양자화해(가장자리 안티에일리어싱만 남김)
+    export_optimizer.optimize_encode 로 가장 작은 PNG(보통 2비트 팔레트)를 고르고,
+    그래도 원본보다 작지 않은 변형은 만들지 않고 원본 경로를 기록합니다.
+
+    - thumbnail: 긴 변 256px (홈/갤러리 그리드, 앱의 thumbnailPath)
+    - list:      긴 변 512px (목록/미리보기)
+    - full:      긴 변 1024px (색칠 화면 전 미리보기)
+    원본이 목표 크기 이하이거나 변형 파일이 원본보다 작지 않으면 파일을 만들지 않고
+    원본 경로(imagePath)를 그대로 기록합니다. 이렇게 건너뛴 변형은
+    .cache/thumbnails-skipped.json 에 기록해 다음 실행에서 다시 만들지 않습니다.
+
+coloring_pages.json 의 해당 페이지 imagePath 옆에 thumbnailPath, listPath, fullPath 를
+기록합니다.
+
+사용 예:
+    python scripts/thumbnails.py                  # assets/images 전체 → assets/thumbnails
+    python scripts/thumbnails.py --force --jobs 4
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from batch_executor import add_jobs_argument, run_batch
+from catalog_store import apply_page_updates
+from conversion_cache import PROJECT_ROOT, format_size
+from export_optimizer import DEFAULT_IMAGES_DIR, optimize_encode
+from image_io import load_image, write_bytes
+from stage_profiler import profile_stage
+
+THUMBNAILS_DIR = PROJECT_ROOT / "assets" / "thumbnails"
+# 원본보다 작지 않아 건너뛴 변형 기록 (증분 실행용)
+SKIPPED_PATH = PROJECT_ROOT / ".cache" / "thumbnails-skipped.json"
+
+# 변형 이름: 긴 변 최대 크기 (px), JSON 키는 f'{이름}Path'
+VARIANTS = {
+    'thumbnail': 256,
+    'list': 512,
+    'full': 1024,
+}
+
+_INK_KERNEL = np.ones((2, 2), np.uint8)
+# 축소 후 잉크 농도 감마 (1 미만이면 옅은 선이 진해짐)
+INK_GAMMA = 0.7
+# 저장할 잉크 농도 단계 수 (4 = 2비트 팔레트 PNG)
+INK_LEVELS = 4
+_INK_STEP = 255 / (INK_LEVELS - 1)
+_INK_LUT = (np.round((np.arange(256) / 255) ** INK_GAMMA * (INK_LEVELS - 1))
+            * _INK_STEP).round().astype(np.uint8)
+
+
+def build_pyramid(gray: np.ndarray, min_side: int) -> List[np.ndarray]:
+    """
+    선을 보존하는 가우시안 피라미드 (잉크 공간, 0 = 종이, 255 = 선)
+
+    각 단계는 이전 단계의 잉크를 2x2 팽창한 뒤 pyrDown 한 것입니다.
+    긴 변이 min_side 보다 작아지기 직전 단계까지 만듭니다.
+    """
+    with profile_stage('pyramid'):
+        levels = [cv2.bitwise_not(gray)]
+        while max(levels[-1].shape[:2]) // 2 >= min_side:
+            levels.append(cv2.pyrDown(cv2.dilate(levels[-1], _INK_KERNEL)))
+    return levels
+
+
+def downscale(pyramid: List[np.ndarray], max_side: int) -> Optional[np.ndarray]:
+    """
+    피라미드에서 긴 변이 max_side 인 흰 배경 도안을 만듭니다.
+
+    Returns:
+        uint8 그레이스케일 이미지, 원본이 max_side 이하면 None (원본을 그대로 사용)
+    """
+    height, width = pyramid[0].shape[:2]
+    if max(height, width) <= max_side:
+        return None
+    scale = max_side / max(height, width)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    # 목표보다 크거나 같은 가장 작은 단계에서 시작
+    level = pyramid[0]
+    for candidate in pyramid[1:]:
+        if max(candidate.shape[:2]) < max_side:
+            break
+        level = candidate
+    with profile_stage('resize'):
+        if (level.shape[1], level.shape[0]) != size:
+            level = cv2.resize(level, size, interpolation=cv2.INTER_AREA)
+        level = cv2.LUT(level, _INK_LUT)
+    return cv2.bitwise_not(level)
+
+
+def variant_path_for(image_path: Path, variant: str,
+                     out_dir: Path = THUMBNAILS_DIR) -> Path:
+    return out_dir / f"{image_path.stem}_{variant}.png"
+
+
+def build_variants(image_path: str, out_dir: str,
+                   variants: Dict[str, int] = VARIANTS) -> Dict[str, Tuple[Optional[str], int]]:
+    """
+    이미지 하나의 변형들을 만들어 저장합니다.
+    원본보다 작지 않은 변형은 저장하지 않고, 이전에 만든 파일이 있으면 지웁니다.
+
+    Returns:
+        {변형: (저장 경로 또는 원본을 쓰면 None, 바이트 수)}
+    """
+    source_bytes = os.path.getsize(image_path)
+    gray = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    pyramid = build_pyramid(gray, min(variants.values()))
+    results = {}
+    for variant, max_side in variants.items():
+        path = variant_path_for(Path(image_path), variant, Path(out_dir))
+        page = downscale(pyramid, max_side)
+        data = optimize_encode(page, threads=1).data if page is not None else None
+        if data is None or len(data) >= source_bytes:
+            if path.exists():
+                path.unlink()
+            results[variant] = (None, 0)
+            continue
+        write_bytes(str(path), data)
+        results[variant] = (str(path), len(data))
+    return results
+
+
+def _update_page_variants(results: Dict[str, Dict[str, str]]) -> int:
+    """{imagePath: {변형: 경로}} 를 카탈로그에 f'{변형}Path' 로 기록하고 coloring_pages.json 을 내보냄"""
+    return apply_page_updates({
+        image_path: {f'{variant}Path': path for variant, path in paths.items()}
+        for image_path, paths in results.items()
+    })
+
+
+def _project_path(path: Path) -> str:
+    """JSON 경로 형식 (프로젝트 루트 기준 상대 경로)"""
+    return path.resolve().relative_to(PROJECT_ROOT).as_posix()
+
+
+def _variant_task(task: Tuple[str, str]) -> Dict[str, Tuple[Optional[str], int]]:
+    image_path, out_dir = task
+    return build_variants(image_path, out_dir)
+
+
+def _source_stamp(image: Path) -> List[int]:
+    stat = image.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_skipped() -> Dict[str, Dict]:
+    """{도안 경로: {'stamp': [크기, mtime_ns], 'variants': [건너뛴 변형]}}"""
+    try:
+        with open(SKIPPED_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_current(image: Path, out_dir: Path, skipped: Dict[str, Dict]) -> bool:
+    """
+    모든 변형이 도안보다 새롭거나, 지금 도안 내용으로 건너뛰기로 한 변형이면 True
+    (원본을 그대로 쓰는 변형은 파일이 없음)
+    """
+    source_mtime = image.stat().st_mtime
+    record = skipped.get(str(image.resolve()))
+    if record is not None and record['stamp'] != _source_stamp(image):
+        record = None
+    with Image.open(image) as img:  # 헤더만 읽음
+        long_side = max(img.size)
+    for variant, max_side in VARIANTS.items():
+        if long_side <= max_side:
+            continue
+        if record is not None and variant in record['variants']:
+            continue
+        path = variant_path_for(image, variant, out_dir)
+        if not path.exists() or path.stat().st_mtime < source_mtime:
+            return False
+    return True
+
+
+def _existing_variants(image: Path, out_dir: Path) -> Dict[str, Optional[str]]:
+    """이미 만들어 둔 변형 경로 (파일이 없으면 None = 원본 사용)"""
+    paths = {variant: variant_path_for(image, variant, out_dir) for variant in VARIANTS}
+    return {variant: str(path) if path.exists() else None for variant, path in paths.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카탈로그용 다중 해상도 도안 변형 생성")
+    parser.add_argument('directory', nargs='?', default=str(DEFAULT_IMAGES_DIR),
+                        help='도안 디렉토리 (기본값 assets/images)')
+    parser.add_argument('--out', default=str(THUMBNAILS_DIR),
+                        help='변형 저장 디렉토리 (기본값 assets/thumbnails)')
+    parser.add_argument('--force', action='store_true',
+                        help='도안보다 새로운 변형이 있어도 다시 생성')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    images = sorted(p for p in directory.iterdir()
+                    if p.suffix.lower() in ('.png', '.webp'))
+    if not images:
+        print(f"❌ 도안이 없습니다: {directory}")
+        return 1
+
+    skipped = _load_skipped()
+    tasks = []
+    current = []
+    for image in images:
+        if not args.force and _is_current(image, out_dir, skipped):
+            current.append(image)
+        else:
+            tasks.append((str(image), str(out_dir)))
+
+    sizes = ', '.join(f"{name} {side}px" for name, side in VARIANTS.items())
+    print(f"🖼️  도안 변형 생성: {len(tasks)}개 ({sizes}, 건너뜀 {len(current)}개)")
+    # 변형이 최신인 도안도 JSON 경로는 다시 맞춤 (JSON 을 새로 받은 경우 등)
+    variant_paths = {image: _existing_variants(image, out_dir) for image in current}
+    total_bytes = failed = 0
+    for (image_path, _), outcome in run_batch(_variant_task, tasks, args.jobs):
+        image = Path(image_path)
+        if not outcome.ok:
+            print(f"   ❌ {image.name}: {outcome.error}")
+            failed += 1
+            continue
+        size = sum(nbytes for _, nbytes in outcome.value.values())
+        total_bytes += size
+        made = [name for name, (path, _) in outcome.value.items() if path]
+        kept = [name for name, (path, _) in outcome.value.items() if not path]
+        note = f", 원본 사용: {', '.join(kept)}" if made and kept else ""
+        print(f"   ✅ {image.name}: {', '.join(made) or '원본 사용'}{note} ({format_size(size)})")
+        variant_paths[image] = {name: path for name, (path, _) in outcome.value.items()}
+        skipped[str(image.resolve())] = {'stamp': _source_stamp(image), 'variants': kept}
+    if tasks:
+        SKIPPED_PATH.parent.mkdir(parents=True, exist_ok=True)
+        write_bytes(str(SKIPPED_PATH), json.dumps(skipped, indent=1, sort_keys=True).encode('utf-8'))
+
+    results = {}
+    for image, paths in variant_paths.items():
+        try:
+            key = _project_path(image)
+        except ValueError:  # 프로젝트 밖의 디렉토리는 JSON 에 기록하지 않음
+            continue
+        results[key] = {variant: _project_path(Path(path)) if path else key
+                        for variant, path in paths.items()}
+
+    updated = _update_page_variants(results)
+    print(f"📊 완료: {len(tasks) - failed}개, 실패 {failed}개, 합계 {format_size(total_bytes)}")
+    if updated:
+        print(f"   📝 coloring_pages.json 변형 경로 {updated}개 갱신")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+겹치는 타일 단위 처리 (인쇄용 고해상도 이미지용)
+
+이미지를 tile_size 크기의 코어 영역으로 나누고, 각 코어 주변에 halo 픽셀만큼
+여유를 붙여 처리한 뒤 코어 부분만 결과 이미지에 이어 붙입니다.
+halo 가 처리 과정의 커널 반경 합 이상이면 지역 연산의 결과는 전체 이미지를
+한 번에 처리한 것과 같아 타일 경계가 드러나지 않습니다. 영향 범위에 제한이 없는
+Canny 히스테리시스는 tiled_hysteresis 로 타일마다 라벨링한 뒤 타일 테두리에 닿는
+컴포넌트만 union-find 로 합칩니다.
+
+float64 중간 결과와 라벨 맵 등 무거운 메모리는 타일 크기 × 스레드 수에 비례하며,
+전체 크기로는 입력/출력 uint8 배열만 유지됩니다.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from batch_executor import default_jobs
+from component_filter import apply_keep_table
+
+# (코어 y0, y1, x0, x1), (halo 포함 창 y0, y1, x0, x1)
+TileBox = Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]
+# 단일 채널 이미지 또는 같은 크기 평면들의 목록 (목록이면 func 는 평면별 창 목록을 받음)
+Planes = Union[np.ndarray, Sequence[np.ndarray]]
+
+
+def iter_tiles(height: int, width: int, tile_size: int, halo: int) -> Iterator[TileBox]:
+    """행 우선 순서로 타일의 코어 영역과 halo 포함 창 영역을 내보냅니다."""
+    for y0 in range(0, height, tile_size):
+        y1 = min(y0 + tile_size, height)
+        for x0 in range(0, width, tile_size):
+            x1 = min(x0 + tile_size, width)
+            window = (max(0, y0 - halo), min(height, y1 + halo),
+                      max(0, x0 - halo), min(width, x1 + halo))
+            yield (y0, y1, x0, x1), window
+
+
+def _crop_core(result: Planes, box: TileBox) -> Planes:
+    (y0, y1, x0, x1), (wy0, _, wx0, _) = box
+    if not isinstance(result, np.ndarray):
+        return [_crop_core(plane, box) for plane in result]
+    return result[y0 - wy0:y1 - wy0, x0 - wx0:x1 - wx0]
+
+
+def _page_shape(image: Planes) -> Tuple[int, int]:
+    first = image if isinstance(image, np.ndarray) else image[0]
+    return first.shape[:2]
+
+
+def _map_tiles(image: Planes, func: Callable, tile_size: int, halo: int,
+               threads: Optional[int],
+               consume: Callable[[TileBox, np.ndarray], None],
+               select: Optional[Callable[[TileBox], bool]] = None) -> None:
+    height, width = _page_shape(image)
+    boxes = [box for box in iter_tiles(height, width, tile_size, halo)
+             if select is None or select(box)]
+    workers = max(1, min(threads or default_jobs(), len(boxes)))
+
+    def run(box: TileBox) -> None:
+        _, (wy0, wy1, wx0, wx1) = box
+        if isinstance(image, np.ndarray):
+            result = func(image[wy0:wy1, wx0:wx1])
+        else:
+            result = func([plane[wy0:wy1, wx0:wx1] for plane in image])
+        consume(box, _crop_core(result, box))
+
+    if workers == 1:
+        for box in boxes:
+            run(box)
+        return
+
+    # OpenCV/NumPy 연산은 GIL 을 놓으므로 스레드로도 병렬 처리됨
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in pool.map(run, boxes):
+            pass
+
+
+def process_tiled(image: Planes, func: Callable,
+                  tile_size: int = 2048, halo: int = 32,
+                  threads: Optional[int] = None, dtype: type = np.uint8) -> np.ndarray:
+    """
+    func 를 halo 가 붙은 타일마다 적용하고 코어 영역을 이어 붙인 결과를 반환합니다.
+
+    func 는 입력 창과 같은 높이/너비의 단일 채널 이미지(dtype)를 돌려줘야 합니다.
+    image 가 평면 목록이면 전체 크기로 쌓지 않고 평면별 창 목록을 func 에 넘깁니다.
+    threads 가 None 또는 0 이면 CPU 코어 수만큼 스레드를 사용합니다.
+    """
+    output = np.empty(_page_shape(image), dtype=dtype)
+
+    def store(box: TileBox, core: np.ndarray) -> None:
+        y0, y1, x0, x1 = box[0]
+        output[y0:y1, x0:x1] = core
+
+    _map_tiles(image, func, tile_size, halo, threads, store)
+    return output
+
+
+def tiled_max(image: np.ndarray, func: Callable[[np.ndarray], np.ndarray],
+              tile_size: int = 2048, halo: int = 32,
+              threads: Optional[int] = None) -> float:
+    """
+    func 결과의 전역 최댓값을 타일 단위로 구합니다.
+
+    에지 크기 정규화처럼 이미지 전체 통계가 필요한 단계의 사전 계산에 사용합니다.
+    """
+    maxima = []
+
+    def collect(box: TileBox, core: np.ndarray) -> None:
+        maxima.append(float(core.max()))
+
+    _map_tiles(image, func, tile_size, halo, threads, collect)
+    return max(maxima) if maxima else 0.0
+
+
+def _perimeter(labels: np.ndarray) -> np.ndarray:
+    """코어 라벨 맵의 테두리 (위, 아래, 왼쪽, 오른쪽 순으로 이어 붙임)"""
+    return np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]])
+
+
+def _label_layers(core: List[np.ndarray]) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """(후보, 강한 픽셀) 평면 쌍마다 8-연결 라벨 맵과 라벨별 강한 픽셀 포함 여부"""
+    for candidates, strong_pixels in zip(core[::2], core[1::2]):
+        count, labels = cv2.connectedComponents(candidates, connectivity=8)
+        strong = np.zeros(count, dtype=bool)
+        strong[labels[strong_pixels != 0]] = True
+        strong[0] = False
+        yield labels, strong
+
+
+def _seam_links(before: np.ndarray, after: np.ndarray,
+                links: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+    """타일 경계 양쪽 한 줄의 노드 번호(-1 은 배경)에서 8-연결로 맞닿은 쌍을 모음"""
+    n = before.size
+    for shift in (-1, 0, 1):
+        a = before[max(0, -shift):n - max(0, shift)]
+        b = after[max(0, shift):n - max(0, -shift)]
+        touching = (a >= 0) & (b >= 0)
+        links.append((a[touching], b[touching]))
+
+
+def _union_roots(count: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a[i]-b[i] 로 이어진 노드들의 대표 노드 (union-find, 배열 연산으로 한꺼번에 합침)"""
+    root = np.arange(count)
+    while True:
+        ra, rb = root[a], root[b]
+        pending = ra != rb
+        if not pending.any():
+            return root
+        ra, rb = ra[pending], rb[pending]
+        # 큰 번호의 루트를 작은 번호 쪽에 붙이므로 순환이 생기지 않음
+        np.minimum.at(root, np.maximum(ra, rb), np.minimum(ra, rb))
+        while True:
+            jumped = root[root]
+            if np.array_equal(jumped, root):
+                break
+            root = jumped
+
+
+def tiled_hysteresis(image: np.ndarray, func: Callable[[np.ndarray], List[np.ndarray]],
+                     tile_size: int = 2048, halo: int = 32,
+                     threads: Optional[int] = None) -> np.ndarray:
+    """
+    타일 단위 히스테리시스: 후보 픽셀의 8-연결 컴포넌트 중 강한 픽셀을 포함한 것만 남깁니다.
+
+    func 는 창마다 (후보, 강한 픽셀) uint8 평면(0 이 아니면 해당) k 쌍을 차례로 담은
+    목록 [후보 1, 강한 픽셀 1, 후보 2, ...] 을 돌려주고, 결과는 쌍별 결과의
+    합집합(0/255 uint8)입니다. 컴포넌트는 타일 코어 안에서 라벨링하고,
+    코어 테두리에 닿는 것만 이웃 타일과 union-find 로 합쳐 강한 픽셀 포함 여부를
+    전파합니다. 라벨 맵은 보관하지 않고, 타일 밖에서 강한 픽셀을 이어받은 컴포넌트가
+    있는 타일만 func 를 다시 호출해 고치므로 func 는 같은 창에 같은 결과를 내야 합니다.
+    """
+    height, width = image.shape[:2]
+    output = np.empty((height, width), dtype=np.uint8)
+    # {코어 (y0, x0): [평면 쌍마다 (테두리 픽셀의 노드 번호, 노드별 강한 픽셀 포함 여부)]}
+    borders: Dict[Tuple[int, int], list] = {}
+
+    def store(box: TileBox, core: List[np.ndarray], nodes: Optional[list] = None,
+              merged: Optional[np.ndarray] = None) -> list:
+        """코어 결과를 기록하고 (nodes 가 없으면) 테두리 노드 정보를 돌려줌"""
+        y0, y1, x0, x1 = box[0]
+        tile = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        layers = []
+        for layer, (labels, keep) in enumerate(_label_layers(core)):
+            perimeter = _perimeter(labels)
+            touching = perimeter > 0
+            if nodes is None:
+                border = np.unique(perimeter[touching])
+                node = np.full(keep.size, -1, dtype=np.int64)
+                node[border] = np.arange(border.size)
+                layers.append((node[perimeter], keep[border]))
+            else:
+                keep[perimeter[touching]] = merged[nodes[layer][touching]]
+            cv2.bitwise_or(tile, apply_keep_table(labels, keep), dst=tile)
+        output[y0:y1, x0:x1] = tile
+        return layers
+
+    def record(box: TileBox, core: List[np.ndarray]) -> None:
+        borders[box[0][0], box[0][2]] = store(box, core)
+
+    _map_tiles(image, func, tile_size, halo, threads, record)
+
+    # 타일/평면 쌍마다 노드 번호를 전역 번호로 옮김
+    count = 0
+    flags = []
+    spans = {}
+    for key in sorted(borders):
+        shifted = []
+        start = count
+        for nodes, strong in borders[key]:
+            shifted.append(np.where(nodes >= 0, nodes + count, -1))
+            flags.append(strong)
+            count += strong.size
+        borders[key] = shifted
+        spans[key] = (start, count)
+    flags = np.concatenate(flags) if flags else np.zeros(0, dtype=bool)
+
+    def side(y0: int, x0: int, layer: int, name: str) -> np.ndarray:
+        nodes = borders[y0, x0][layer]
+        rows, cols = min(tile_size, height - y0), min(tile_size, width - x0)
+        start = {'top': 0, 'bottom': cols, 'left': 2 * cols, 'right': 2 * cols + rows}[name]
+        return nodes[start:start + (rows if name in ('left', 'right') else cols)]
+
+    ys = range(0, height, tile_size)
+    xs = range(0, width, tile_size)
+    links: List[Tuple[np.ndarray, np.ndarray]] = [(np.empty(0, np.int64),) * 2]
+    for layer in range(len(next(iter(borders.values())))):
+        for y0 in ys[1:]:
+            _seam_links(np.concatenate([side(y0 - tile_size, x0, layer, 'bottom') for x0 in xs]),
+                        np.concatenate([side(y0, x0, layer, 'top') for x0 in xs]), links)
+        for x0 in xs[1:]:
+            _seam_links(np.concatenate([side(y0, x0 - tile_size, layer, 'right') for y0 in ys]),
+                        np.concatenate([side(y0, x0, layer, 'left') for y0 in ys]), links)
+    root = _union_roots(count, np.concatenate([a for a, _ in links]),
+                        np.concatenate([b for _, b in links]))
+    strong_roots = np.zeros(count, dtype=bool)
+    strong_roots[root[flags]] = True
+    merged = strong_roots[root]
+
+    # 이웃 타일에서 강한 픽셀을 이어받은 컴포넌트가 있는 타일만 다시 계산
+    inherited = merged & ~flags
+
+    def needs_fix(box: TileBox) -> bool:
+        start, end = spans[box[0][0], box[0][2]]
+        return bool(inherited[start:end].any())
+
+    def fix(box: TileBox, core: List[np.ndarray]) -> None:
+        store(box, core, borders[box[0][0], box[0][2]], merged)
+
+    _map_tiles(image, func, tile_size, halo, threads, fix, select=needs_fix)
+    return output